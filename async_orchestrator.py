@@ -0,0 +1,376 @@
+import asyncio
+import logging
+import signal
+import time
+import traceback
+
+from auth.browser_profile import BrowserProfile
+from main import MoocAutomation, TaskCall, config_data, configure, configure_logging
+from multi_course import log_throughput_report, prepare_shared_cookies
+from runtime.driver_executor import DriverExecutor
+from runtime.frame_navigator import MAIN_FRAME
+
+def kill_driver_process(driver):
+    """
+    直接结束chromedriver进程，正在等待它响应的命令随即失败返回
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is not None and process.poll() is None:
+        process.kill()
+        process.wait(10)
+
+class AsyncSession:
+    def __init__(self, name, course_url, executor, profile=None, username=None, password=None, options=None):
+        options = options or {}
+        self.name = name
+        self.course_url = course_url
+        self.executor = executor
+        self.profile = profile
+        self.username = username
+        self.password = password
+        # 单个WebDriver命令的期限（秒），超过后认为浏览器已卡死，重启浏览器
+        self.call_timeout = options.get('call_timeout', 180)
+        # 浏览器空闲超过该秒数时发一次心跳命令，0表示不检查
+        self.heartbeat_interval = options.get('heartbeat_interval', 60)
+        self.heartbeat_timeout = options.get('heartbeat_timeout', 30)
+        # 定期输出当前章节、任务和正在等待的命令，0表示不输出
+        self.progress_interval = options.get('progress_interval', 60)
+        # 任务期限：PDF和尚未得到时长的视频使用 task_deadline，视频得到时长后按时长放宽
+        self.task_deadline = options.get('task_deadline', 600)
+        self.video_deadline_factor = options.get('video_deadline_factor', 1.5)
+        self.video_deadline_slack = options.get('video_deadline_slack', 120)
+
+        self.channel = executor.channel(name, self.call_timeout)
+        self.automation = None
+        self.stats = MoocAutomation._new_stats(course_url)
+        self.task = None
+        self.deadline = None
+        self.deadline_expired = False
+        self._task_start = None
+        self._task_future = None
+        self._video_report = None
+        self._work = None
+        self._failure = None
+
+    async def _call(self, fn, *args, phase=None, label=None, timeout=None):
+        """
+        通过本会话的通道执行一次阻塞调用，phase不为空时在剖析器的对应阶段中执行
+        """
+        label = label or getattr(fn, "__name__", None)
+        if phase is None:
+            return await self.channel.call(fn, *args, label=label, timeout=timeout)
+        return await self.channel.call(self._in_phase, phase, fn, *args, label=label, timeout=timeout)
+
+    def _in_phase(self, phase, fn, *args):
+        with self.automation.profiler.phase(phase):
+            return fn(*args)
+
+    def _phase_steps(self, phase, steps):
+        """
+        分步任务的每一步都计入剖析器的对应阶段
+        """
+        profiler = self.automation.profiler
+        try:
+            while True:
+                with profiler.phase(phase):
+                    try:
+                        delay = next(steps)
+                    except StopIteration:
+                        return
+                yield delay
+        finally:
+            steps.close()
+
+    async def run(self):
+        """
+        完成一门课程，返回运行统计；会话被取消时关闭浏览器后正常返回
+        """
+        run_start = time.time()
+        watchdogs = []
+        try:
+            # 浏览器同样在线程池中启动
+            # 不使用预取窗口和PDF标签页
+            self.automation = await self.channel.call(
+                MoocAutomation, self.profile, background_pages=False, output_suffix=self.name, label="launch",
+            )
+            self.automation.stats = self.stats
+            if self.automation.metrics_server is not None:
+                self.automation.metrics_server.start()
+            if self.automation.metrics is not None:
+                self.automation.metrics.course_started(self.course_url)
+
+            watchdogs.append(asyncio.ensure_future(self._deadline_watchdog()))
+            if self.heartbeat_interval:
+                watchdogs.append(asyncio.ensure_future(self._heartbeat()))
+            if self.progress_interval:
+                watchdogs.append(asyncio.ensure_future(self._progress_logger()))
+
+            # 见 Supervisor.run
+            await self.automation.supervisor.run_async(self._attempt, self._recover)
+
+        except asyncio.CancelledError:
+            logging.warning(f"{self.name}: 会话已取消")
+            self.stats["error"] = "cancelled"
+        except Exception as e:
+            logging.error(f"{self.name}: 程序运行出错: {str(e)}")
+            logging.debug(traceback.format_exc())
+            self.stats["error"] = str(e)
+        finally:
+            for watchdog in watchdogs:
+                watchdog.cancel()
+            await self._close(run_start)
+        return self.stats
+
+    async def _close(self, run_start):
+        if self.automation is None:
+            self.stats["elapsed"] = time.time() - run_start
+            return
+        self.automation._finish_stats(run_start)
+        await self._force_close()
+        if self.automation.metrics_server is not None:
+            self.automation.metrics_server.stop()
+
+    async def _force_close(self):
+        """
+        绕过命令顺序在独立线程中关闭浏览器；正常关闭也超时的话直接结束chromedriver进程
+        """
+        try:
+            await asyncio.wait_for(self.channel.force(self.automation.login_manager.close), self.heartbeat_timeout)
+            return
+        except Exception as e:
+            logging.warning(f"{self.name}: 关闭浏览器失败，结束chromedriver进程: {str(e) or type(e).__name__}")
+        try:
+            await asyncio.wait_for(self.channel.force(kill_driver_process, self.automation.driver), self.heartbeat_timeout)
+        except Exception as e:
+            logging.debug(f"{self.name}: 结束chromedriver进程时出错: {str(e)}")
+
+    async def _attempt(self):
+        self._failure = None
+        self._work = asyncio.ensure_future(self._run_course())
+        try:
+            return await self._work
+        except asyncio.CancelledError:
+            # 心跳失败时中止了当前工作，把心跳的错误交给监督器按故障类别恢复
+            if self._failure is None:
+                raise
+            raise self._failure from None
+        finally:
+            self._work = None
+
+    async def _recover(self, kind):
+        if self.channel.broken:
+            # 卡住的命令无法中断，只能关闭浏览器，之后的命令改走新的通道
+            stuck = self.channel.outstanding()
+            if stuck is not None:
+                logging.warning(f"{self.name}: 命令 {stuck[0]} 已等待 {stuck[1]:.0f}秒，强制关闭浏览器")
+            await self._force_close()
+            # chromedriver退出后卡住的命令会失败返回，让出线程池中的线程
+            if not await self.channel.wait_idle(self.heartbeat_timeout):
+                logging.warning(f"{self.name}: 卡住的命令仍未返回，占用一个WebDriver线程")
+            self.channel = self.executor.channel(self.name, self.call_timeout)
+            await self.channel.call(self.automation._rebuild_session, label="rebuild")
+        else:
+            await self.channel.call(self.automation._recover, kind, label="recover")
+
+    async def _run_course(self):
+        """
+        执行 MoocAutomation 的课程流程，流程交出的每个调用都经过本会话的通道
+        """
+        steps = self.automation._course_steps(self.username, self.password, self.course_url)
+        value, error = None, None
+        try:
+            while True:
+                try:
+                    call = steps.throw(error) if error is not None else steps.send(value)
+                except StopIteration as stop:
+                    return stop.value
+                try:
+                    value, error = await self._dispatch(call), None
+                except Exception as e:
+                    value, error = None, e
+        finally:
+            steps.close()
+
+    async def _dispatch(self, call):
+        if isinstance(call, TaskCall):
+            return await self._run_task(call.task, call.executor)
+        return await self._call(call.fn, *call.args, phase=call.phase)
+
+    async def _run_task(self, task, executor):
+        """
+        分步执行单个任务；超过期限的任务被取消，返回 deadline，流程继续执行后面的任务
+        """
+        if task.type == "pdf":
+            steps = executor.steps(task, frames=(MAIN_FRAME,))
+        else:
+            steps = executor.steps(task)
+
+        self.task = task
+        self._task_start = time.monotonic()
+        self._video_report = len(self.automation.video_executor.reports)
+        self.deadline = self._task_start + self.task_deadline
+        self.deadline_expired = False
+        self._task_future = asyncio.ensure_future(
+            self.channel.steps(self._phase_steps(task.type, steps), label=task.type)
+        )
+        try:
+            await self._task_future
+            return "done"
+        except asyncio.CancelledError:
+            if not self.deadline_expired:
+                raise
+            self._mark_video("deadline")
+            return "deadline"
+        finally:
+            self.task = None
+            self.deadline = None
+            self._task_future = None
+
+    def _current_video(self):
+        """
+        当前视频任务的播放监控，尚未开始播放时返回None
+        """
+        reports = self.automation.video_executor.reports
+        if self.task is None or self.task.type != "video" or len(reports) <= self._video_report:
+            return None
+        return reports[self._video_report]
+
+    def _mark_video(self, outcome):
+        monitor = self._current_video()
+        if monitor is not None and monitor.outcome is None:
+            monitor.outcome = outcome
+
+    async def _deadline_watchdog(self):
+        while True:
+            await asyncio.sleep(1)
+            if self._task_future is None or self.deadline_expired:
+                continue
+            monitor = self._current_video()
+            if monitor is not None and monitor.duration:
+                # 视频的期限按时长计算，停滞恢复占用的时间也在余量之内
+                self.deadline = max(
+                    self.deadline,
+                    self._task_start + monitor.duration * self.video_deadline_factor + self.video_deadline_slack,
+                )
+            if time.monotonic() > self.deadline:
+                logging.warning(
+                    f"{self.name}: 任务超过期限 {self.deadline - self._task_start:.0f}秒，放弃: {self.task.title}"
+                )
+                self.deadline_expired = True
+                self._task_future.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(max(1, self.heartbeat_interval / 2))
+            if self._work is None or not self.channel.idle():
+                continue
+            if time.monotonic() - self.channel.last_call_end < self.heartbeat_interval:
+                continue
+            try:
+                await self.channel.call(
+                    self.automation.driver.execute_script, "return 1",
+                    label="heartbeat", timeout=self.heartbeat_timeout,
+                )
+            except Exception as e:
+                if self._work is not None and not self._work.done():
+                    logging.warning(f"{self.name}: 浏览器心跳失败，中止当前工作: {str(e)}")
+                    self._failure = e
+                    self._work.cancel()
+
+    async def _progress_logger(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            parts = [
+                f"章节 {self.automation.profiler.current_chapter or '-'}",
+                f"任务 {self.task.title if self.task is not None else '-'}",
+                f"已完成 {self.stats['chapters']} 章节 {self.stats['tasks_done']} 任务",
+            ]
+            if self.deadline is not None:
+                parts.append(f"距任务期限 {self.deadline - time.monotonic():.0f}秒")
+            outstanding = self.channel.outstanding()
+            if outstanding is not None and outstanding[1] >= 5:
+                parts.append(f"命令 {outstanding[0]} 已等待 {outstanding[1]:.0f}秒")
+            logging.info(f"{self.name}: " + "，".join(parts))
+
+def _install_signal_handlers(loop, tasks):
+    """
+    收到 SIGINT / SIGTERM 时取消所有会话，各会话关闭自己的浏览器后结束；Windows上不支持时由KeyboardInterrupt处理
+    """
+    def cancel_all(name):
+        logging.warning(f"收到 {name}，正在取消所有会话...")
+        for task in tasks:
+            task.cancel()
+
+    installed = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, cancel_all, sig.name)
+            installed.append(sig)
+        except (NotImplementedError, RuntimeError):
+            pass
+    return installed
+
+async def run_sessions(course_urls, sessions=2, driver_threads=2, username=None, password=None, options=None):
+    """
+    在同一个进程中驱动多个浏览器会话：会话数决定同时打开的浏览器数，线程数决定同时执行的WebDriver命令数
+    """
+    start = time.time()
+    loop = asyncio.get_running_loop()
+    executor = DriverExecutor(max_workers=driver_threads)
+    installed = []
+    try:
+        await loop.run_in_executor(executor.pool, prepare_shared_cookies, username, password)
+        limit = asyncio.Semaphore(sessions)
+        profile = BrowserProfile.from_config(config_data.get('browser'))
+
+        async def run_one(index, course_url):
+            async with limit:
+                name = f"session-{index + 1}"
+                # 见 BrowserProfile.with_user_data_suffix
+                session = AsyncSession(
+                    name, course_url, executor, profile.with_user_data_suffix(name), username, password, options,
+                )
+                stats = await session.run()
+                logging.info(f"课程完成: {stats['course_url']}")
+                return stats
+
+        tasks = [asyncio.ensure_future(run_one(index, url)) for index, url in enumerate(course_urls)]
+        installed = _install_signal_handlers(loop, tasks)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        for sig in installed:
+            loop.remove_signal_handler(sig)
+        executor.shutdown()
+
+    # 尚未开始就被取消的会话没有统计
+    results = [stats for stats in results if isinstance(stats, dict)]
+    log_throughput_report(results, time.time() - start)
+    return results
+
+def run_configured():
+    """
+    按已加载的配置运行所有课程
+    """
+    course_urls = config_data.get('course_urls') or [config_data.get('course_url')]
+    orchestrator_config = config_data.get('orchestrator', {})
+    sessions = orchestrator_config.get('sessions', 2)
+    driver_threads = orchestrator_config.get('driver_threads', 2)
+    logging.info(
+        f"开始异步运行: {len(course_urls)} 门课程，同时 {sessions} 个浏览器，{driver_threads} 个WebDriver线程"
+    )
+    return asyncio.run(run_sessions(
+        course_urls,
+        sessions=sessions,
+        driver_threads=driver_threads,
+        username=config_data.get('username'),
+        password=config_data.get('password'),
+        options=orchestrator_config,
+    ))
+
+def main():
+    configure()
+    configure_logging()
+    run_configured()
+
+if __name__ == "__main__":
+    main()
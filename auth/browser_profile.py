@@ -0,0 +1,146 @@
+import logging
+import os
+import time
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from runtime.wait_policy import document_ready
+
+# 精简后台功能的启动参数：关闭扩展、后台联网、组件更新等与自动化无关的服务
+TRIMMED_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--autoplay-policy=no-user-gesture-required",
+]
+
+# 保持后台/被遮挡窗口正常运行：预取下一章节时视频窗口不在前台，不能被暂停或降频
+BACKGROUND_ACTIVE_ARGUMENTS = [
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-background-timer-throttling",
+    "--disable-background-media-suspend",
+]
+
+class BrowserProfile:
+    def __init__(self, name="default", headless=False, user_data_dir=None,
+                 trim_background=False, page_load_strategy="normal", extra_arguments=None,
+                 keep_background_active=False, network_log=False):
+        self.name = name
+        self.headless = headless
+        self.keep_background_active = keep_background_active
+        # 持久化的用户数据目录，HTTP缓存和本地存储可在多次运行之间复用
+        self.user_data_dir = user_data_dir
+        self.trim_background = trim_background
+        self.page_load_strategy = page_load_strategy
+        self.extra_arguments = list(extra_arguments or [])
+        # 开启performance日志中的网络事件，用于统计每个章节的流量
+        self.network_log = network_log
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        从配置字典构建启动配置，profile字段选择预设，其余字段覆盖预设
+        """
+        config = dict(config or {})
+        preset = PROFILES.get(config.pop("profile", "default"), PROFILES["default"])
+        options = dict(preset.__dict__)
+        options.update(config)
+        return cls(**options)
+
+    def with_options(self, **changes):
+        """
+        返回修改了部分选项的副本，不影响共用的启动配置
+        """
+        options = dict(self.__dict__)
+        options.update(changes)
+        return BrowserProfile(**options)
+
+    def with_user_data_suffix(self, suffix):
+        """
+        返回使用独立用户数据目录的副本，供并发的多个浏览器使用
+        同一用户数据目录不能被多个浏览器同时使用，多进程和异步运行时每个浏览器都要用自己的目录
+        """
+        options = dict(self.__dict__)
+        if self.user_data_dir:
+            options["user_data_dir"] = f"{self.user_data_dir}-{suffix}"
+        return BrowserProfile(**options)
+
+    def build_options(self):
+        """
+        生成Chrome启动选项
+        """
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        if self.user_data_dir:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            options.add_argument(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
+        if self.trim_background:
+            for argument in TRIMMED_ARGUMENTS:
+                options.add_argument(argument)
+        if self.keep_background_active:
+            for argument in BACKGROUND_ACTIVE_ARGUMENTS:
+                options.add_argument(argument)
+        for argument in self.extra_arguments:
+            options.add_argument(argument)
+        if self.network_log:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        return options
+
+    def launch(self):
+        """
+        按当前配置启动浏览器
+        """
+        logging.info(f"使用启动配置 {self.name} 启动浏览器")
+        return webdriver.Chrome(options=self.build_options())
+
+PROFILES = {
+    # 与原先一致的裸启动
+    "default": BrowserProfile(),
+    # 有界面，复用缓存并精简后台服务
+    "cached": BrowserProfile(name="cached", user_data_dir="chrome-profile", trim_background=True),
+    # 无头模式，适合无人值守运行
+    "headless": BrowserProfile(name="headless", headless=True, user_data_dir="chrome-profile",
+                               trim_background=True),
+}
+
+def benchmark_startup(profiles, url='https://mooc.ucas.edu.cn/', rounds=3):
+    """
+    测量每个启动配置从启动浏览器到首个页面可用的耗时
+    """
+    results = {}
+    for profile in profiles:
+        timings = []
+        for _ in range(rounds):
+            start = time.time()
+            driver = profile.launch()
+            try:
+                driver.get(url)
+                # 以文档加载完成作为页面可用的标志
+                WebDriverWait(driver, 60, poll_frequency=0.05).until(document_ready)
+                timings.append(time.time() - start)
+            finally:
+                driver.quit()
+        results[profile.name] = timings
+        logging.info(
+            f"启动配置 {profile.name}: 平均 {sum(timings) / len(timings):.2f}秒，"
+            f"最快 {min(timings):.2f}秒，最慢 {max(timings):.2f}秒"
+        )
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    benchmark_startup(PROFILES.values())
\ No newline at end of file
@@ -1,46 +1,100 @@
-import pickle
-import os
-import time
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from runtime.wait_policy import WaitPolicy, document_ready
+
+from .browser_profile import BrowserProfile
+from .session_store import SessionStore
+
+HOME_URL = 'https://mooc.ucas.edu.cn/'
+# 未登录时页头中的登录链接
+LOGIN_LINK_XPATH = '/html/body/div[1]/div[1]/div/a'
+# 页头中登录链接/用户信息所在的容器，出现即说明页头已渲染完成
+HEADER_XPATH = '/html/body/div[1]/div[1]/div'
+# 登录表单中的账号、密码输入框和提交按钮
+LOGIN_FORM_XPATH = '/html/body/div/section/div[2]/div/div[1]/div/div[1]/div/form[2]'
+USERNAME_XPATH = LOGIN_FORM_XPATH + '/div[1]/div/div/div[1]/input'
+PASSWORD_XPATH = LOGIN_FORM_XPATH + '/div[1]/div/div/div[2]/input'
+SUBMIT_XPATH = LOGIN_FORM_XPATH + '/div[3]/div/div/button'
+# 登录后页头中除姓名以外的固定文字
+HEADER_LABELS = ("退出", "注销", "登录", "个人中心", "个人空间", "消息", "设置")
+
 class LoginManager:
-    def __init__(self):
+    def __init__(self, profile=None, session_store=None, wait_overrides=None, home_url=HOME_URL,
+                 profiler=None):
         logging.info("初始化浏览器...")
-        self.driver = webdriver.Chrome()
-        self.wait = WebDriverWait(self.driver, 20)
+        self.home_url = home_url
+        self.profile = profile or BrowserProfile()
+        self.session_store = session_store or SessionStore()
+        self.profiler = profiler
+        self.driver = self.profile.launch()
+        if self.profiler is not None:
+            # 交出去的driver带有命令计时，所有模块的WebDriver调用都会被记录
+            self.driver = self.profiler.attach(self.driver)
+        # 所有页面等待统一经过等待策略，便于统计耗时并自适应超时
+        self.wait_policy = WaitPolicy(self.driver, overrides=wait_overrides)
+        # 首页和登录页加载后调用，参数为页面类型 home / login，用于记录页面快照等
+        self.page_hooks = []
         logging.info("浏览器初始化完成")
         
-    def save_cookies(self, cookies, file_name='cookies.pkl'):
-        with open(file_name, 'wb') as f:
-            pickle.dump(cookies, f)
+    def save_cookies(self, cookies):
+        self.session_store.save(cookies)
     
-    def load_cookies(self, file_name='cookies.pkl'):
-        if os.path.exists(file_name):
-            with open(file_name, 'rb') as f:
-                return pickle.load(f)
-        return None
+    def load_cookies(self):
+        return self.session_store.load()
+
+    def _inject_cookies(self, cookies):
+        """
+        写入cookies；优先通过CDP一次性写入，无需先打开首页
+        """
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies', {
+                'cookies': [self._to_cdp_cookie(cookie) for cookie in cookies]
+            })
+            return
+        except Exception as e:
+            logging.debug(f"通过CDP写入cookies失败，改为逐个写入: {str(e)}")
+
+        self.driver.get(self.home_url)
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception as e:
+                logging.warning(f"添加cookie时出错: {str(e)}")
+
+    def _to_cdp_cookie(self, cookie):
+        cdp_cookie = {
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'domain': cookie.get('domain'),
+            'path': cookie.get('path', '/'),
+            'secure': cookie.get('secure', False),
+            'httpOnly': cookie.get('httpOnly', False),
+        }
+        if cookie.get('sameSite'):
+            cdp_cookie['sameSite'] = cookie['sameSite']
+        if cookie.get('expiry') is not None:
+            cdp_cookie['expires'] = cookie['expiry']
+        return cdp_cookie
+
+    def is_logged_in(self):
+        """
+        等待页头渲染完成后检查是否还有登录链接
+        """
+        self.wait_policy.until("login_header", lambda d: d.find_elements(By.XPATH, HEADER_XPATH))
+        self._page_loaded("home")
+        return not self.driver.find_elements(By.XPATH, LOGIN_LINK_XPATH)
 
     def login(self, username=None, password=None):
         cookies = self.load_cookies()
         if cookies:
             logging.info("发现已保存的cookies，尝试使用cookies登录...")
-            self.driver.get('https://mooc.ucas.edu.cn/')
-            for cookie in cookies:
-                try:
-                    self.driver.add_cookie(cookie)
-                except Exception as e:
-                    logging.warning(f"添加cookie时出错: {str(e)}")
-            
-            self.driver.refresh()
+            self._inject_cookies(cookies)
+            self.driver.get(self.home_url)
             
             try:
-                time.sleep(5)
-                login_buttons = self.driver.find_elements(By.XPATH, '/html/body/div[1]/div[1]/div/a')
-                if not login_buttons:
+                if self.is_logged_in():
                     logging.info("使用cookies登录成功！")
                     return
                 else:
@@ -54,30 +108,56 @@ class LoginManager:
         if password is None:
             password = input("请输入密码：")
 
-        self.driver.get('https://mooc.ucas.edu.cn/')
+        self.driver.get(self.home_url)
         
-        login_button = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/div[1]/div[1]/div/a'))
+        login_button = self.wait_policy.until(
+            "login_link", EC.element_to_be_clickable((By.XPATH, LOGIN_LINK_XPATH))
         )
         login_button.click()
         
-        username_input = self.wait.until(
-            EC.presence_of_element_located((By.XPATH, '/html/body/div/section/div[2]/div/div[1]/div/div[1]/div/form[2]/div[1]/div/div/div[1]/input'))
+        username_input = self.wait_policy.until(
+            "login_form", EC.presence_of_element_located((By.XPATH, USERNAME_XPATH))
         )
-        password_input = self.driver.find_element(By.XPATH, '/html/body/div/section/div[2]/div/div[1]/div/div[1]/div/form[2]/div[1]/div/div/div[2]/input')
+        self._page_loaded("login")
+        password_input = self.driver.find_element(By.XPATH, PASSWORD_XPATH)
         
         username_input.send_keys(username)
         password_input.send_keys(password)
         
-        submit_button = self.driver.find_element(By.XPATH, '/html/body/div/section/div[2]/div/div[1]/div/div[1]/div/form[2]/div[3]/div/div/button')
+        submit_button = self.driver.find_element(By.XPATH, SUBMIT_XPATH)
+        login_url = self.driver.current_url
         submit_button.click()
         
-        time.sleep(5)
+        # 等待离开登录页并且跳转后的页面加载完成
+        self.wait_policy.until("login_redirect", EC.url_changes(login_url))
+        self.wait_policy.until("login_redirect_ready", document_ready)
         
         cookies = self.driver.get_cookies()
         self.save_cookies(cookies)
         logging.info("登录成功，Cookies已保存")
 
+    def _page_loaded(self, kind):
+        """
+        页面钩子执行完后需回到主文档
+        """
+        for hook in self.page_hooks:
+            hook(kind)
+
+    def profile_name(self):
+        """
+        读取登录后页头中显示的用户姓名，未登录或找不到时返回None
+        """
+        if self.driver.find_elements(By.XPATH, LOGIN_LINK_XPATH):
+            return None
+        headers = self.driver.find_elements(By.XPATH, HEADER_XPATH)
+        if not headers:
+            return None
+        for line in headers[0].text.splitlines():
+            line = line.strip()
+            if len(line) >= 2 and line not in HEADER_LABELS:
+                return line
+        return None
+
     def get_driver(self):
         return self.driver
 
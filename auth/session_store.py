@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+# 距离过期不足该秒数的cookie视为已过期
+EXPIRY_MARGIN = 60
+
+class SessionStore:
+    def __init__(self, file_name='cookies.json', legacy_file_name='cookies.pkl'):
+        self.file_name = file_name
+        self.legacy_file_name = legacy_file_name
+
+    def save(self, cookies):
+        """
+        原子写入cookies：先写临时文件再替换，避免中途崩溃留下损坏的文件
+        """
+        data = {
+            "saved_at": time.time(),
+            "cookies": cookies,
+        }
+        directory = os.path.dirname(os.path.abspath(self.file_name))
+        fd, temp_path = tempfile.mkstemp(prefix='.cookies-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.file_name)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _read(self):
+        if os.path.exists(self.file_name):
+            try:
+                with open(self.file_name, 'r', encoding='utf-8') as f:
+                    return json.load(f).get("cookies", [])
+            except ValueError as e:
+                logging.warning(f"cookies文件已损坏: {str(e)}")
+                return []
+        if self.legacy_file_name and os.path.exists(self.legacy_file_name):
+            # 兼容旧版本保存的pickle格式
+            logging.info("发现旧格式的cookies文件，将在下次保存时转换为新格式")
+            with open(self.legacy_file_name, 'rb') as f:
+                return pickle.load(f)
+        return []
+
+    def load(self):
+        """
+        读取cookies，并丢弃已经过期的cookie
+        """
+        cookies = self._read()
+        deadline = time.time() + EXPIRY_MARGIN
+        valid = [c for c in cookies if c.get("expiry") is None or c["expiry"] > deadline]
+        expired = len(cookies) - len(valid)
+        if expired:
+            logging.info(f"丢弃 {expired} 个已过期的cookie")
+        return valid
\ No newline at end of file
@@ -0,0 +1,358 @@
+import argparse
+import io
+import json
+import logging
+import re
+import struct
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+SESSION_COOKIE = "fixture_session"
+
+# 首页：未登录时 /html/body/div[1]/div[1]/div/a 为登录链接
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>fixture</title></head>
+<body><div><div><div>{header}</div></div></div></body></html>"""
+
+# 登录页：表单结构与 LoginManager 中的绝对XPath一致
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>login</title></head>
+<body><div><section><div></div><div><div><div><div><div><div>
+<form></form>
+<form method="post" action="/login">
+<div><div><div><div><input name="username"></div><div><input name="password" type="password"></div></div></div></div>
+<div></div>
+<div><div><div><button type="submit">登录</button></div></div></div>
+</form>
+</div></div></div></div></div></div></section></div></body></html>"""
+
+COURSE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>course</title></head>
+<body><iframe id="frame_content-zj" name="frame_content-zj" src="/course/chapters" width="100%" height="800"></iframe></body></html>"""
+
+# 页面内切换章节：课程页面同时包含章节列表和内容iframe，点击章节只替换内容iframe
+IN_PLACE_COURSE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>course</title></head>
+<body><iframe id="frame_content-zj" name="frame_content-zj" src="/course/chapters" width="100%" height="800"></iframe>
+<div class="prev_title_pos"></div>
+<iframe id="iframe" name="iframe" src="about:blank" width="100%" height="4000"></iframe>
+<script>
+function loadChapter(index, title) {
+    document.querySelector('.prev_title_pos').textContent = title;
+    document.getElementById('iframe').src = '/chapter/' + index + '/content';
+}
+</script></body></html>"""
+
+# 页面内切换时章节列表不会重新加载，定时拉取完成状态更新图标
+CHAPTER_STATUS_SCRIPT = """<script>
+setInterval(function () {
+    fetch('/api/status').then(function (r) { return r.json(); }).then(function (finished) {
+        finished.forEach(function (index) {
+            var item = document.querySelector('[data-index="' + index + '"]');
+            if (item && !item.querySelector('.icon_yiwanc')) {
+                var icon = document.createElement('span');
+                icon.className = 'icon_yiwanc';
+                item.insertBefore(icon, item.firstChild);
+            }
+        });
+    });
+}, 1000);
+</script>"""
+
+CHAPTER_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>chapter {index}</title></head>
+<body><div class="prev_title_pos">{title}</div>
+<iframe id="iframe" name="iframe" src="/chapter/{index}/content" width="100%" height="4000"></iframe></body></html>"""
+
+PDF_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body><iframe id="panView" src="/pdf/{chapter}/{task}/view" width="100%" height="1000"></iframe></body></html>"""
+
+# 滚动到底部即上报完成
+PDF_VIEW_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><style>img {{ display: block; }}</style></head>
+<body><div class="fileBox">{images}</div>
+<script>
+var reported = false;
+window.addEventListener('scroll', function () {{
+    if (!reported && window.pageYOffset + window.innerHeight >= document.documentElement.scrollHeight - 2) {{
+        reported = true;
+        fetch('/api/complete/{chapter}/{task}', {{method: 'POST'}});
+    }}
+}});
+</script></body></html>"""
+
+# 模拟video.js播放器的类名，播放结束即上报完成
+VIDEO_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body>
+<video id="video_html5_api" src="/media/clip.wav" preload="auto"></video>
+<button class="vjs-big-play-button" type="button">play</button>
+<button class="vjs-mute-control vjs-vol-3" type="button">mute</button>
+<script>
+var video = document.getElementById('video_html5_api');
+var mute = document.querySelector('.vjs-mute-control');
+document.querySelector('.vjs-big-play-button').addEventListener('click', function () {{
+    video.play();
+}});
+mute.addEventListener('click', function () {{
+    video.muted = !video.muted;
+    mute.className = video.muted ? 'vjs-mute-control vjs-vol-0' : 'vjs-mute-control vjs-vol-3';
+}});
+video.addEventListener('ended', function () {{
+    fetch('/api/complete/{chapter}/{task}', {{method: 'POST'}});
+}});
+</script></body></html>"""
+
+# 章节内容引用的网页字体，真实页面中这类资源与任务执行无关，可用来衡量资源拦截的效果
+FONT_STYLE = ("<style>@font-face { font-family: fixture; src: url('/static/font.woff2'); } "
+              "body { font-family: fixture; }</style>")
+FONT_BYTES = 64 * 1024
+
+PAGE_IMAGE = """<svg xmlns="http://www.w3.org/2000/svg" width="800" height="1130">
+<rect width="800" height="1130" fill="#fff" stroke="#999"/></svg>"""
+
+class FixtureCourse:
+    def __init__(self, chapters=20, pdfs_per_chapter=1, videos_per_chapter=1,
+                 video_seconds=2, pdf_pages=3, finished_ratio=0.0, chapters_per_unit=5, in_place=False):
+        self.video_seconds = video_seconds
+        self.pdf_pages = pdf_pages
+        self.chapters_per_unit = chapters_per_unit
+        self.in_place = in_place
+        self.lock = threading.Lock()
+        self.chapters = []
+        finished_count = int(chapters * finished_ratio)
+        for index in range(1, chapters + 1):
+            tasks = ["pdf"] * pdfs_per_chapter + ["video"] * videos_per_chapter
+            self.chapters.append({
+                "index": index,
+                "title": f"第{index}节",
+                "tasks": [{"type": t, "done": index <= finished_count} for t in tasks],
+            })
+
+    def chapter(self, index):
+        if 1 <= index <= len(self.chapters):
+            return self.chapters[index - 1]
+        return None
+
+    def is_finished(self, chapter):
+        return all(task["done"] for task in chapter["tasks"])
+
+    def finished_indexes(self):
+        with self.lock:
+            return [chapter["index"] for chapter in self.chapters if self.is_finished(chapter)]
+
+    def complete(self, chapter_index, task_index):
+        chapter = self.chapter(chapter_index)
+        if chapter and 1 <= task_index <= len(chapter["tasks"]):
+            with self.lock:
+                chapter["tasks"][task_index - 1]["done"] = True
+            return True
+        return False
+
+    def render_chapter_list(self):
+        items = []
+        for chapter in self.chapters:
+            # 每个单元前有一个没有onclick的折叠标题
+            if (chapter["index"] - 1) % self.chapters_per_unit == 0:
+                unit = (chapter["index"] - 1) // self.chapters_per_unit + 1
+                items.append(f'<div class="chapter_item" title="第{unit}单元">第{unit}单元</div>')
+            icon = '<span class="icon_yiwanc"></span>' if self.is_finished(chapter) else ''
+            if self.in_place:
+                onclick = f"parent.loadChapter({chapter['index']}, '{chapter['title']}')"
+            else:
+                onclick = f"parent.location.href='/chapter/{chapter['index']}'"
+            items.append(
+                f'<div class="chapter_item" title="{chapter["title"]}" data-index="{chapter["index"]}" '
+                f'onclick="{onclick}">{icon}{chapter["title"]}</div>'
+            )
+        script = CHAPTER_STATUS_SCRIPT if self.in_place else ''
+        return ('<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+                + "\n".join(items) + script + '</body></html>')
+
+    def render_chapter_content(self, chapter):
+        blocks = []
+        for task_index, task in enumerate(chapter["tasks"], 1):
+            finished = " ans-job-finished" if task["done"] else ""
+            if task["type"] == "pdf":
+                iframe = (f'<iframe class="ans-attach-online insertdoc-online-pdf" '
+                          f'src="/pdf/{chapter["index"]}/{task_index}" width="100%" height="1000"></iframe>')
+            else:
+                iframe = (f'<iframe class="ans-attach-online ans-insertvideo-online" '
+                          f'src="/video/{chapter["index"]}/{task_index}" width="100%" height="400"></iframe>')
+            blocks.append(
+                f'<div class="ans-attach-ct{finished}">'
+                f'<div class="ans-job-icon" title="任务点{task_index}"></div>{iframe}</div>'
+            )
+        return ('<!DOCTYPE html><html><head><meta charset="utf-8">' + FONT_STYLE + '</head><body>'
+                + "\n".join(blocks) + '</body></html>')
+
+def make_silent_wav(seconds, rate=8000):
+    """
+    生成指定时长的静音WAV，作为<video>元素可播放的短片段
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(1)
+        f.setframerate(rate)
+        f.writeframes(struct.pack('B', 128) * int(seconds * rate))
+    return buffer.getvalue()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    course = None
+    clip = b""
+
+    def log_message(self, format, *args):
+        logging.debug("fixture: " + format % args)
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200, headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _logged_in(self):
+        return f"{SESSION_COOKIE}=ok" in (self.headers.get("Cookie") or "")
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        course = self.course
+
+        if path == "/":
+            header = '<span>已登录</span>' if self._logged_in() else '<a href="/login">登录</a>'
+            return self._send(HOME_PAGE.format(header=header))
+        if path == "/login":
+            return self._send(LOGIN_PAGE)
+        if path == "/course":
+            return self._send(IN_PLACE_COURSE_PAGE if course.in_place else COURSE_PAGE)
+        if path == "/course/chapters":
+            return self._send(course.render_chapter_list())
+        if path == "/api/status":
+            return self._send(json.dumps(course.finished_indexes()), content_type="application/json")
+        if path == "/media/clip.wav":
+            return self._send(self.clip, content_type="audio/wav")
+        if path == "/static/font.woff2":
+            return self._send(b"\0" * FONT_BYTES, content_type="font/woff2")
+        if path == "/static/page.svg":
+            return self._send(PAGE_IMAGE, content_type="image/svg+xml")
+
+        match = re.fullmatch(r"/chapter/(\d+)(/content)?", path)
+        if match:
+            chapter = course.chapter(int(match.group(1)))
+            if chapter is None:
+                return self._send("not found", status=404)
+            if match.group(2):
+                return self._send(course.render_chapter_content(chapter))
+            return self._send(CHAPTER_PAGE.format(index=chapter["index"], title=chapter["title"]))
+
+        match = re.fullmatch(r"/pdf/(\d+)/(\d+)(/view)?", path)
+        if match:
+            chapter, task = match.group(1), match.group(2)
+            if match.group(3):
+                images = '<img src="/static/page.svg">' * course.pdf_pages
+                return self._send(PDF_VIEW_PAGE.format(chapter=chapter, task=task, images=images))
+            return self._send(PDF_PAGE.format(chapter=chapter, task=task))
+
+        match = re.fullmatch(r"/video/(\d+)/(\d+)", path)
+        if match:
+            return self._send(VIDEO_PAGE.format(chapter=match.group(1), task=match.group(2)))
+
+        self._send("not found", status=404)
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ""
+
+        if path == "/login":
+            form = parse_qs(body)
+            if form.get("username") and form.get("password"):
+                return self._send("", status=302, headers={
+                    "Location": "/",
+                    "Set-Cookie": f"{SESSION_COOKIE}=ok; Path=/; Max-Age=86400",
+                })
+            return self._send(LOGIN_PAGE)
+
+        match = re.fullmatch(r"/api/complete/(\d+)/(\d+)", path)
+        if match:
+            ok = self.course.complete(int(match.group(1)), int(match.group(2)))
+            return self._send("ok" if ok else "not found", content_type="text/plain", status=200 if ok else 404)
+
+        self._send("not found", status=404)
+
+class FixtureServer:
+    def __init__(self, course, host="127.0.0.1", port=0):
+        handler = type("BoundFixtureHandler", (FixtureHandler,), {
+            "course": course,
+            "clip": make_silent_wav(course.video_seconds),
+        })
+        self.course = course
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def course_url(self):
+        return self.base_url + "course"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"测试课程服务器已启动: {self.base_url} ({len(self.course.chapters)} 个章节)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="启动离线的模拟慕课服务器")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--pdfs", type=int, default=1, help="每章PDF任务数")
+    parser.add_argument("--videos", type=int, default=1, help="每章视频任务数")
+    parser.add_argument("--video-seconds", type=float, default=2)
+    parser.add_argument("--pdf-pages", type=int, default=3)
+    parser.add_argument("--finished-ratio", type=float, default=0.0)
+    parser.add_argument("--in-place", action="store_true", help="章节在课程页面内切换，不整页跳转")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    course = FixtureCourse(
+        chapters=args.chapters,
+        pdfs_per_chapter=args.pdfs,
+        videos_per_chapter=args.videos,
+        video_seconds=args.video_seconds,
+        pdf_pages=args.pdf_pages,
+        finished_ratio=args.finished_ratio,
+        in_place=args.in_place,
+    )
+    with FixtureServer(course, port=args.port) as server:
+        logging.info(f"课程链接: {server.course_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
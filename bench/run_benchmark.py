@@ -0,0 +1,124 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from .fixture_server import FixtureCourse, FixtureServer
+
+def build_config(server, workdir, args):
+    return {
+        "username": "bench",
+        "password": "bench",
+        "course_url": server.course_url,
+        "home_url": server.base_url,
+        "cookies_file": os.path.join(workdir, "cookies.json"),
+        "journal_file": os.path.join(workdir, "progress.jsonl"),
+        "browser": {"profile": args.profile, "user_data_dir": None},
+        # 基准测试只关心自动化本身的开销，阅读节奏设为最小
+        "waits": {"pdf_scroll_step": args.scroll_step, "pdf_settle": 0},
+        "pdf_concurrency": args.pdf_concurrency,
+        "resources": {"enabled": not args.no_block, "measure": True},
+        "profiler": {
+            "enabled": True,
+            "output": os.path.join(workdir, "profile.json"),
+            "folded_output": os.path.join(workdir, "profile.folded"),
+        },
+    }
+
+def run_once(main_module, chapters, args):
+    """
+    针对指定规模的模拟课程完整运行一次
+    """
+    course = FixtureCourse(
+        chapters=chapters,
+        pdfs_per_chapter=args.pdfs,
+        videos_per_chapter=args.videos,
+        video_seconds=args.video_seconds,
+        pdf_pages=args.pdf_pages,
+        finished_ratio=args.finished_ratio,
+        in_place=args.in_place,
+    )
+    with FixtureServer(course) as server, tempfile.TemporaryDirectory() as workdir:
+        main_module.config_data.clear()
+        main_module.config_data.update(build_config(server, workdir, args))
+
+        automation = main_module.MoocAutomation()
+        start = time.time()
+        stats = automation.run(wait_on_exit=False)
+        wall_time = time.time() - start
+        report = automation.profiler.report()
+
+    completed = sum(1 for chapter in course.chapters if course.is_finished(chapter))
+    return {
+        "chapters": chapters,
+        "chapters_completed": completed,
+        "wall_time": wall_time,
+        "commands": report["command_counts"],
+        "total_commands": sum(report["command_counts"].values()),
+        "phase_seconds": report["phase_seconds"],
+        "resources": stats.get("resources", {}).get("total"),
+        "pdf_parallel_seconds": stats["pdf_parallel_seconds"],
+        "pdf_sequential_seconds": stats["pdf_sequential_seconds"],
+        "error": stats["error"],
+    }
+
+def log_report(results):
+    logging.info("基准测试结果:")
+    for result in results:
+        logging.info(
+            f"- {result['chapters']} 章节: 用时 {result['wall_time']:.1f}秒，"
+            f"WebDriver命令 {result['total_commands']} 次，完成章节 {result['chapters_completed']}"
+            + (f"，出错: {result['error']}" if result["error"] else "")
+        )
+        if result["resources"]:
+            logging.info(
+                f"    网络: 请求 {result['resources']['requests']} 个，"
+                f"传输 {result['resources']['bytes'] / 1024:.0f}KB，拦截 {result['resources']['blocked']} 个"
+            )
+        if result["pdf_parallel_seconds"]:
+            logging.info(
+                f"    PDF并发执行用时 {result['pdf_parallel_seconds']:.1f}秒，"
+                f"逐个执行约 {result['pdf_sequential_seconds']:.1f}秒"
+            )
+        for phase in sorted(result["commands"]):
+            logging.info(
+                f"    {phase}: 命令 {result['commands'][phase]} 次，"
+                f"耗时 {result['phase_seconds'].get(phase, 0.0):.2f}秒"
+            )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在离线模拟课程上运行端到端基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 200, 1000], help="课程章节数")
+    parser.add_argument("--pdfs", type=int, default=1, help="每章PDF任务数")
+    parser.add_argument("--videos", type=int, default=1, help="每章视频任务数")
+    parser.add_argument("--video-seconds", type=float, default=1)
+    parser.add_argument("--pdf-pages", type=int, default=3)
+    parser.add_argument("--finished-ratio", type=float, default=0.0, help="预先完成的章节比例")
+    parser.add_argument("--pdf-concurrency", type=int, default=1, help="每章同时执行的PDF任务数")
+    parser.add_argument("--no-block", action="store_true", help="不拦截资源，用于对比资源拦截的效果")
+    parser.add_argument("--in-place", action="store_true", help="模拟在课程页面内切换章节的课程")
+    parser.add_argument("--scroll-step", type=float, default=0.01, help="PDF每步滚动间隔(秒)")
+    parser.add_argument("--profile", default="headless", help="浏览器启动配置")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if repo_root not in sys.path:
+        sys.path.insert(0, repo_root)
+    import main as main_module
+    from runtime.log_pipeline import setup_logging
+    # 基准测试只输出到控制台，不写日志文件
+    setup_logging(file_name=None, json_file=None)
+
+    results = [run_once(main_module, chapters, args) for chapters in args.sizes]
+    log_report(results)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
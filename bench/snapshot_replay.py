@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from selenium.webdriver.common.by import By
+
+from auth.browser_profile import BrowserProfile
+from auth.login_manager import HEADER_XPATH, LOGIN_LINK_XPATH, PASSWORD_XPATH, SUBMIT_XPATH, USERNAME_XPATH
+from page_selectors.page_selector import PageSelector
+from runtime.frame_navigator import FrameNavigator
+from runtime.log_pipeline import setup_logging
+from runtime.profiler import Profiler
+from runtime.wait_policy import WaitPolicy
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    directory = None
+
+    def log_message(self, format, *args):
+        logging.debug("snapshot: " + format % args)
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = unquote(self.path.split("?")[0]).lstrip("/")
+        if path in ("", "manifest.json"):
+            path = "manifest.json"
+        # 只提供快照目录内的文件
+        root = os.path.abspath(self.directory)
+        file_path = os.path.abspath(os.path.join(root, path))
+        if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+            return self._send("not found", status=404)
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        content_type = "application/json" if file_path.endswith(".json") else "text/html; charset=utf-8"
+        self._send(body, content_type=content_type)
+
+class SnapshotServer:
+    def __init__(self, directory, host="127.0.0.1", port=0):
+        handler = type("BoundSnapshotHandler", (SnapshotHandler,), {"directory": directory})
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json"), 'r', encoding='utf-8') as f:
+            self.captures = json.load(f)["captures"]
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def capture_url(self, capture):
+        return f"{self.base_url}{capture['id']}/frame-0.html"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"页面快照服务器已启动: {self.base_url} ({len(self.captures)} 个快照)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class SnapshotReplay:
+    def __init__(self, driver, wait_policy, batch_discovery=True):
+        self.driver = driver
+        self.wait_policy = wait_policy
+        self.navigator = FrameNavigator(driver, wait_policy)
+        self.page_selector = PageSelector(
+            driver, batch_discovery=batch_discovery,
+            wait_policy=wait_policy, navigator=self.navigator,
+        )
+        self.commands = 0
+
+    def count_command(self, command, elapsed):
+        self.commands += 1
+
+    def replay(self, capture, url):
+        """
+        打开快照并重新执行对应的页面解析，返回解析结果
+        """
+        self.page_selector.open_course_page(url)
+        handler = getattr(self, f"_replay_{capture['kind']}")
+        return handler()
+
+    def _replay_home(self):
+        return self._check_xpaths({"header": HEADER_XPATH, "login_link": LOGIN_LINK_XPATH})
+
+    def _replay_login(self):
+        return self._check_xpaths({"username": USERNAME_XPATH, "password": PASSWORD_XPATH, "submit": SUBMIT_XPATH})
+
+    def _check_xpaths(self, xpaths):
+        return {name: bool(self.driver.find_elements(By.XPATH, xpath)) for name, xpath in xpaths.items()}
+
+    def _replay_course(self):
+        selector = self.page_selector
+        selector.initialize_unfinished_chapters()
+        return {"chapters": len(selector.catalogue or ()), "unfinished": len(selector.unfinished_chapters)}
+
+    def _replay_chapter(self):
+        self.page_selector.wait_chapter_loaded()
+        task_types = [task.type for task in self.page_selector.find_all_tasks()]
+        return {"tasks": {task_type: task_types.count(task_type) for task_type in set(task_types)}}
+
+def expected_matches(result, expected):
+    """
+    回放结果与录制时的结果是否一致；首页和登录页要求登录相关的元素都能找到
+    """
+    if expected:
+        return all(result.get(key) == value for key, value in expected.items())
+    return all(value for name, value in result.items() if name != "login_link")
+
+def run_replay(directory, rounds=3, profile="headless", timeout=5, batch_discovery=True, kinds=None):
+    results = []
+    with SnapshotServer(directory) as server:
+        profiler = Profiler(enabled=False)
+        driver = BrowserProfile.from_config({"profile": profile, "user_data_dir": None}).launch()
+        try:
+            # 只统计命令次数，剖析器本身保持关闭
+            replay = SnapshotReplay(driver, WaitPolicy(driver, default_timeout=timeout), batch_discovery)
+            profiler.observers.append(replay.count_command)
+            profiler.attach(driver)
+            for capture in server.captures:
+                if kinds and capture["kind"] not in kinds:
+                    continue
+                timings = []
+                commands = 0
+                result = None
+                error = None
+                for _ in range(rounds):
+                    replay.commands = 0
+                    start = time.perf_counter()
+                    try:
+                        result = replay.replay(capture, server.capture_url(capture))
+                    except Exception as e:
+                        error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                        break
+                    timings.append(time.perf_counter() - start)
+                    commands = replay.commands
+                results.append({
+                    "id": capture["id"],
+                    "kind": capture["kind"],
+                    "label": capture["label"],
+                    "seconds": sorted(timings)[len(timings) // 2] if timings else None,
+                    "commands": commands,
+                    "result": result,
+                    "expected": capture.get("expected", {}),
+                    "ok": error is None and result is not None and expected_matches(result, capture.get("expected")),
+                    "error": error,
+                })
+        finally:
+            driver.quit()
+    return results
+
+def log_report(results):
+    logging.info("快照回放结果:")
+    for result in results:
+        status = "一致" if result["ok"] else "不一致"
+        if result["error"]:
+            status = f"出错: {result['error']}"
+        seconds = f"{result['seconds'] * 1000:.0f}ms" if result["seconds"] is not None else "-"
+        logging.info(
+            f"- {result['id']} {result['label']}: {seconds}，WebDriver命令 {result['commands']} 次，"
+            f"结果 {result['result']}，录制时 {result['expected']}，{status}"
+        )
+    failed = [result for result in results if not result["ok"]]
+    logging.info(f"共回放 {len(results)} 个快照，{len(failed)} 个与录制时不一致")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在本地回放录制的页面快照，离线检查并计时章节扫描和任务发现")
+    parser.add_argument("directory", nargs="?", default="snapshots", help="快照目录")
+    parser.add_argument("--rounds", type=int, default=3, help="每个快照回放次数，取中位数")
+    parser.add_argument("--profile", default="headless", help="浏览器启动配置")
+    parser.add_argument("--timeout", type=float, default=5, help="等待页面元素的超时(秒)")
+    parser.add_argument("--legacy", action="store_true", help="使用逐个元素查询的任务发现方式")
+    parser.add_argument("--kind", action="append", choices=["home", "login", "course", "chapter"],
+                        help="只回放指定类型的快照，可重复")
+    parser.add_argument("--serve", action="store_true", help="只启动快照服务器，便于在浏览器中查看")
+    parser.add_argument("--port", type=int, default=0, help="--serve 时的端口")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    setup_logging(file_name=None, json_file=None)
+
+    if args.serve:
+        with SnapshotServer(args.directory, port=args.port) as server:
+            for capture in server.captures:
+                logging.info(f"{capture['id']} {capture['label']}: {server.capture_url(capture)}")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                return 0
+
+    results = run_replay(
+        args.directory, rounds=args.rounds, profile=args.profile, timeout=args.timeout,
+        batch_discovery=not args.legacy, kinds=args.kind,
+    )
+    log_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if all(result["ok"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+# 冷启动计时从这里开始；selenium和各执行器只在需要浏览器的子命令中才导入
+START = time.perf_counter()
+
+from runtime.config import (
+    OPTIONS, apply_overrides, load_config, option_dest, option_env, option_flag, parse_bool, parse_list, parse_wait,
+    validate_config,
+)
+
+def add_config_options(parser):
+    parser.add_argument("--config", help="配置文件路径，默认 config.json，也可用环境变量 MOOC_CONFIG 指定")
+    group = parser.add_argument_group("配置项", "命令行参数优先于环境变量，环境变量优先于配置文件")
+    for path, kind, description in OPTIONS:
+        help_text = f"{description}（环境变量 {option_env(path)}）"
+        if kind is bool:
+            group.add_argument(
+                option_flag(path), dest=option_dest(path), nargs="?", const=True, type=parse_bool,
+                metavar="true|false", help=help_text,
+            )
+        elif kind is list:
+            group.add_argument(
+                option_flag(path), dest=option_dest(path), type=parse_list, metavar="A,B", help=help_text,
+            )
+        else:
+            group.add_argument(option_flag(path), dest=option_dest(path), type=kind, help=help_text)
+    group.add_argument(
+        "--wait", action="append", type=parse_wait, metavar="名称=秒数",
+        help="固定某个等待的超时或阅读节奏，可重复（环境变量 MOOC_WAITS_名称）",
+    )
+    parser.add_argument("--no-wait", action="store_true", help="结束后直接退出，不等待回车")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="UCAS MOOC 自动化工具")
+    subparsers = parser.add_subparsers(dest="command", metavar="命令")
+
+    run_parser = subparsers.add_parser("run", help="完成课程中所有未完成的任务")
+    add_config_options(run_parser)
+
+    plan_parser = subparsers.add_parser("plan", help="遍历课程生成执行计划，不执行任务")
+    add_config_options(plan_parser)
+    plan_parser.add_argument("--output", default="plan.json", help="执行计划输出路径")
+
+    orchestrate_parser = subparsers.add_parser(
+        "orchestrate", help="在一个进程中异步运行多门课程，带任务期限和浏览器心跳",
+    )
+    add_config_options(orchestrate_parser)
+
+    validate_parser = subparsers.add_parser("validate-config", help="检查配置文件和环境变量，不启动浏览器")
+    add_config_options(validate_parser)
+
+    subparsers.add_parser(
+        "bench", help="在离线模拟课程上运行基准测试，其余参数交给 bench.run_benchmark", add_help=False,
+    )
+    subparsers.add_parser(
+        "replay", help="回放录制的页面快照，其余参数交给 bench.snapshot_replay", add_help=False,
+    )
+    return parser
+
+def resolve_config(args):
+    config = load_config(args.config)
+    return apply_overrides(config, vars(args))
+
+def log_startup(command):
+    logging.info(f"{command} 启动用时 {(time.perf_counter() - START) * 1000:.0f}ms")
+
+def wait_on_exit(args):
+    # 输入不是终端（计划任务、批处理）时不可能等到回车
+    return not args.no_wait and sys.stdin.isatty()
+
+def command_run(args):
+    config = resolve_config(args)
+    problems = validate_config(config)
+    if problems:
+        for problem in problems:
+            print(f"配置错误: {problem}", file=sys.stderr)
+        return 2
+
+    import main
+    main.configure(config)
+    main.configure_logging()
+    log_startup("run")
+    logging.info("程序开始运行...")
+    automation = main.MoocAutomation()
+    stats = automation.run(wait_on_exit=wait_on_exit(args))
+    logging.info("程序结束运行")
+    return 1 if stats["error"] else 0
+
+def command_plan(args):
+    config = resolve_config(args)
+    problems = validate_config(config)
+    if problems:
+        for problem in problems:
+            print(f"配置错误: {problem}", file=sys.stderr)
+        return 2
+
+    import main
+    main.configure(config)
+    main.configure_logging()
+    log_startup("plan")
+    automation = main.MoocAutomation()
+    plan = automation.plan(output=args.output, wait_on_exit=wait_on_exit(args))
+    return 0 if plan is not None else 1
+
+def command_orchestrate(args):
+    config = resolve_config(args)
+    problems = validate_config(config)
+    if problems:
+        for problem in problems:
+            print(f"配置错误: {problem}", file=sys.stderr)
+        return 2
+
+    import main
+    main.configure(config)
+    main.configure_logging()
+    import async_orchestrator
+    log_startup("orchestrate")
+    results = async_orchestrator.run_configured()
+    return 1 if not results or any(stats["error"] for stats in results) else 0
+
+def command_validate_config(args):
+    config = resolve_config(args)
+    problems = validate_config(config)
+    for problem in problems:
+        print(f"配置错误: {problem}", file=sys.stderr)
+    if not problems:
+        source = args.config or os.environ.get("MOOC_CONFIG", "config.json")
+        print(f"配置有效: {source}")
+    print(f"validate-config 启动用时 {(time.perf_counter() - START) * 1000:.0f}ms", file=sys.stderr)
+    return 1 if problems else 0
+
+def command_bench(argv):
+    from bench import run_benchmark
+    return run_benchmark.main(argv)
+
+def command_replay(argv):
+    from bench import snapshot_replay
+    return snapshot_replay.main(argv)
+
+COMMANDS = {
+    "run": command_run,
+    "plan": command_plan,
+    "orchestrate": command_orchestrate,
+    "validate-config": command_validate_config,
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["bench"]:
+        return command_bench(argv[1:])
+    if argv[:1] == ["replay"]:
+        return command_replay(argv[1:])
+    if not argv or argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        # 不带子命令时默认运行
+        argv = ["run"] + argv
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
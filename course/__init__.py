@@ -0,0 +1,3 @@
+"""
+课程模型模块
+"""
\ No newline at end of file
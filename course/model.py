@@ -0,0 +1,90 @@
+import sys
+
+from selenium.webdriver.common.by import By
+
+# 任务、章节和课程的紧凑记录，只保存从页面读出的值，不持有WebElement，页面跳转后仍然有效
+
+class Task:
+    __slots__ = ("index", "type", "title", "is_finished", "key", "xpath", "duration")
+
+    def __init__(self, index, type, title="", is_finished=False, key="", xpath="", duration=None):
+        self.index = index
+        # 类型只有少数几种取值，驻留后所有任务共用同一个字符串对象
+        self.type = sys.intern(type)
+        self.title = title
+        self.is_finished = is_finished
+        # 任务发现脚本给iframe打上的 data-mooc-task 标记，为空时只能按XPath定位
+        self.key = key
+        self.xpath = xpath
+        # 视频时长（秒），仅在生成执行计划时探测
+        self.duration = duration
+
+    @property
+    def locator(self):
+        if self.key:
+            return (By.CSS_SELECTOR, f'iframe[data-mooc-task="{self.key}"]')
+        return (By.XPATH, self.xpath)
+
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "type": self.type,
+            "title": self.title,
+            "is_finished": self.is_finished,
+            "duration": self.duration,
+        }
+
+    def __repr__(self):
+        return f"Task({self.index}, {self.type!r}, finished={self.is_finished})"
+
+class Chapter:
+    __slots__ = ("position", "title", "onclick", "finished", "tasks")
+
+    def __init__(self, position, title, onclick, finished=False, tasks=None):
+        # position 为章节在 chapter_item 列表中的位置，onclick 是章节的唯一标识
+        self.position = position
+        self.title = title
+        self.onclick = onclick
+        self.finished = finished
+        # 尚未扫描任务时为None
+        self.tasks = tasks
+
+    @classmethod
+    def from_snapshot(cls, raw):
+        return cls(raw["position"], raw["title"], raw["onclick"], raw["finished"])
+
+    def to_dict(self):
+        return {
+            "position": self.position,
+            "title": self.title,
+            "onclick": self.onclick,
+            "finished": self.finished,
+            "tasks": None if self.tasks is None else [task.to_dict() for task in self.tasks],
+        }
+
+    def __repr__(self):
+        return f"Chapter({self.position}, {self.title!r}, finished={self.finished})"
+
+class Course:
+    __slots__ = ("url", "chapters")
+
+    def __init__(self, url, chapters=None):
+        self.url = url
+        self.chapters = chapters or []
+
+    def unfinished(self):
+        return [chapter for chapter in self.chapters if not chapter.finished]
+
+    def tasks(self):
+        """
+        依次返回已扫描章节中的所有任务
+        """
+        for chapter in self.chapters:
+            for task in chapter.tasks or ():
+                yield chapter, task
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "chapters": [chapter.to_dict() for chapter in self.chapters],
+        }
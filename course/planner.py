@@ -0,0 +1,104 @@
+import json
+import logging
+import time
+
+from .model import Course
+
+class CoursePlanner:
+    def __init__(self, page_selector, executors):
+        self.page_selector = page_selector
+        # 任务类型 -> 执行器，用于在不执行任务的情况下估计任务耗时
+        self.executors = executors
+        # 每个章节打开并扫描任务所用的秒数，用来估计实际运行时的导航开销
+        self.navigation_seconds = []
+
+    def plan(self, course_url):
+        """
+        打开课程的每个未完成章节并扫描任务，返回带有任务和时长估计的课程模型，不执行任何任务
+        """
+        selector = self.page_selector
+        selector.open_course_page(course_url)
+        selector.initialize_unfinished_chapters()
+        course = Course(course_url, selector.catalogue.chapters if selector.catalogue else [])
+
+        for chapter in course.unfinished():
+            start = time.time()
+            try:
+                if not selector.click_chapter(chapter):
+                    logging.error(f"无法找到章节: {chapter.title}")
+                    continue
+                selector.wait_chapter_loaded()
+                chapter.tasks = selector.find_all_tasks()
+                self.navigation_seconds.append(time.time() - start)
+                for task in chapter.tasks:
+                    if not task.is_finished:
+                        self._estimate(task)
+            except Exception as e:
+                logging.error(f"扫描章节 {chapter.title} 时出错: {str(e)}")
+            if not selector.shell_alive():
+                selector.open_course_page(course_url)
+        return course
+
+    def _estimate(self, task):
+        executor = self.executors.get(task.type)
+        if executor is None:
+            return
+        try:
+            task.duration = executor.estimate(task)
+        except Exception as e:
+            logging.warning(f"估计任务 {task.title} 的时长时出错: {str(e)}")
+
+    def summarize(self, course):
+        """
+        汇总任务数量、视频时长和预计总用时
+        """
+        pending_chapters = course.unfinished()
+        task_counts = {}
+        pending_counts = {}
+        video_seconds = 0.0
+        task_seconds = 0.0
+        unknown = 0
+        for _, task in course.tasks():
+            task_counts[task.type] = task_counts.get(task.type, 0) + 1
+            if task.is_finished:
+                continue
+            pending_counts[task.type] = pending_counts.get(task.type, 0) + 1
+            if task.duration is None:
+                unknown += 1
+                continue
+            task_seconds += task.duration
+            if task.type == "video":
+                video_seconds += task.duration
+
+        navigation = (
+            sum(self.navigation_seconds) / len(self.navigation_seconds) if self.navigation_seconds else 0.0
+        )
+        return {
+            "chapters": len(course.chapters),
+            "chapters_pending": len(pending_chapters),
+            "tasks": task_counts,
+            "tasks_pending": pending_counts,
+            "tasks_without_estimate": unknown,
+            "video_seconds": round(video_seconds, 1),
+            "navigation_seconds_per_chapter": round(navigation, 2),
+            "estimated_seconds": round(task_seconds + navigation * len(pending_chapters), 1),
+        }
+
+    def write(self, course, file_name):
+        summary = self.summarize(course)
+        plan = {
+            "generated": time.time(),
+            "summary": summary,
+            "course": course.to_dict(),
+        }
+        with open(file_name, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, ensure_ascii=False, indent=2)
+        logging.info(
+            f"执行计划已写入 {file_name}: 待完成章节 {summary['chapters_pending']} 个，"
+            f"待完成任务 {sum(summary['tasks_pending'].values())} 个，"
+            f"视频 {summary['video_seconds'] / 60:.1f} 分钟，"
+            f"预计用时 {summary['estimated_seconds'] / 60:.1f} 分钟"
+        )
+        if summary["tasks_without_estimate"]:
+            logging.info(f"{summary['tasks_without_estimate']} 个任务无法估计时长，未计入预计用时")
+        return plan
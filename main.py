@@ -1,44 +1,321 @@
 import logging
+import os
+import sys
 import traceback
-import json
-from auth.login_manager import LoginManager
+import time
+from auth.browser_profile import BrowserProfile
+from auth.login_manager import HOME_URL, LoginManager
+from auth.session_store import SessionStore
+from course.planner import CoursePlanner
+from page_selectors.chapter_prefetcher import ChapterPrefetcher
 from page_selectors.page_selector import PageSelector
+from progress.journal import ProgressJournal
+from runtime.frame_navigator import FrameNavigator
+from runtime.log_pipeline import log_event, setup_logging
+from runtime.memory_watchdog import MemoryWatchdog
+from runtime.metrics import MetricsServer, RunMetrics
+from runtime.config import load_config
+from runtime.profiler import Profiler
+from runtime.resource_policy import ResourcePolicy
+from runtime.snapshot_recorder import SnapshotRecorder
+from runtime.supervisor import RESTART_KINDS, Supervisor
 from tasks.pdf_executor import PDFExecutor
+from tasks.pdf_tab_runner import PDFTabRunner
+from tasks.playback_monitor import PlaybackStalled
+from tasks.task_executor import TaskFailed
 from tasks.video_executor import VideoExecutor
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('mooc.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-# 从config.json文件中加载配置
-with open('config.json', 'r', encoding='utf-8') as config_file:
-    config_data = json.load(config_file)
+
+# 运行配置，首次使用时才从config.json和环境变量中加载
+config_data = {}
+
+def configure(config=None):
+    """
+    设置运行配置；不传参数时读取config.json并应用环境变量覆盖
+    """
+    config_data.clear()
+    config_data.update(load_config() if config is None else config)
+    return config_data
+
+def configure_logging():
+    """
+    按配置启动日志：写文件和控制台都在后台线程中完成
+    """
+    logging_config = config_data.get('logging', {})
+    setup_logging(
+        file_name=logging_config.get('file', 'mooc.log'),
+        json_file=logging_config.get('json_file', 'mooc.jsonl'),
+        max_bytes=logging_config.get('max_bytes', 10 * 1024 * 1024),
+        backup_count=logging_config.get('backup_count', 3),
+        level=logging_config.get('level', 'INFO'),
+    )
+
+def with_suffix(path, suffix):
+    """
+    在文件扩展名之前（目录则在末尾）加上后缀，同时运行的多个浏览器各自写入不同的位置
+    """
+    if not suffix:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{suffix}{ext}"
+
+def create_login_manager(profile=None, profiler=None):
+    """
+    按配置文件创建登录管理器
+    """
+    if profile is None:
+        profile = BrowserProfile.from_config(config_data.get('browser'))
+    # 预取窗口和PDF标签页工作时视频所在的窗口不在前台，需要避免后台窗口被暂停或降频
+    if config_data.get('prefetch', {}).get('enabled', True) or config_data.get('pdf_concurrency', 1) > 1:
+        profile = profile.with_options(keep_background_active=True)
+    resources_config = config_data.get('resources', {})
+    if resources_config.get('enabled', True) or resources_config.get('measure', False):
+        # 按章节统计拦截数和流量都来自网络日志；在副本上开启，不修改调用方共用的启动配置
+        profile = profile.with_options(network_log=True)
+    return LoginManager(
+        profile,
+        session_store=SessionStore(config_data.get('cookies_file', 'cookies.json')),
+        wait_overrides=config_data.get('waits'),
+        home_url=config_data.get('home_url', HOME_URL),
+        profiler=profiler,
+    )
+
+class Call:
+    """
+    课程流程中的一次阻塞调用（多为WebDriver命令），由驱动方决定在哪个线程中执行
+    """
+    __slots__ = ("fn", "args", "phase")
+
+    def __init__(self, fn, *args, phase=None):
+        self.fn = fn
+        self.args = args
+        # 剖析器中的阶段，None表示沿用当前阶段
+        self.phase = phase
+
+class TaskCall:
+    """
+    执行一个任务，结果为 done，或由驱动方给出的其他结果（例如超过期限时的 deadline）
+    """
+    __slots__ = ("task", "executor")
+
+    def __init__(self, task, executor):
+        self.task = task
+        self.executor = executor
+
+def drive_steps(steps, dispatch):
+    """
+    同步驱动课程流程：依次执行交出的调用，把结果或异常送回流程，返回流程的返回值
+    """
+    value, error = None, None
+    try:
+        while True:
+            try:
+                call = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                value, error = dispatch(call), None
+            except Exception as e:
+                value, error = None, e
+    finally:
+        steps.close()
 
 class MoocAutomation:
-    def __init__(self):
+    def __init__(self, profile=None, background_pages=True, output_suffix=None):
+        if not config_data:
+            configure()
         # 配置选项
         self.config = {
-            "skip_finished": True,  # 是否跳过已完成的任务
-            "skip_pdf": False,  # 是否跳过PDF任务
-            "skip_video": False,  # 是否跳过视频任务
+            "skip_finished": config_data.get('skip_finished', True),  # 是否跳过已完成的任务
+            "skip_pdf": config_data.get('skip_pdf', False),  # 是否跳过PDF任务
+            "skip_video": config_data.get('skip_video', False),  # 是否跳过视频任务
+            # 是否在已加载的课程页面内切换章节，而不是每章结束后重新加载课程页面
+            "in_place_navigation": config_data.get('in_place_navigation', True),
         }
-        self.login_manager = LoginManager()
+        # 并发运行时剖析结果和页面快照按该后缀分开写入，与浏览器用户数据目录的后缀相同
+        self.output_suffix = output_suffix
+        profiler_config = config_data.get('profiler', {})
+        self.profiler = Profiler(enabled=profiler_config.get('enabled', True))
+        recovery_config = config_data.get('recovery', {})
+        self.supervisor = Supervisor(
+            max_attempts=recovery_config.get('max_attempts', 3),
+            base_delay=recovery_config.get('base_delay', 2),
+            max_delay=recovery_config.get('max_delay', 60),
+        )
+        # 章节之间检查浏览器内存，超过上限或处理了指定数量的章节后回收浏览器
+        memory_config = config_data.get('memory', {})
+        self.memory_watchdog = None
+        if memory_config.get('enabled', True):
+            self.memory_watchdog = MemoryWatchdog(
+                high_watermark_mb=memory_config.get('high_watermark_mb', 1500),
+                recycle_every=memory_config.get('recycle_every', 0),
+            )
+        # 可选的指标服务：Prometheus格式的计数和直方图，以及JSON运行状态
+        metrics_config = config_data.get('metrics', {})
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_config.get('enabled', False):
+            self.metrics = RunMetrics(plan_file=metrics_config.get('plan_file', 'plan.json'))
+            # WebDriver命令耗时来自剖析器的命令通道，需在启动浏览器之前注册
+            self.profiler.observers.append(self.metrics.webdriver_command)
+            self.metrics_server = MetricsServer(
+                self.metrics,
+                host=metrics_config.get('host', '127.0.0.1'),
+                port=metrics_config.get('port', 9108),
+            )
+        # 录制模式：把访问到的每个页面及其frame保存为脱敏的快照，供离线回放
+        snapshot_config = config_data.get('snapshots', {})
+        self.snapshot_recorder = None
+        if snapshot_config.get('record', False):
+            self.snapshot_recorder = SnapshotRecorder(
+                None,
+                directory=with_suffix(snapshot_config.get('directory', 'snapshots'), output_suffix),
+                redact=[config_data.get('username')] + snapshot_config.get('redact', []),
+            )
+        self.profile = profile
+        # 是否使用预取窗口和PDF标签页；异步会话中它们会在进度回调里长时间占用WebDriver线程，不使用
+        self.background_pages = background_pages
+        self.stats = {}
+        self._build_session()
+
+    def _build_session(self):
+        """
+        启动浏览器并创建依赖driver的各个模块
+        """
+        self.login_manager = create_login_manager(self.profile, self.profiler)
         self.driver = self.login_manager.get_driver()
-        self.wait = self.login_manager.wait
-        self.page_selector = PageSelector(self.driver, self.wait)
-        self.pdf_executor = PDFExecutor(self.driver, self.wait)
-        self.video_executor = VideoExecutor(self.driver, self.wait)
+        self.wait_policy = self.login_manager.wait_policy
+        if self.memory_watchdog is not None:
+            self.memory_watchdog.attach(self.driver, self.stats.get("chapters", 0))
+        if self.snapshot_recorder is not None:
+            self.snapshot_recorder.driver = self.driver
+            self.login_manager.page_hooks.append(self._record_snapshot)
+        # 拦截执行器不需要的资源，登录前就生效
+        resources_config = config_data.get('resources', {})
+        self.resource_policy = None
+        blocking = resources_config.get('enabled', True)
+        if blocking or resources_config.get('measure', False):
+            # 关闭拦截但开启统计时，不拦截任何资源，只统计流量
+            self.resource_policy = ResourcePolicy(
+                self.driver,
+                blocked_urls=resources_config.get('block') if blocking else [],
+                measure=resources_config.get('measure', False),
+            )
+            if blocking:
+                self.resource_policy.blocked_urls.extend(resources_config.get('extra_block', []))
+            self.resource_policy.apply()
+        # 所有模块共用一个frame导航器，跨模块记住当前所在的frame
+        self.navigator = FrameNavigator(self.driver, self.wait_policy)
+        self.page_selector = PageSelector(self.driver, wait_policy=self.wait_policy, navigator=self.navigator)
+        self.pdf_executor = PDFExecutor(self.driver, self.wait_policy, self.navigator)
+        self.video_executor = VideoExecutor(
+            self.driver, self.wait_policy, self.navigator,
+            progress_refresh=config_data.get('logging', {}).get('progress_refresh', 1.0),
+            stall_window=config_data.get('video', {}).get('stall_window', 30),
+            max_stall_attempts=config_data.get('video', {}).get('max_stall_attempts', 3),
+            reload_timeout=config_data.get('video', {}).get('reload_timeout', 60),
+        )
+        if self.metrics is not None:
+            self.video_executor.playback_hooks.append(self.metrics.video_progress)
+        self.executors = {
+            "pdf": self.pdf_executor,
+            "video": self.video_executor,
+        }
+        # 同一章节中的多个PDF任务在各自的标签页中交替执行
+        pdf_concurrency = config_data.get('pdf_concurrency', 1)
+        self.pdf_tab_runner = None
+        if self.background_pages and pdf_concurrency > 1:
+            self.pdf_tab_runner = PDFTabRunner(
+                self.driver, self.wait_policy, self.navigator, concurrency=pdf_concurrency,
+                resource_policy=self.resource_policy,
+            )
 
-    def run(self, username=None, password=None, course_url=None):
+        # 视频播放期间在另一个窗口预取下一章节的任务列表
+        prefetch_config = config_data.get('prefetch', {})
+        self.prefetcher = None
+        if self.background_pages and prefetch_config.get('enabled', True):
+            self.prefetcher = ChapterPrefetcher(
+                self.driver,
+                self.wait_policy,
+                self.navigator,
+                lambda navigator: PageSelector(self.driver, wait_policy=self.wait_policy, navigator=navigator),
+                min_remaining=prefetch_config.get('min_remaining', 30),
+                resource_policy=self.resource_policy,
+            )
+            self.video_executor.progress_hooks.append(self._prefetch_step)
+
+    def _rebuild_session(self):
+        """
+        关闭已失效的浏览器并重新启动，保留等待和frame切换的统计
+        """
+        logging.warning("重建浏览器会话...")
+        wait_stats = self.wait_policy.stats
+        frame_stats = self.navigator.stats()
+        resource_policy = self.resource_policy
+        video_reports = self.video_executor.reports
+        try:
+            self.login_manager.close()
+        except Exception as e:
+            logging.debug(f"关闭失效的浏览器时出错: {str(e)}")
+        self._build_session()
+        self.wait_policy.stats = wait_stats
+        self.video_executor.reports = video_reports
+        for name, value in frame_stats.items():
+            setattr(self.navigator, name, value)
+        if resource_policy is not None and self.resource_policy is not None:
+            self.resource_policy.total = resource_policy.total
+            self.resource_policy.chapters = resource_policy.chapters
+
+    def _recycle_browser(self, username, password, course_url):
+        """
+        保存cookies后重启浏览器，重新登录并回到课程中的当前位置
+        """
+        self.login_manager.save_cookies(self.driver.get_cookies())
+        selector = self.page_selector
+        self._rebuild_session()
+        self.memory_watchdog.recycles += 1
+        with self.profiler.phase("login"):
+            self.login_manager.login(username, password)
+        with self.profiler.phase("navigation"):
+            self.page_selector.open_course_page(course_url)
+        # 章节目录和处理进度沿用回收前的状态，下一个章节直接点击
+        self.page_selector.catalogue = selector.catalogue
+        self.page_selector.unfinished_chapters = selector.unfinished_chapters
+        self.page_selector.current_chapter_index = selector.current_chapter_index
+        self.memory_watchdog.sample("recycled")
+
+    def _record_snapshot(self, kind, label="", expected=None):
+        """
+        录制当前页面的快照；录制失败不影响运行
+        """
+        try:
+            if kind == "home":
+                # 登录后的页头显示用户姓名，和账号一样从所有快照中抹去
+                self.snapshot_recorder.add_redaction(self.login_manager.profile_name())
+            self.snapshot_recorder.capture(kind, label, expected)
+        except Exception as e:
+            logging.warning(f"录制页面快照失败: {str(e)}")
+        # 录制时切换过frame
+        self.navigator.invalidate()
+
+    def _recover(self, kind):
+        """
+        故障恢复：浏览器会话不可用时重建浏览器，其余情况放弃预取后重新打开课程页面即可
+        """
+        if kind in RESTART_KINDS:
+            self._rebuild_session()
+            return
+        if self.prefetcher is not None:
+            try:
+                self.prefetcher.cancel()
+            except Exception as e:
+                logging.debug(f"放弃预取时出错: {str(e)}")
+        self.navigator.invalidate()
+
+    def run(self, username=None, password=None, course_url=None, wait_on_exit=True):
+        self.stats = self._new_stats(course_url)
+        run_start = time.time()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
         try:
             # 从配置文件中获取参数
             if username is None:
@@ -47,67 +324,356 @@ class MoocAutomation:
                 password = config_data.get('password')
             if course_url is None:
                 course_url = config_data.get('course_url')
+            self.stats["course_url"] = course_url
+            if self.metrics is not None:
+                self.metrics.course_started(course_url)
 
-            # 登录
-            self.login_manager.login(username, password)
+            # 见 Supervisor.run
+            self.supervisor.run(
+                lambda: self._run_course(username, password, course_url),
+                self._recover,
+            )
 
-            # 打开课程页面
-            if course_url is None:
-                course_url = config_data.get('course_url')
-            self.page_selector.open_course_page(course_url)
+        except Exception as e:
+            logging.error(f"程序运行出错: {str(e)}")
+            logging.debug(traceback.format_exc())
+            self.stats["error"] = str(e)
+        finally:
+            self._finish_stats(run_start)
+            if wait_on_exit:
+                input("按回车键退出...")
+            try:
+                self.login_manager.close()
+            except Exception as e:
+                logging.debug(f"关闭浏览器时出错: {str(e)}")
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+        return self.stats
+
+    @staticmethod
+    def _new_stats(course_url):
+        # 运行统计，供多课程调度器汇总吞吐量
+        return {
+            "course_url": course_url,
+            "chapters": 0,
+            "chapters_prefetched": 0,
+            "tasks_done": 0,
+            "tasks_failed": 0,
+            "elapsed": 0.0,
+            "error": None,
+            "recoveries": 0,
+            "recovery_seconds": 0.0,
+            # 并发执行的PDF任务实际用时，以及这些任务各自耗时之和（即逐个执行时的大致用时）
+            "pdf_parallel_seconds": 0.0,
+            "pdf_sequential_seconds": 0.0,
+        }
+
+    def _finish_stats(self, run_start):
+        """
+        运行结束：汇总各模块的统计并写出剖析结果
+        """
+        self.stats["elapsed"] = time.time() - run_start
+        self.stats.update(self.supervisor.summary())
+        if self.metrics is not None:
+            self.metrics.finished(self.stats["error"])
+        if self.stats["recoveries"]:
+            logging.info(
+                f"共从故障中恢复 {self.stats['recoveries']} 次，"
+                f"恢复用时 {self.stats['recovery_seconds']:.1f}秒，故障: {self.stats['failures']}"
+            )
+        if self.resource_policy is not None:
+            self.stats["resources"] = self.resource_policy.summary()
+        if self.memory_watchdog is not None:
+            self.stats["memory"] = self.memory_watchdog.summary()
+        self.stats["videos"] = self.video_executor.playback_summary()
+        if self.stats["videos"]["videos"]:
+            logging.info(
+                f"视频 {self.stats['videos']['videos']} 个: 播放 {self.stats['videos']['play_seconds']:.0f}秒，"
+                f"停滞 {self.stats['videos']['stall_seconds']:.0f}秒，恢复 {self.stats['videos']['recoveries']} 次，"
+                f"放弃 {self.stats['videos']['stalled']} 个"
+            )
+        self.stats["waits"] = self.wait_policy.summary()
+        self.stats["frames"] = self.navigator.stats()
+        logging.info(
+            f"frame切换 {self.stats['frames']['switches']} 次，"
+            f"避免了 {self.stats['frames']['switches_avoided']} 次切换和 "
+            f"{self.stats['frames']['lookups_avoided']} 次frame查找"
+        )
+        self.stats["commands"] = self.profiler.report()["command_counts"]
+        self.wait_policy.log_stats()
+        profiler_config = config_data.get('profiler', {})
+        self.profiler.write(
+            with_suffix(profiler_config.get('output', 'profile.json'), self.output_suffix),
+            with_suffix(profiler_config.get('folded_output', 'profile.folded'), self.output_suffix),
+        )
+
+    def _run_course(self, username, password, course_url):
+        """
+        登录并处理课程中所有未完成的章节；从故障中恢复后会被再次调用
+        """
+        return drive_steps(self._course_steps(username, password, course_url), self._dispatch)
 
-            # 初始化未完成章节列表
-            if not self.page_selector.initialize_unfinished_chapters():
-                logging.info("没有找到任何未完成的章节")
-                return
+    def _dispatch(self, call):
+        """
+        在当前线程中执行课程流程交出的调用
+        """
+        if isinstance(call, TaskCall):
+            with self.profiler.phase(call.task.type):
+                call.executor.execute(call.task)
+            return "done"
+        if call.phase is None:
+            return call.fn(*call.args)
+        with self.profiler.phase(call.phase):
+            return call.fn(*call.args)
 
-            while True:
+    def _course_steps(self, username, password, course_url):
+        """
+        课程流程：每个阻塞调用以 Call / TaskCall 的形式交出，结果由驱动方通过send送回、异常通过throw抛回
+        同步运行时由 _run_course 在当前线程中执行，异步会话（async_orchestrator）把它们交给WebDriver线程池
+        """
+        # 登录
+        yield Call(self.login_manager.login, username, password, phase="login")
+
+        # 打开课程页面
+        yield Call(self.page_selector.open_course_page, course_url, phase="navigation")
+
+        # 恢复进度日志
+        journal = ProgressJournal(course_url, config_data.get('journal_file', 'progress.jsonl'))
+
+        # 初始化未完成章节列表，跳过进度日志中已确认完成的章节
+        yield Call(self.page_selector.initialize_unfinished_chapters, phase="chapter_scan")
+        if self.snapshot_recorder is not None:
+            yield Call(self._record_snapshot, "course", "", {
+                "chapters": len(self.page_selector.catalogue or ()),
+                "unfinished": len(self.page_selector.unfinished_chapters),
+            })
+        pending = journal.pending_chapters(self.page_selector.unfinished_chapters)
+        skipped = len(self.page_selector.unfinished_chapters) - len(pending)
+        if skipped:
+            logging.info(f"根据进度日志跳过 {skipped} 个已完成章节")
+        self.page_selector.unfinished_chapters = pending
+        if self.metrics is not None:
+            self.metrics.chapters_pending(pending)
+        if not pending:
+            logging.info("没有找到任何未完成的章节")
+            return
+        if self.resource_policy is not None:
+            # 登录和章节扫描的流量不计入第一个章节
+            yield Call(self.resource_policy.collect)
+
+        prefetched = None
+        while True:
+            chapter_start = time.time()
+            if prefetched is not None:
+                # 下一章节已在预取窗口中打开并完成了任务扫描
+                chapter, tasks = prefetched
+                self.page_selector.mark_chapter_opened(chapter)
+                self.stats["chapters_prefetched"] += 1
+            else:
                 # 尝试点击下一个未完成的章节
-                if not self.page_selector.click_next_unfinished_chapter():
+                if not (yield Call(self.page_selector.click_next_unfinished_chapter, phase="chapter_scan")):
                     logging.info("所有章节已处理完毕")
                     break
+                chapter = self.page_selector.current_chapter
+                tasks = None
 
-                # 等待页面加载
-                self.wait.until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "prev_title_pos"))
+            if self.metrics is not None:
+                self.metrics.chapter_started(chapter)
+                self.metrics.chapters_pending(
+                    self.page_selector.unfinished_chapters[self.page_selector.current_chapter_index:]
                 )
 
-                # 查找所有任务
-                tasks = self.page_selector.find_all_tasks()
-
-                # 执行任务
-                for task in tasks:
-                    # 如果配置为跳过已完成任务，且当前任务已完成，则跳过
-                    if self.config["skip_finished"] and task["is_finished"]:
-                        logging.info(f"跳过已完成的任务: {task.get('title', '未知任务')}")
-                        continue
-                    if self.config["skip_pdf"] and task["type"] == "pdf":
-                        logging.info(f"跳过PDF任务: {task.get('title', '未知任务')}")
-                        continue
-                    if self.config["skip_video"] and task["type"] == "video":
-                        logging.info(f"跳过视频任务: {task.get('title', '未知任务')}")
-                        continue
-
-                    if task["type"] == "pdf":
-                        self.pdf_executor.execute(task)
-                    elif task["type"] == "video":
-                        self.video_executor.execute(task)
-
-                # 返回课程页面
-                self.page_selector.open_course_page(course_url)
+            if self.prefetcher is not None:
+                next_chapter = self.page_selector.peek_next_unfinished_chapter()
+                if next_chapter is not None:
+                    yield Call(self.prefetcher.start, next_chapter, course_url, self.page_selector.catalogue)
+
+            with self.profiler.chapter(chapter.title):
+                chapter_complete = yield from self._chapter_steps(chapter, journal, tasks)
+            status = "complete" if chapter_complete else "incomplete"
+            journal.record_chapter(chapter, status, time.time() - chapter_start)
+            log_event(
+                "chapter", f"章节结束: {chapter.title} ({status})",
+                chapter=chapter.title, outcome=status, duration=round(time.time() - chapter_start, 3),
+            )
+            self.stats["chapters"] += 1
+            self.supervisor.progressed()
+            if self.metrics is not None:
+                self.metrics.chapter_done(chapter, status)
+            if self.resource_policy is not None:
+                yield Call(self.resource_policy.chapter_done, chapter.title)
+
+            if self.memory_watchdog is not None and (
+                yield Call(self.memory_watchdog.check, self.stats["chapters"], chapter.title)
+            ):
+                if self.prefetcher is not None:
+                    yield Call(self.prefetcher.cancel)
+                yield Call(self._recycle_browser, username, password, course_url)
+                prefetched = None
+                continue
+
+            prefetched = (yield Call(self.prefetcher.adopt)) if self.prefetcher is not None else None
+            if prefetched is None:
+                if self.config["in_place_navigation"] and (yield Call(self.page_selector.shell_alive)):
+                    # 课程页面仍然完整，只刷新章节完成状态，下一章节直接在页面内切换
+                    yield Call(self.page_selector.refresh_chapter_status, phase="navigation")
+                else:
+                    # 返回课程页面
+                    yield Call(self.page_selector.open_course_page, course_url, phase="navigation")
 
+    def plan(self, username=None, password=None, course_url=None, output='plan.json', wait_on_exit=True):
+        """
+        遍历课程生成执行计划：任务数量、视频时长和预计总用时，不执行任何任务
+        """
+        username = username or config_data.get('username')
+        password = password or config_data.get('password')
+        course_url = course_url or config_data.get('course_url')
+        planner = CoursePlanner(self.page_selector, self.executors)
+        try:
+            with self.profiler.phase("login"):
+                self.login_manager.login(username, password)
+            with self.profiler.phase("plan"):
+                course = planner.plan(course_url)
+            return planner.write(course, output)
         except Exception as e:
-            logging.error(f"程序运行出错: {str(e)}")
+            logging.error(f"生成执行计划时出错: {str(e)}")
             logging.debug(traceback.format_exc())
+            return None
         finally:
-            input("按回车键退出...")
+            if wait_on_exit:
+                input("按回车键退出...")
             self.login_manager.close()
 
+    def _prefetch_step(self, remaining):
+        with self.profiler.phase("prefetch"):
+            self.prefetcher.advance(remaining)
+
+    def _chapter_steps(self, chapter, journal, tasks=None):
+        """
+        处理当前已打开的章节，返回章节内的任务是否全部完成；tasks为预取得到的任务列表
+        """
+        if tasks is None:
+            # 等待页面加载
+            yield Call(self.page_selector.wait_chapter_loaded, phase="navigation")
+
+            # 查找所有任务
+            tasks = yield Call(self.page_selector.find_all_tasks, phase="task_scan")
+        # 预取窗口中打开的章节同样录制，此时它已是当前窗口
+        if self.snapshot_recorder is not None:
+            task_types = [task.type for task in tasks]
+            yield Call(self._record_snapshot, "chapter", chapter.title, {
+                "tasks": {task_type: task_types.count(task_type) for task_type in set(task_types)},
+            })
+        if self.metrics is not None:
+            self.metrics.chapter_tasks(chapter, tasks)
+
+        runnable, chapter_complete = self._runnable_tasks(chapter, tasks, journal)
+
+        pdf_tasks = [task for task in runnable if task.type == "pdf"]
+        if self.pdf_tab_runner is not None and len(pdf_tasks) > 1:
+            if not (yield from self._pdf_tab_steps(chapter, pdf_tasks, journal)):
+                chapter_complete = False
+            runnable = [task for task in runnable if task.type != "pdf"]
+
+        # 执行任务
+        for task in runnable:
+            if not (yield from self._task_steps(chapter, task, journal)):
+                chapter_complete = False
+        return chapter_complete
+
+    def _runnable_tasks(self, chapter, tasks, journal):
+        """
+        筛选需要执行的任务，返回 (任务列表, 跳过的任务是否不影响章节完成)
+        """
+        chapter_complete = True
+        runnable = []
+        for task in tasks:
+            # 如果配置为跳过已完成任务，且当前任务已完成，则跳过
+            if self.config["skip_finished"] and task.is_finished:
+                logging.info(f"跳过已完成的任务: {task.title}")
+                continue
+            if journal.is_task_done(chapter.onclick, task.index):
+                logging.info(f"进度日志显示任务已完成，跳过: {task.title}")
+                continue
+            if self.config["skip_pdf"] and task.type == "pdf":
+                logging.info(f"跳过PDF任务: {task.title}")
+                chapter_complete = False
+                continue
+            if self.config["skip_video"] and task.type == "video":
+                logging.info(f"跳过视频任务: {task.title}")
+                chapter_complete = False
+                continue
+            runnable.append(task)
+        return runnable, chapter_complete
+
+    def _pdf_tab_steps(self, chapter, tasks, journal):
+        """
+        在多个标签页中并发执行章节中的PDF任务，返回是否全部完成
+        """
+        content_url = yield Call(self.page_selector.content_url)
+        start = time.time()
+        results = yield Call(self.pdf_tab_runner.run, tasks, content_url, phase="pdf")
+        for task, outcome, duration in results:
+            self._record_task(journal, chapter, task, outcome, duration)
+            self.stats["tasks_done" if outcome == "done" else "tasks_failed"] += 1
+
+        parallel = time.time() - start
+        sequential = sum(duration for _, _, duration in results)
+        self.stats["pdf_parallel_seconds"] += parallel
+        self.stats["pdf_sequential_seconds"] += sequential
+        logging.info(
+            f"并发执行 {len(tasks)} 个PDF任务用时 {parallel:.1f}秒，各任务单独执行的耗时合计 {sequential:.1f}秒"
+        )
+        return all(outcome == "done" for _, outcome, _ in results)
+
+    def _task_steps(self, chapter, task, journal):
+        """
+        执行单个任务并写入进度日志，返回任务是否完成
+        """
+        task_start = time.time()
+        executor = self.executors.get(task.type)
+        if executor is None:
+            self._record_task(journal, chapter, task, "skipped", time.time() - task_start)
+            return False
+        if self.metrics is not None:
+            self.metrics.task_started(task)
+        try:
+            outcome = yield TaskCall(task, executor)
+        except PlaybackStalled:
+            # 视频多次恢复仍无法播放，只放弃该任务，继续执行后面的任务
+            outcome = "stalled"
+        except TaskFailed as e:
+            # 任务内容缺失等无法完成的任务记为失败，不写成已完成，下次运行重新执行
+            logging.error(f"任务失败: {task.title}: {str(e)}")
+            outcome = "failed"
+        except Exception:
+            self._record_task(journal, chapter, task, "failed", time.time() - task_start)
+            self.stats["tasks_failed"] += 1
+            raise
+        self._record_task(journal, chapter, task, outcome, time.time() - task_start)
+        self.stats["tasks_done" if outcome == "done" else "tasks_failed"] += 1
+        return outcome == "done"
+
+    def _record_task(self, journal, chapter, task, outcome, duration):
+        journal.record_task(chapter, task, outcome, duration)
+        if self.metrics is not None:
+            self.metrics.task_done(task, outcome, duration)
+        log_event(
+            "task", f"任务结束: {task.title} ({outcome})",
+            phase=task.type, chapter=chapter.title, task=task.index, task_type=task.type,
+            outcome=outcome, duration=round(duration, 3),
+        )
+
 def main():
-    logging.info("程序开始运行...")
-    automation = MoocAutomation()
-    automation.run()
-    logging.info("程序结束运行")
+    # 命令行入口在 cli.py 中；python main.py 等同于 python cli.py run，--plan [FILE] 等同于 plan 子命令
+    from cli import main as cli_main
+    argv = sys.argv[1:]
+    if argv[:1] == ["--plan"]:
+        rest = argv[1:]
+        if rest and not rest[0].startswith("-"):
+            rest = ["--output"] + rest
+        argv = ["plan"] + rest
+    return cli_main(argv)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
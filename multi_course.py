@@ -0,0 +1,110 @@
+import logging
+import time
+from multiprocessing import Pool, current_process
+
+from auth.browser_profile import BrowserProfile
+from main import MoocAutomation, config_data, configure, configure_logging, create_login_manager
+from runtime.log_pipeline import attach_worker, listen_for_workers
+
+def prepare_shared_cookies(username=None, password=None):
+    """
+    在主进程中登录一次并保存cookies，所有工作进程共用这份cookies
+    """
+    login_manager = create_login_manager()
+    try:
+        login_manager.login(username, password)
+        login_manager.save_cookies(login_manager.get_driver().get_cookies())
+        logging.info("共享cookies已验证并保存")
+    finally:
+        login_manager.close()
+
+def init_worker(log_queue, level):
+    """
+    工作进程初始化：日志通过队列交给主进程统一写入
+    """
+    if log_queue is not None:
+        attach_worker(log_queue, level)
+
+def run_course(course_url):
+    """
+    工作进程入口：使用独立的浏览器完成一门课程
+    """
+    # spawn方式启动的工作进程不会继承主进程中已加载的配置
+    if not config_data:
+        configure()
+    # 每个工作进程使用自己的用户数据目录，见 BrowserProfile.with_user_data_suffix
+    try:
+        name = current_process().name
+        profile = BrowserProfile.from_config(config_data.get('browser'))
+        automation = MoocAutomation(profile.with_user_data_suffix(name), output_suffix=name)
+    except Exception as e:
+        # 浏览器启动失败只影响这门课程，不能让异常传回主进程中断其他课程
+        logging.error(f"启动浏览器失败，跳过课程 {course_url}: {str(e)}")
+        stats = MoocAutomation._new_stats(course_url)
+        stats["error"] = str(e)
+        return stats
+    return automation.run(course_url=course_url, wait_on_exit=False)
+
+def log_throughput_report(results, wall_time):
+    """
+    输出每门课程及汇总的吞吐量报告
+    """
+    logging.info("多课程运行报告:")
+    for stats in results:
+        hours = stats["elapsed"] / 3600
+        rate = stats["chapters"] / hours if hours > 0 else 0.0
+        status = f"出错: {stats['error']}" if stats["error"] else "正常"
+        logging.info(
+            f"- {stats['course_url']}: 章节 {stats['chapters']}，任务 {stats['tasks_done']} "
+            f"(失败 {stats['tasks_failed']})，用时 {stats['elapsed']:.1f}秒，"
+            f"{rate:.1f} 章节/小时，恢复 {stats.get('recoveries', 0)} 次，{status}"
+        )
+
+    total_chapters = sum(stats["chapters"] for stats in results)
+    total_tasks = sum(stats["tasks_done"] for stats in results)
+    busy_time = sum(stats["elapsed"] for stats in results)
+    hours = wall_time / 3600
+    rate = total_chapters / hours if hours > 0 else 0.0
+    speedup = busy_time / wall_time if wall_time > 0 else 0.0
+    logging.info(
+        f"汇总: {len(results)} 门课程，章节 {total_chapters}，任务 {total_tasks}，"
+        f"总用时 {wall_time:.1f}秒，{rate:.1f} 章节/小时，并行加速比 {speedup:.2f}"
+    )
+
+def run_courses(course_urls, workers=2, username=None, password=None):
+    """
+    将课程列表分配给多个工作进程并发执行
+    """
+    if not course_urls:
+        # 没有课程时不必登录，也无法创建进程数为0的进程池
+        logging.warning("没有需要运行的课程")
+        return []
+    start = time.time()
+    prepare_shared_cookies(username, password)
+
+    results = []
+    log_queue = listen_for_workers()
+    level = config_data.get('logging', {}).get('level', 'INFO')
+    with Pool(processes=min(workers, len(course_urls)), initializer=init_worker, initargs=(log_queue, level)) as pool:
+        for stats in pool.imap_unordered(run_course, course_urls):
+            logging.info(f"课程完成: {stats['course_url']}")
+            results.append(stats)
+
+    log_throughput_report(results, time.time() - start)
+    return results
+
+def main():
+    configure()
+    configure_logging()
+    course_urls = config_data.get('course_urls') or [config_data.get('course_url')]
+    workers = config_data.get('workers', 2)
+    logging.info(f"开始多课程运行: {len(course_urls)} 门课程，{workers} 个工作进程")
+    run_courses(
+        course_urls,
+        workers=workers,
+        username=config_data.get('username'),
+        password=config_data.get('password'),
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import json
+import logging
+
+from course.model import Chapter
+from . import scripts
+
+# 章节目录索引，由一次页面快照构建，按onclick和标题索引章节
+class ChapterCatalogue:
+    def __init__(self, chapters):
+        self.chapters = chapters
+        self.by_onclick = {}
+        self.by_title = {}
+        for chapter in chapters:
+            self.by_onclick.setdefault(chapter.onclick, chapter)
+            self.by_title.setdefault(chapter.title, chapter)
+
+    @classmethod
+    def snapshot(cls, driver):
+        """
+        读取章节目录，调用前driver需已切换到 frame_content-zj
+        """
+        chapters = [
+            Chapter.from_snapshot(raw) for raw in json.loads(driver.execute_script(scripts.SNAPSHOT_CHAPTERS))
+        ]
+        logging.debug(f"章节目录快照: 共 {len(chapters)} 个章节")
+        return cls(chapters)
+
+    def __len__(self):
+        return len(self.chapters)
+
+    def unfinished(self):
+        """
+        返回所有未完成的章节
+        """
+        return [chapter for chapter in self.chapters if not chapter.finished]
+
+    def lookup(self, onclick=None, title=None):
+        """
+        按onclick或标题查找章节
+        """
+        if onclick is not None and onclick in self.by_onclick:
+            return self.by_onclick[onclick]
+        if title is not None:
+            return self.by_title.get(title)
+        return None
+
+    def click(self, driver, onclick):
+        """
+        点击指定章节，调用前driver需已切换到 frame_content-zj
+        """
+        chapter = self.by_onclick.get(onclick)
+        position = chapter.position if chapter else -1
+        return bool(driver.execute_script(scripts.CLICK_CHAPTER, onclick, position))
\ No newline at end of file
@@ -0,0 +1,111 @@
+import logging
+
+from runtime.frame_navigator import FrameNavigator
+
+class ChapterPrefetcher:
+    def __init__(self, driver, wait_policy, main_navigator, page_selector_factory, min_remaining=30,
+                 resource_policy=None):
+        self.driver = driver
+        self.wait_policy = wait_policy
+        # 见 FrameNavigator.window_switched
+        self.main_navigator = main_navigator
+        # 预取窗口有自己的导航器和页面选择器，不影响主窗口的状态
+        self.navigator = FrameNavigator(driver, wait_policy)
+        self.page_selector = page_selector_factory(self.navigator)
+        # 视频剩余时间少于该秒数时不再开始新的预取步骤
+        self.min_remaining = min_remaining
+        # 预取窗口要再次启用拦截，见 ResourcePolicy.apply
+        self.resource_policy = resource_policy
+        self._reset()
+
+    def _reset(self):
+        self.chapter = None
+        self.handle = None
+        self.tasks = None
+        self.failed = False
+        self._steps = None
+
+    @property
+    def ready(self):
+        return self.tasks is not None
+
+    def start(self, chapter, course_url, catalogue=None):
+        """
+        指定要预取的章节，实际工作在 advance 中分步完成
+        """
+        self.cancel()
+        self.chapter = chapter
+        self._steps = self._run_steps(course_url, catalogue)
+
+    def _run_steps(self, course_url, catalogue):
+        # 每个 yield 之间是一小段有界的工作，完成后立即切回主窗口
+        self.driver.switch_to.new_window('window')
+        self.handle = self.driver.current_window_handle
+        if self.resource_policy is not None:
+            self.resource_policy.apply()
+        self.driver.get(course_url)
+        self.navigator.page_loaded()
+        yield
+
+        self.page_selector.catalogue = catalogue
+        if not self.page_selector.click_chapter(self.chapter):
+            raise Exception(f"预取窗口中无法找到章节: {self.chapter.title}")
+        yield
+
+        self.page_selector.wait_chapter_loaded()
+        yield
+
+        self.tasks = self.page_selector.find_all_tasks()
+        logging.info(f"已预取下一章节: {self.chapter.title}，共 {len(self.tasks)} 个任务点")
+
+    def advance(self, remaining):
+        """
+        在视频播放的空闲时间推进预取，每次进度汇报最多推进一步，remaining为当前视频剩余秒数
+        """
+        if self._steps is None or self.ready or self.failed:
+            return
+        # 剩余时间不够时不切换窗口，视频iframe的缓存保持有效
+        if remaining < self.min_remaining:
+            return
+        main_handle = self.driver.current_window_handle
+        try:
+            if self.handle is not None:
+                self.driver.switch_to.window(self.handle)
+                self.navigator.window_switched()
+            next(self._steps, None)
+        except Exception as e:
+            logging.warning(f"预取章节 {self.chapter.title} 失败，将按常规流程打开: {str(e)}")
+            self.failed = True
+        finally:
+            self.driver.switch_to.window(main_handle)
+            self.main_navigator.window_switched()
+
+    def adopt(self):
+        """
+        预取完成时，关闭当前窗口并切换到预取窗口，返回 (章节, 任务列表)；未完成时返回None
+        """
+        if not self.ready:
+            self.cancel()
+            return None
+        chapter, tasks, handle = self.chapter, self.tasks, self.handle
+        self.driver.close()
+        self.driver.switch_to.window(handle)
+        self.main_navigator.page_loaded()
+        self._reset()
+        return chapter, tasks
+
+    def cancel(self):
+        """
+        放弃当前预取并关闭预取窗口
+        """
+        if self.handle is not None:
+            main_handle = self.driver.current_window_handle
+            try:
+                self.driver.switch_to.window(self.handle)
+                self.driver.close()
+            except Exception as e:
+                logging.debug(f"关闭预取窗口时出错: {str(e)}")
+            finally:
+                self.driver.switch_to.window(main_handle)
+                self.main_navigator.window_switched()
+        self._reset()
\ No newline at end of file
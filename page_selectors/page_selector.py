@@ -1,16 +1,39 @@
+import json
 import logging
 import traceback
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+
+from course.model import Task
+from runtime.frame_navigator import CHAPTER_LIST_FRAME, MAIN_FRAME, FrameNavigator
+from runtime.supervisor import RESTART_KINDS, classify_failure
+from runtime.wait_policy import WaitPolicy
+
+from . import scripts
+from .chapter_catalogue import ChapterCatalogue
+
+PDF_IFRAME_CLASS = "insertdoc-online-pdf"
+VIDEO_IFRAME_CLASS = "ans-insertvideo-online"
+
+# 逐个解析任务点时，每个任务点需要的WebDriver调用次数:
+# find_element(父节点)、get_attribute(class)、find_element(iframe)、
+# get_attribute(class)、get_attribute(title)、parent.text
+LEGACY_COMMANDS_PER_TASK = 6
 
 class PageSelector:
-    def __init__(self, driver, wait):
+    def __init__(self, driver, batch_discovery=True, wait_policy=None, navigator=None):
         self.driver = driver
-        self.wait = wait
+        self.wait_policy = wait_policy or WaitPolicy(driver)
+        self.navigator = navigator or FrameNavigator(driver, self.wait_policy)
+        self.batch_discovery = batch_discovery
         self.unfinished_chapters = []
         self.current_chapter_index = 0
+        self.commands_saved = 0
+        self.catalogue = None
+        self.current_chapter = None
+        # 点击章节前内容iframe的文档标记，用于判断章节内容是否已经切换
+        self._content_token = None
 
     def find_all_tasks(self):
         """
@@ -19,63 +42,18 @@ class PageSelector:
         logging.info("开始查找所有任务点...")
         try:
             logging.debug("切换到主iframe")
-            self.driver.switch_to.frame("iframe")
+            self.navigator.switch_to(MAIN_FRAME)
             
             logging.debug("等待任务点加载...")
-            self.wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "ans-job-icon"))
+            self.wait_policy.until(
+                "task_icons", EC.presence_of_element_located((By.CLASS_NAME, "ans-job-icon"))
             )
-            
-            tasks = self.driver.find_elements(By.CLASS_NAME, "ans-job-icon")
-            logging.info(f"找到 {len(tasks)} 个任务点")
-            all_tasks = []
-            
-            pdf_index = 0
-            video_index = 0
 
-            for i, task in enumerate(tasks, 1):
-                try:
-                    parent = task.find_element(By.XPATH, "./..")
-                    class_name = parent.get_attribute("class")
-                    is_finished = "ans-job-finished" in class_name
-                    
-                    iframe = parent.find_element(By.TAG_NAME, "iframe")
-                    iframe_class = iframe.get_attribute("class")
-                    
-                    task_type = "unknown"
-                    task_xpath = ""
-                    if "insertdoc-online-pdf" in iframe_class:
-                        task_type = "pdf"
-                        pdf_index += 1
-                        task_xpath = f"(//iframe[contains(@class, 'insertdoc-online-pdf')])[{pdf_index}]"
-                    elif "ans-insertvideo-online" in iframe_class:
-                        task_type = "video"
-                        video_index += 1
-                        task_xpath = f"(//iframe[contains(@class, 'ans-insertvideo-online')])[{video_index}]"
-                    
-                    task_info = {
-                        "type": task_type,
-                        "xpath": task_xpath,
-                        "element": task,
-                        "is_finished": is_finished,
-                        "class_name": class_name,
-                        "iframe_class": iframe_class,
-                        "index": i
-                    }
-                    
-                    try:
-                        task_text = task.get_attribute("title") or parent.text
-                        task_info["title"] = task_text
-                    except:
-                        task_info["title"] = "无法获取标题"
-                    
-                    all_tasks.append(task_info)
-                    logging.info(f"任务点 {i}: 类型={task_type}, 已完成={is_finished}")
-                    
-                except Exception as e:
-                    logging.error(f"处理任务点 {i} 时出错: {str(e)}")
-                    logging.debug(traceback.format_exc())
-            
+            if self.batch_discovery:
+                all_tasks = self._discover_tasks_batched()
+            else:
+                all_tasks = self._discover_tasks_legacy()
+
             self._log_task_statistics(all_tasks)
             return all_tasks
             
@@ -83,14 +61,94 @@ class PageSelector:
             logging.error(f"查找任务点时出错: {str(e)}")
             logging.debug(traceback.format_exc())
             raise
-        finally:
-            self.driver.switch_to.default_content()
+
+    def _classify_iframe(self, iframe_class):
+        """
+        根据iframe的class判断任务类型
+        """
+        if PDF_IFRAME_CLASS in iframe_class:
+            return "pdf", PDF_IFRAME_CLASS
+        if VIDEO_IFRAME_CLASS in iframe_class:
+            return "video", VIDEO_IFRAME_CLASS
+        return "unknown", None
+
+    def _discover_tasks_batched(self):
+        """
+        通过一次execute_script调用获取所有任务点
+        """
+        raw_tasks = json.loads(self.driver.execute_script(scripts.DISCOVER_TASKS))
+        logging.info(f"找到 {len(raw_tasks)} 个任务点")
+        all_tasks = []
+        type_counters = {}
+
+        for raw in raw_tasks:
+            i = raw["index"]
+            if not raw["key"]:
+                logging.error(f"处理任务点 {i} 时出错: 未找到任务iframe")
+                continue
+
+            task_type, iframe_marker = self._classify_iframe(raw["iframe_class"])
+            task_xpath = ""
+            if iframe_marker:
+                type_counters[task_type] = type_counters.get(task_type, 0) + 1
+                task_xpath = f"(//iframe[contains(@class, '{iframe_marker}')])[{type_counters[task_type]}]"
+
+            is_finished = "ans-job-finished" in raw["class_name"]
+            # 脚本给iframe打上的标记，执行器可直接按属性定位，无需按序号扫描整个文档
+            all_tasks.append(Task(
+                i, task_type, raw["title"] or "无法获取标题", is_finished, key=raw["key"], xpath=task_xpath
+            ))
+            logging.debug(f"任务点 {i}: 类型={task_type}, 已完成={is_finished}")
+
+        # 旧路径的find_elements与这里的execute_script相抵，节省的是每个任务点上的逐个查询
+        saved = LEGACY_COMMANDS_PER_TASK * len(raw_tasks)
+        self.commands_saved += saved
+        logging.info(f"批量发现任务点，本次节省 {saved} 次WebDriver调用 (累计 {self.commands_saved} 次)")
+        return all_tasks
+
+    def _discover_tasks_legacy(self):
+        """
+        逐个元素查询任务点信息
+        """
+        tasks = self.driver.find_elements(By.CLASS_NAME, "ans-job-icon")
+        logging.info(f"找到 {len(tasks)} 个任务点")
+        all_tasks = []
+        type_counters = {}
+
+        for i, task in enumerate(tasks, 1):
+            try:
+                parent = task.find_element(By.XPATH, "./..")
+                class_name = parent.get_attribute("class")
+                is_finished = "ans-job-finished" in class_name
+                
+                iframe = parent.find_element(By.TAG_NAME, "iframe")
+                iframe_class = iframe.get_attribute("class")
+                
+                task_type, iframe_marker = self._classify_iframe(iframe_class)
+                task_xpath = ""
+                if iframe_marker:
+                    type_counters[task_type] = type_counters.get(task_type, 0) + 1
+                    task_xpath = f"(//iframe[contains(@class, '{iframe_marker}')])[{type_counters[task_type]}]"
+                
+                try:
+                    task_text = task.get_attribute("title") or parent.text
+                except:
+                    task_text = "无法获取标题"
+                
+                all_tasks.append(Task(i, task_type, task_text, is_finished, xpath=task_xpath))
+                logging.debug(f"任务点 {i}: 类型={task_type}, 已完成={is_finished}")
+                
+            except Exception as e:
+                logging.error(f"处理任务点 {i} 时出错: {str(e)}")
+                logging.debug(traceback.format_exc())
+        
+        return all_tasks
 
     def _log_task_statistics(self, tasks):
-        finished_count = len([t for t in tasks if t["is_finished"]])
+        finished_count = len([t for t in tasks if t.is_finished])
         unfinished_count = len(tasks) - finished_count
-        pdf_count = len([t for t in tasks if t["type"] == "pdf"])
-        video_count = len([t for t in tasks if t["type"] == "video"])
+        pdf_count = len([t for t in tasks if t.type == "pdf"])
+        video_count = len([t for t in tasks if t.type == "video"])
         
         logging.info("任务点统计信息:")
         logging.info(f"- 已完成: {finished_count}")
@@ -106,11 +164,11 @@ class PageSelector:
         try:
             # 切换到章节列表的iframe
             logging.debug("切换到章节列表iframe")
-            self.driver.switch_to.frame("frame_content-zj")
+            self.navigator.switch_to(CHAPTER_LIST_FRAME)
             
             # 等待章节列表加载
-            self.wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "chapter_item"))
+            self.wait_policy.until(
+                "chapter_list", EC.presence_of_element_located((By.CLASS_NAME, "chapter_item"))
             )
             
             # 查找所有包含待完成任务点的章节
@@ -139,9 +197,6 @@ class PageSelector:
         except Exception as e:
             logging.error(f"查找未完成章节时出错: {str(e)}")
             return None
-        finally:
-            # 切换回默认内容
-            self.driver.switch_to.default_content()
 
     def click_unfinished_chapter(self):
         """
@@ -150,18 +205,17 @@ class PageSelector:
         chapter = self.find_unfinished_chapter()
         if chapter:
             try:
-                # 重新切换到iframe，因为find_unfinished_chapter在返回前切换回了默认内容
-                self.driver.switch_to.frame("frame_content-zj")
+                # 章节元素位于章节列表iframe中，已在该iframe内时不会重复切换
+                self.navigator.switch_to(CHAPTER_LIST_FRAME)
                 chapter.click()
                 logging.info("已点击未完成章节")
-                # 切换回默认内容
-                self.driver.switch_to.default_content()
                 return True
             except Exception as e:
                 logging.error(f"点击章节时出错: {str(e)}")
-                # 确保切换回默认内容
-                self.driver.switch_to.default_content()
                 return False
+            finally:
+                # 点击会触发页面跳转
+                self.navigator.invalidate()
         return False
 
     def open_course_page(self, url):
@@ -169,39 +223,80 @@ class PageSelector:
         打开指定的课程页面
         """
         self.driver.get(url)
+        self.navigator.page_loaded()
         logging.info("已打开课程页面")
 
+    def shell_alive(self):
+        """
+        当前页面是否仍是完整的课程外壳（章节列表和内容区都在）
+        """
+        try:
+            self.navigator.switch_to()
+            return bool(self.driver.execute_script(scripts.SHELL_ALIVE))
+        except Exception as e:
+            logging.debug(f"检查课程页面时出错: {str(e)}")
+            return False
+
+    def wait_chapter_loaded(self):
+        """
+        等待点击的章节加载完成：在课程外壳内切换时等待内容iframe换成新文档
+        """
+        self.navigator.switch_to()
+        if self._content_token is not None:
+            token = self._content_token
+            self._content_token = None
+            self.wait_policy.until(
+                "chapter_content", lambda d: d.execute_script(scripts.CONTENT_CHANGED, token)
+            )
+        self.wait_policy.until(
+            "chapter_page", EC.presence_of_element_located((By.CLASS_NAME, "prev_title_pos"))
+        )
+
+    def content_url(self):
+        """
+        当前章节内容iframe的地址
+        """
+        self.navigator.switch_to()
+        return self.driver.execute_script(scripts.CONTENT_URL)
+
+    def refresh_chapter_status(self):
+        """
+        增量刷新章节完成状态，跳过在此期间已经完成的待处理章节
+        """
+        pending = self.unfinished_chapters[self.current_chapter_index:]
+        if not pending:
+            return
+        self.navigator.switch_to(CHAPTER_LIST_FRAME)
+        finished = set(self.driver.execute_script(
+            scripts.FINISHED_AMONG, [chapter.onclick for chapter in pending]
+        ))
+        if finished:
+            for chapter in pending:
+                if chapter.onclick in finished:
+                    chapter.finished = True
+                    logging.info(f"章节已显示完成，跳过: {chapter.title}")
+            self.unfinished_chapters = (
+                self.unfinished_chapters[:self.current_chapter_index]
+                + [chapter for chapter in pending if not chapter.finished]
+            )
+
     def get_all_unfinished_chapters(self):
         """
         获取所有未完成章节的列表
         """
         logging.info("开始获取所有未完成的章节...")
-        unfinished_chapters = []
         try:
-            self.driver.switch_to.frame("frame_content-zj")
+            self.navigator.switch_to(CHAPTER_LIST_FRAME)
             
-            self.wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "chapter_item"))
+            self.wait_policy.until(
+                "chapter_list", EC.presence_of_element_located((By.CLASS_NAME, "chapter_item"))
             )
             
-            chapters = self.driver.find_elements(By.CLASS_NAME, "chapter_item")
-            for chapter in chapters:
-                try:
-                    onclick = chapter.get_attribute("onclick")
-                    if not onclick:
-                        continue
-                    task_points = chapter.find_elements(By.CLASS_NAME, "icon_yiwanc")
-                    if not task_points:
-                        title = chapter.get_attribute("title")
-                        unfinished_chapters.append({
-                            'element': chapter,
-                            'title': title,
-                            'onclick': onclick
-                        })
-                        logging.info(f"添加未完成章节: {title}")
-                except Exception as e:
-                    logging.debug(f"处理章节时出错: {str(e)}")
-                    continue
+            # 一次快照读取整个章节目录
+            self.catalogue = ChapterCatalogue.snapshot(self.driver)
+            unfinished_chapters = self.catalogue.unfinished()
+            for chapter in unfinished_chapters:
+                logging.info(f"添加未完成章节: {chapter.title}")
             
             logging.info(f"共找到 {len(unfinished_chapters)} 个未完成章节")
             return unfinished_chapters
@@ -209,8 +304,21 @@ class PageSelector:
         except Exception as e:
             logging.error(f"获取未完成章节列表时出错: {str(e)}")
             return []
-        finally:
-            self.driver.switch_to.default_content()
+
+    def peek_next_unfinished_chapter(self):
+        """
+        返回下一个将要处理的未完成章节，不改变当前位置
+        """
+        if self.current_chapter_index < len(self.unfinished_chapters):
+            return self.unfinished_chapters[self.current_chapter_index]
+        return None
+
+    def mark_chapter_opened(self, chapter_info):
+        """
+        章节已在别处（如预取窗口）打开，直接前进到该章节
+        """
+        self.current_chapter = chapter_info
+        self.current_chapter_index += 1
 
     def initialize_unfinished_chapters(self):
         """
@@ -228,51 +336,49 @@ class PageSelector:
             logging.info("没有未完成的章节")
             return False
 
-        if self.current_chapter_index >= len(self.unfinished_chapters):
-            logging.info("所有未完成章节都已尝试")
-            return False
+        while self.current_chapter_index < len(self.unfinished_chapters):
+            chapter_info = self.unfinished_chapters[self.current_chapter_index]
+            logging.info(f"尝试点击第 {self.current_chapter_index + 1} 个未完成章节: {chapter_info.title}")
+            # 无论成功与否都前进，出错的章节直接跳过
+            self.current_chapter_index += 1
 
+            try:
+                if self.click_chapter(chapter_info):
+                    self.current_chapter = chapter_info
+                    logging.info(f"已点击章节: {chapter_info.title}")
+                    return True
+                logging.error(f"无法找到章节: {chapter_info.title}")
+            except Exception as e:
+                if classify_failure(e) in RESTART_KINDS:
+                    # 浏览器会话已不可用，后面的章节同样无法点击，交给上层恢复
+                    self.current_chapter_index -= 1
+                    raise
+                logging.error(f"点击章节时出错: {str(e)}")
+
+        logging.info("所有未完成章节都已尝试")
+        return False
+
+    def click_chapter(self, chapter_info):
+        """
+        在章节列表中点击指定章节，之后用 wait_chapter_loaded 等待章节加载
+        """
         try:
-            chapter_info = self.unfinished_chapters[self.current_chapter_index]
-            logging.info(f"尝试点击第 {self.current_chapter_index + 1} 个未完成章节: {chapter_info['title']}")
-            
+            # 记录内容iframe当前的文档，点击后据此等待内容切换
+            self.navigator.switch_to()
+            self._content_token = self.driver.execute_script(scripts.MARK_CONTENT)
+
             # 切换到章节列表的iframe
-            self.driver.switch_to.frame("frame_content-zj")
+            self.navigator.switch_to(CHAPTER_LIST_FRAME)
             
             # 等待章节列表加载
-            self.wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "chapter_item"))
+            self.wait_policy.until(
+                "chapter_list", EC.presence_of_element_located((By.CLASS_NAME, "chapter_item"))
             )
             
-            # 重新获取所有章节元素
-            chapters = self.driver.find_elements(By.CLASS_NAME, "chapter_item")
-            target_chapter = None
-            
-            # 通过标题和onclick属性匹配目标章节
-            for chapter in chapters:
-                try:
-                    title = chapter.get_attribute("title")
-                    onclick = chapter.get_attribute("onclick")
-                    if title == chapter_info['title'] and onclick == chapter_info['onclick']:
-                        target_chapter = chapter
-                        break
-                except Exception:
-                    continue
-            
-            if target_chapter is None:
-                logging.error(f"无法找到章节: {chapter_info['title']}")
-                self.current_chapter_index += 1
-                return self.click_next_unfinished_chapter()
-            
-            # 点击找到的章节
-            target_chapter.click()
-            self.current_chapter_index += 1
-            logging.info(f"已点击章节: {chapter_info['title']}")
-            return True
-            
-        except Exception as e:
-            logging.error(f"点击章节时出错: {str(e)}")
-            self.current_chapter_index += 1  # 跳过当前出错的章节
-            return self.click_next_unfinished_chapter()  # 递归尝试下一个章节
+            # 通过目录索引定位并在页面内点击，只需一次WebDriver调用
+            if self.catalogue is None:
+                self.catalogue = ChapterCatalogue.snapshot(self.driver)
+            return self.catalogue.click(self.driver, chapter_info.onclick)
         finally:
-            self.driver.switch_to.default_content() 
\ No newline at end of file
+            # 点击可能触发整页跳转，出错时所在frame也不确定
+            self.navigator.invalidate()
\ No newline at end of file
@@ -0,0 +1,134 @@
+# 页面内执行的JavaScript脚本
+# 每个脚本通过一次 execute_script 调用完成原本需要多次WebDriver往返的工作
+
+# 批量发现任务点：一次调用返回所有任务点的JSON描述，并给任务iframe打上稳定标记
+DISCOVER_TASKS = """
+var icons = document.getElementsByClassName('ans-job-icon');
+var result = [];
+for (var i = 0; i < icons.length; i++) {
+    var icon = icons[i];
+    var parent = icon.parentElement;
+    var className = parent ? (parent.getAttribute('class') || '') : '';
+    var iframe = parent ? parent.querySelector('iframe') : null;
+    var iframeClass = iframe ? (iframe.getAttribute('class') || '') : '';
+    var key = '';
+    if (iframe) {
+        key = String(i + 1);
+        iframe.setAttribute('data-mooc-task', key);
+    }
+    result.push({
+        index: i + 1,
+        key: key,
+        class_name: className,
+        iframe_class: iframeClass,
+        title: icon.getAttribute('title') || (parent ? parent.innerText : '')
+    });
+}
+return JSON.stringify(result);
+"""
+
+# 章节目录快照：一次调用读取 frame_content-zj 中所有可点击章节的标题、onclick和完成状态
+SNAPSHOT_CHAPTERS = """
+var items = document.getElementsByClassName('chapter_item');
+var result = [];
+for (var i = 0; i < items.length; i++) {
+    var item = items[i];
+    var onclick = item.getAttribute('onclick');
+    if (!onclick) {
+        continue;
+    }
+    result.push({
+        position: i,
+        title: item.getAttribute('title') || '',
+        onclick: onclick,
+        finished: item.getElementsByClassName('icon_yiwanc').length > 0
+    });
+}
+return JSON.stringify(result);
+"""
+
+# 按onclick点击章节：先检查快照中的位置，位置不符时再在页面内查找
+CLICK_CHAPTER = """
+var onclick = arguments[0];
+var position = arguments[1];
+var items = document.getElementsByClassName('chapter_item');
+if (position >= 0 && position < items.length && items[position].getAttribute('onclick') === onclick) {
+    items[position].click();
+    return true;
+}
+for (var i = 0; i < items.length; i++) {
+    if (items[i].getAttribute('onclick') === onclick) {
+        items[i].click();
+        return true;
+    }
+}
+return false;
+"""
+
+# 课程外壳检查：章节列表iframe和内容iframe都在当前主文档中
+SHELL_ALIVE = """
+return !!(document.querySelector('iframe#frame_content-zj, iframe[name="frame_content-zj"]')
+    && document.querySelector('iframe#iframe, iframe[name="iframe"]'));
+"""
+
+# 给内容iframe当前加载的文档打上标记并返回标记；没有内容iframe时返回null
+MARK_CONTENT = """
+var frame = document.querySelector('iframe#iframe, iframe[name="iframe"]');
+if (!frame) {
+    return null;
+}
+var token = String(Date.now()) + Math.random().toString(36).slice(2);
+try {
+    frame.contentWindow.__moocContentToken = token;
+} catch (e) {
+    return 'src:' + frame.src;
+}
+return token;
+"""
+
+# 内容iframe已换成新文档并加载完成
+CONTENT_CHANGED = """
+var token = arguments[0];
+var frame = document.querySelector('iframe#iframe, iframe[name="iframe"]');
+if (!frame) {
+    return false;
+}
+if (token.indexOf('src:') === 0) {
+    return 'src:' + frame.src !== token;
+}
+try {
+    var win = frame.contentWindow;
+    return win.__moocContentToken !== token && win.document.readyState === 'complete';
+} catch (e) {
+    return true;
+}
+"""
+
+# 增量刷新完成状态：只返回给定章节中已显示完成图标的onclick
+FINISHED_AMONG = """
+var pending = {};
+for (var i = 0; i < arguments[0].length; i++) {
+    pending[arguments[0][i]] = true;
+}
+var items = document.getElementsByClassName('chapter_item');
+var finished = [];
+for (var j = 0; j < items.length; j++) {
+    var onclick = items[j].getAttribute('onclick');
+    if (onclick && pending[onclick] && items[j].getElementsByClassName('icon_yiwanc').length > 0) {
+        finished.push(onclick);
+    }
+}
+return finished;
+"""
+# 内容iframe当前文档的地址，可在其他标签页中单独打开章节内容
+CONTENT_URL = """
+var frame = document.querySelector('iframe#iframe, iframe[name="iframe"]');
+if (!frame) {
+    return null;
+}
+try {
+    return frame.contentWindow.location.href;
+} catch (e) {
+    return frame.src;
+}
+"""
@@ -0,0 +1,3 @@
+"""
+进度记录模块
+"""
\ No newline at end of file
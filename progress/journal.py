@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import time
+
+class ProgressJournal:
+    def __init__(self, course_url, file_name='progress.jsonl'):
+        self.course_url = course_url
+        self.file_name = file_name
+        self.completed_chapters = set()
+        self.completed_tasks = {}
+        self._load()
+
+    def _load(self):
+        """
+        回放日志文件，恢复当前课程的完成情况
+        """
+        if not os.path.exists(self.file_name):
+            return
+        with open(self.file_name, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 上次运行崩溃时可能留下写了一半的行
+                    logging.debug(f"跳过无法解析的进度记录: {line.strip()}")
+                    continue
+                if record.get("course") != self.course_url:
+                    continue
+                chapter = record.get("chapter")
+                if record.get("event") == "chapter" and record.get("status") == "complete":
+                    self.completed_chapters.add(chapter)
+                elif record.get("event") == "task" and record.get("outcome") == "done":
+                    self.completed_tasks.setdefault(chapter, set()).add(record.get("task_index"))
+        logging.info(f"从进度日志恢复: 已完成章节 {len(self.completed_chapters)} 个")
+
+    def _append(self, record):
+        record["time"] = time.time()
+        record["course"] = self.course_url
+        with open(self.file_name, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def is_chapter_complete(self, chapter_key):
+        return chapter_key in self.completed_chapters
+
+    def is_task_done(self, chapter_key, task_index):
+        return task_index in self.completed_tasks.get(chapter_key, ())
+
+    def pending_chapters(self, chapters):
+        """
+        过滤掉日志中已确认完成、且页面上也显示完成图标（icon_yiwanc）的章节
+        日志记录完成而页面仍显示未完成的章节需要重新打开，其中日志记录已完成的任务仍会逐个跳过
+        """
+        pending = []
+        for chapter in chapters:
+            if self.is_chapter_complete(chapter.onclick):
+                if chapter.finished:
+                    continue
+                logging.info(f"进度日志记录章节已完成，但页面仍显示未完成，重新检查: {chapter.title}")
+            pending.append(chapter)
+        return pending
+
+    def record_task(self, chapter, task, outcome, duration):
+        """
+        记录任务结果，outcome为 done / failed / skipped
+        """
+        self._append({
+            "event": "task",
+            "chapter": chapter.onclick,
+            "chapter_title": chapter.title,
+            "task_index": task.index,
+            "task_type": task.type,
+            "outcome": outcome,
+            "duration": round(duration, 3)
+        })
+        if outcome == "done":
+            self.completed_tasks.setdefault(chapter.onclick, set()).add(task.index)
+
+    def record_chapter(self, chapter, status, duration):
+        """
+        记录章节结果，status为 complete / incomplete
+        """
+        self._append({
+            "event": "chapter",
+            "chapter": chapter.onclick,
+            "chapter_title": chapter.title,
+            "status": status,
+            "duration": round(duration, 3)
+        })
+        if status == "complete":
+            self.completed_chapters.add(chapter.onclick)
\ No newline at end of file
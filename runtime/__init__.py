@@ -0,0 +1,3 @@
+"""
+运行时支撑模块
+"""
\ No newline at end of file
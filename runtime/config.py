@@ -0,0 +1,211 @@
+import json
+import os
+
+CONFIG_FILE = 'config.json'
+ENV_PREFIX = 'MOOC_'
+# 等待超时和阅读节奏按名称配置（waits.名称），环境变量为 MOOC_WAITS_名称，命令行参数为 --wait 名称=秒数
+WAITS_ENV_PREFIX = ENV_PREFIX + 'WAITS_'
+
+# 可通过命令行参数和环境变量覆盖的配置项: (配置路径, 类型, 说明)
+# 命令行参数为 --路径（点和下划线换成连字符），环境变量为 MOOC_路径（点换成下划线并大写）
+# 列表类型的值用逗号分隔，值本身含逗号时写成JSON数组
+OPTIONS = [
+    ("username", str, "账号"),
+    ("password", str, "密码"),
+    ("course_url", str, "课程章节目录链接"),
+    ("course_urls", list, "多课程运行的课程链接"),
+    ("workers", int, "多课程运行的工作进程数"),
+    ("home_url", str, "慕课首页地址"),
+    ("cookies_file", str, "cookies保存路径"),
+    ("journal_file", str, "进度日志路径"),
+    ("skip_finished", bool, "跳过页面上已显示完成的任务"),
+    ("skip_pdf", bool, "跳过PDF任务"),
+    ("skip_video", bool, "跳过视频任务"),
+    ("in_place_navigation", bool, "在课程页面内切换章节"),
+    ("pdf_concurrency", int, "每章同时执行的PDF任务数"),
+    ("video.stall_window", int, "视频停滞多少秒后尝试恢复播放"),
+    ("video.max_stall_attempts", int, "同一次停滞最多恢复的次数"),
+    ("video.reload_timeout", int, "重新加载视频的最长等待秒数"),
+    ("browser.profile", str, "浏览器启动配置: default / cached / headless"),
+    ("browser.headless", bool, "无头模式"),
+    ("browser.user_data_dir", str, "浏览器用户数据目录"),
+    ("browser.trim_background", bool, "关闭扩展、后台联网等与自动化无关的浏览器服务"),
+    ("browser.page_load_strategy", str, "页面加载策略: normal / eager / none"),
+    ("browser.extra_arguments", list, "追加的Chrome启动参数"),
+    ("prefetch.enabled", bool, "视频播放期间预取下一章节"),
+    ("prefetch.min_remaining", int, "视频剩余少于该秒数时不再推进预取"),
+    ("resources.enabled", bool, "拦截不需要的资源"),
+    ("resources.block", list, "拦截的资源地址模式，替换默认列表"),
+    ("resources.extra_block", list, "在默认列表之外追加拦截的资源地址模式"),
+    ("resources.measure", bool, "按章节统计网络流量"),
+    ("memory.enabled", bool, "检查浏览器内存并按需回收"),
+    ("memory.high_watermark_mb", int, "浏览器内存上限(MB)"),
+    ("memory.recycle_every", int, "每处理多少个章节回收一次浏览器"),
+    ("recovery.max_attempts", int, "两次取得进展之间最多恢复的次数"),
+    ("recovery.base_delay", float, "第一次恢复前的等待秒数，之后逐次加倍"),
+    ("recovery.max_delay", float, "恢复前等待的最长秒数"),
+    ("profiler.enabled", bool, "记录WebDriver命令耗时"),
+    ("profiler.output", str, "剖析结果JSON文件"),
+    ("profiler.folded_output", str, "火焰图折叠栈文件"),
+    ("metrics.enabled", bool, "启动指标和状态HTTP服务"),
+    ("metrics.host", str, "指标服务监听地址"),
+    ("metrics.port", int, "指标服务端口，被占用时依次尝试后面的端口"),
+    ("metrics.plan_file", str, "估计剩余时间使用的执行计划文件"),
+    ("orchestrator.sessions", int, "异步运行时同时打开的浏览器数"),
+    ("orchestrator.driver_threads", int, "异步运行时执行WebDriver命令的线程数"),
+    ("orchestrator.call_timeout", int, "单个WebDriver命令的期限(秒)，超过后重启浏览器"),
+    ("orchestrator.task_deadline", int, "单个任务的最短期限(秒)，视频按时长放宽"),
+    ("orchestrator.heartbeat_interval", int, "浏览器空闲超过该秒数时发送心跳命令，0表示不检查"),
+    ("orchestrator.heartbeat_timeout", int, "心跳命令和关闭浏览器的期限(秒)"),
+    ("orchestrator.progress_interval", int, "输出会话进度的间隔秒数，0表示不输出"),
+    ("orchestrator.video_deadline_factor", float, "视频任务期限为视频时长的倍数"),
+    ("orchestrator.video_deadline_slack", int, "视频任务期限在时长倍数之外的余量(秒)"),
+    ("snapshots.record", bool, "录制访问到的页面快照"),
+    ("snapshots.directory", str, "页面快照目录"),
+    ("snapshots.redact", list, "在账号之外从快照中抹去的文本"),
+    ("logging.level", str, "日志级别"),
+    ("logging.file", str, "日志文件"),
+    ("logging.json_file", str, "JSON日志文件"),
+    ("logging.max_bytes", int, "日志文件轮转前的最大字节数"),
+    ("logging.backup_count", int, "保留的轮转日志文件数"),
+    ("logging.progress_refresh", float, "视频进度条的刷新间隔秒数"),
+]
+
+def option_dest(path):
+    return path.replace(".", "_")
+
+def option_flag(path):
+    return "--" + option_dest(path).replace("_", "-")
+
+def option_env(path):
+    return ENV_PREFIX + option_dest(path).upper()
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"应为 {'/'.join(TRUE_VALUES)} 或 {'/'.join(FALSE_VALUES)}: {value}")
+
+def parse_list(value):
+    if isinstance(value, list):
+        return value
+    text = str(value).strip()
+    if text.startswith("["):
+        # Chrome启动参数等值本身可能含逗号，此时用JSON数组给出
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError(f"应为JSON数组: {value}")
+        return items
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+def parse_wait(value):
+    """
+    解析 名称=秒数 形式的等待配置
+    """
+    name, separator, seconds = str(value).partition("=")
+    if not separator or not name.strip():
+        raise ValueError(f"应为 名称=秒数: {value}")
+    return name.strip(), float(seconds)
+
+def convert(kind, value):
+    if kind is bool:
+        return parse_bool(value)
+    if kind is list:
+        return parse_list(value)
+    return kind(value)
+
+def get_path(config, path, default=None):
+    for key in path.split("."):
+        if not isinstance(config, dict) or key not in config:
+            return default
+        config = config[key]
+    return config
+
+def set_path(config, path, value):
+    keys = path.split(".")
+    for key in keys[:-1]:
+        config = config.setdefault(key, {})
+    config[keys[-1]] = value
+
+def load_config(file_name=None, environ=None):
+    """
+    读取配置文件，再用 MOOC_ 开头的环境变量覆盖；配置文件不存在时只使用环境变量
+    """
+    environ = os.environ if environ is None else environ
+    file_name = file_name or environ.get(ENV_PREFIX + "CONFIG", CONFIG_FILE)
+    config = {}
+    if os.path.exists(file_name):
+        with open(file_name, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    for path, kind, _ in OPTIONS:
+        value = environ.get(option_env(path))
+        if value is not None:
+            try:
+                value = convert(kind, value)
+            except ValueError:
+                # 保留原始字符串，由 validate_config 报告类型错误
+                pass
+            set_path(config, path, value)
+    for key, value in environ.items():
+        if key.startswith(WAITS_ENV_PREFIX) and len(key) > len(WAITS_ENV_PREFIX):
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+            set_path(config, "waits." + key[len(WAITS_ENV_PREFIX):].lower(), value)
+    return config
+
+def apply_overrides(config, values):
+    """
+    用命令行参数覆盖配置，values为 argparse 结果，未给出的参数为None
+    """
+    for path, _, _ in OPTIONS:
+        value = values.get(option_dest(path))
+        if value is not None:
+            set_path(config, path, value)
+    for name, seconds in values.get("wait") or []:
+        set_path(config, "waits." + name, seconds)
+    return config
+
+def validate_config(config, require_course=True):
+    """
+    检查配置，返回问题列表
+    """
+    if not isinstance(config, dict):
+        return ["配置必须是JSON对象"]
+    problems = []
+    for path, kind, _ in OPTIONS:
+        value = get_path(config, path)
+        if value is None:
+            continue
+        if kind in (int, float) and isinstance(value, (int, float)) and not isinstance(value, bool):
+            continue
+        if kind is list and isinstance(value, list):
+            if not all(isinstance(item, str) for item in value):
+                problems.append(f"{path} 应为字符串列表: {value!r}")
+            continue
+        if not isinstance(value, kind):
+            problems.append(f"{path} 应为 {kind.__name__}，实际为 {type(value).__name__}: {value!r}")
+    waits = config.get("waits")
+    if waits is not None:
+        if not isinstance(waits, dict):
+            problems.append("waits 应为 名称 -> 秒数 的对象")
+        else:
+            for name, seconds in waits.items():
+                if isinstance(seconds, bool) or not isinstance(seconds, (int, float)):
+                    problems.append(f"waits.{name} 应为秒数，实际为 {seconds!r}")
+    course_urls = config.get("course_urls")
+    if require_course and not config.get("course_url") and not course_urls:
+        problems.append(f"缺少 course_url（可在配置文件、{option_flag('course_url')} 或 {option_env('course_url')} 中给出）")
+    for key in ("course_url", "home_url"):
+        value = config.get(key)
+        if isinstance(value, str) and not value.startswith(("http://", "https://")):
+            problems.append(f"{key} 不是有效的链接: {value}")
+    return problems
@@ -0,0 +1,160 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class DriverCallTimeout(Exception):
+    """
+    WebDriver命令超过期限仍未返回
+    """
+
+def _advance(generator):
+    """
+    推进一步；StopIteration不能穿过Future，改为返回值
+    """
+    try:
+        return False, next(generator)
+    except StopIteration:
+        return True, None
+
+class DriverExecutor:
+    def __init__(self, max_workers=2):
+        # 所有会话共用的WebDriver线程池；线程只在命令执行期间被占用，
+        # 等待视频进度、阅读停顿等都在事件循环中完成，线程数可以远少于浏览器数
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="webdriver")
+
+    def channel(self, name, call_timeout=180):
+        return DriverChannel(self, name, call_timeout)
+
+    def shutdown(self):
+        # 卡死的命令可能永远不会返回，不等待它们结束
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class DriverChannel:
+    def __init__(self, executor, name, call_timeout=180):
+        self.executor = executor
+        self.name = name
+        # 单个命令的默认期限（秒），None表示不限
+        self.call_timeout = call_timeout
+        self.calls = 0
+        self.busy_seconds = 0.0
+        self.broken = False
+        # 正在执行的命令: (说明, 开始时间)
+        self.current = None
+        self.last_call_end = time.monotonic()
+        self._lock = asyncio.Lock()
+        # 被取消时仍有一步在执行的分步任务，等这一步返回后再关闭
+        self._close_after = []
+
+    async def call(self, fn, *args, label=None, timeout=None, **kwargs):
+        """
+        在线程池中执行一次阻塞的WebDriver调用；同一浏览器的调用依次执行，不会并发
+        等待方被取消或超时后，锁一直保持到命令真正返回，之后的调用不会与它同时操作浏览器
+        """
+        if self.broken:
+            raise DriverCallTimeout(f"{self.name}: 之前的命令未返回，浏览器已不可用")
+        timeout = self.call_timeout if timeout is None else timeout
+        await self._lock.acquire()
+        label = label or getattr(fn, "__name__", "call")
+        self.current = (label, time.monotonic())
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor.pool, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self.current = None
+            self._lock.release()
+            raise
+        future.add_done_callback(self._finished)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.broken = True
+            raise DriverCallTimeout(f"{self.name}: {label} 超过 {timeout}秒未返回") from None
+
+    def _finished(self, future):
+        label, start = self.current
+        elapsed = time.monotonic() - start
+        self.calls += 1
+        self.busy_seconds += elapsed
+        self.current = None
+        self.last_call_end = time.monotonic()
+        if not future.cancelled() and future.exception() is not None and self.broken:
+            # 等待方早已放弃，这里只记录，避免出现未取回的异常警告
+            logging.debug(f"{self.name}: 超时的命令 {label} 最终失败: {future.exception()}")
+        pending, self._close_after = self._close_after, []
+        for generator in pending:
+            try:
+                generator.close()
+            except Exception as e:
+                logging.debug(f"{self.name}: 关闭已取消的分步任务时出错: {str(e)}")
+        self._lock.release()
+
+    async def steps(self, generator, label=None):
+        """
+        推进分步执行的任务：每一步在线程池中执行，步与步之间的等待交给事件循环
+        """
+        try:
+            while True:
+                finished, delay = await self.call(_advance, generator, label=label)
+                if finished:
+                    return
+                if delay:
+                    await asyncio.sleep(delay)
+        finally:
+            if self.current is None:
+                generator.close()
+            else:
+                self._close_after.append(generator)
+
+    def idle(self):
+        return self.current is None and not self._lock.locked()
+
+    def outstanding(self):
+        """
+        正在执行的命令及其已用秒数，没有时返回None
+        """
+        current = self.current
+        if current is None:
+            return None
+        return current[0], time.monotonic() - current[1]
+
+    async def wait_idle(self, timeout):
+        """
+        等待正在执行的命令返回，超时返回False
+        """
+        try:
+            await asyncio.wait_for(self._lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._lock.release()
+        return True
+
+    async def force(self, fn, *args):
+        """
+        绕过顺序在独立线程中执行，用于关闭卡死的浏览器；线程池被卡住的命令占满时也能执行
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(result, error):
+            # 等待方超时放弃后不再设置结果
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        def target():
+            try:
+                result = fn(*args)
+            except Exception as e:
+                loop.call_soon_threadsafe(settle, None, e)
+            else:
+                loop.call_soon_threadsafe(settle, result, None)
+
+        threading.Thread(target=target, name=f"{self.name}-force", daemon=True).start()
+        return await future
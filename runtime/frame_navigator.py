@@ -0,0 +1,134 @@
+import logging
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+class Frame:
+    __slots__ = ("key", "condition", "wait_name")
+
+    def __init__(self, key, locator=None, condition=None, wait_name=None):
+        # key 唯一标识一层frame，相同key的frame元素可以复用
+        self.key = key
+        self.condition = condition or EC.presence_of_element_located(locator)
+        self.wait_name = wait_name or key
+
+# 课程页面中常用的几层frame
+MAIN_FRAME = Frame("iframe", (By.CSS_SELECTOR, 'iframe#iframe, iframe[name="iframe"]'), wait_name="main_iframe")
+CHAPTER_LIST_FRAME = Frame(
+    "frame_content-zj",
+    (By.CSS_SELECTOR, 'iframe#frame_content-zj, iframe[name="frame_content-zj"]'),
+    wait_name="chapter_list_iframe",
+)
+PAN_VIEW_FRAME = Frame("panView", (By.ID, "panView"), wait_name="pdf_pan_view")
+
+class FrameNavigator:
+    def __init__(self, driver, wait_policy):
+        self.driver = driver
+        self.wait_policy = wait_policy
+        # 当前所在的frame路径；None表示未知，下次切换需先回到主文档
+        self.path = ()
+        # frame路径 -> 该路径最后一层的frame元素
+        self._elements = {}
+        self.switches = 0
+        self.switches_avoided = 0
+        self.lookups_avoided = 0
+
+    def page_loaded(self):
+        """
+        driver.get之后调用：已回到新页面的主文档，缓存的frame元素全部失效
+        """
+        self.path = ()
+        self._elements.clear()
+
+    def window_switched(self):
+        """
+        切换窗口后回到了该窗口的主文档，已缓存的frame元素仍属于原窗口，保留
+        在多个窗口间切换的模块（预取窗口、PDF标签页）持有主窗口的导航器，切回主窗口后需要调用它的这个方法
+        """
+        self.path = ()
+
+    def invalidate(self):
+        """
+        页面可能在脚本中发生了跳转，当前位置和缓存都不再可信
+        """
+        self.path = None
+        self._elements.clear()
+
+    def switch_to(self, *frames):
+        """
+        切换到目标frame路径，只发出必要的切换命令；不传参数表示回到主文档
+        """
+        target = tuple(frame.key for frame in frames)
+        try:
+            issued = self._switch(frames, target)
+        except TimeoutException:
+            raise
+        except WebDriverException as e:
+            # 页面状态和记录不一致（例如frame已被重新加载），从主文档重新进入
+            logging.debug(f"frame切换失败，从主文档重新进入: {str(e)}")
+            self.invalidate()
+            issued = self._switch(frames, target)
+        # 原先的做法：每次从主文档逐层进入，用完后再逐层切回主文档；回到主文档本身也要一条命令
+        # 失效后重新进入可能比原先的做法多发命令，此时不计入避免的次数
+        baseline = 2 * len(target) if target else 1
+        self.switches_avoided += max(0, baseline - issued)
+
+    def _switch(self, frames, target):
+        issued = 0
+        if self.path is None:
+            self.driver.switch_to.default_content()
+            self.path = ()
+            issued += 1
+
+        common = 0
+        while common < min(len(self.path), len(target)) and self.path[common] == target[common]:
+            common += 1
+
+        # 退到公共前缀：逐层parent_frame或直接回主文档再进入，取命令数更少的一种
+        depth = len(self.path)
+        if depth > common:
+            if common > 0 and depth - common <= 1 + common:
+                for _ in range(depth - common):
+                    self.driver.switch_to.parent_frame()
+                    self.path = self.path[:-1]
+                    issued += 1
+            else:
+                self.driver.switch_to.default_content()
+                self.path = ()
+                issued += 1
+
+        # 从当前位置逐层进入剩余的frame
+        while len(self.path) < len(target):
+            frame = frames[len(self.path)]
+            issued += self._enter(frame, self.path + (frame.key,))
+        self.switches += issued
+        return issued
+
+    def _enter(self, frame, path):
+        element = self._elements.get(path)
+        if element is not None:
+            try:
+                self.driver.switch_to.frame(element)
+                self.path = path
+                self.lookups_avoided += 1
+                return 1
+            except WebDriverException:
+                # 缓存的frame元素已过期，重新查找
+                self._forget(path)
+        element = self.wait_policy.until(frame.wait_name, frame.condition)
+        self.driver.switch_to.frame(element)
+        self._elements[path] = element
+        self.path = path
+        return 1
+
+    def _forget(self, path):
+        for cached in [p for p in self._elements if p[:len(path)] == path]:
+            del self._elements[cached]
+
+    def stats(self):
+        return {
+            "switches": self.switches,
+            "switches_avoided": self.switches_avoided,
+            "lookups_avoided": self.lookups_avoided,
+        }
\ No newline at end of file
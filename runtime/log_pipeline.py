@@ -0,0 +1,143 @@
+import atexit
+import json
+import logging
+import multiprocessing
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+EVENT_LOGGER = "mooc.events"
+# 结构化事件附带的字段，JSON日志中原样输出
+EVENT_FIELDS = ("event", "phase", "chapter", "task", "task_type", "outcome", "duration")
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in EVENT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False)
+
+_listener = None
+# 主进程中接收工作进程日志的监听器
+_worker_listener = None
+
+def setup_logging(file_name='mooc.log', json_file=None, max_bytes=10 * 1024 * 1024, backup_count=3,
+                  level="INFO", console=True):
+    """
+    配置异步日志：调用方只把记录放入队列，由后台线程格式化并写入文件和控制台
+    """
+    global _listener
+    stop_logging()
+
+    handlers = []
+    if file_name:
+        file_handler = RotatingFileHandler(
+            file_name, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+    if json_file:
+        json_handler = RotatingFileHandler(
+            json_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """
+    写出队列中剩余的日志并停止后台线程
+    """
+    global _listener, _worker_listener
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def listen_for_workers():
+    """
+    创建工作进程使用的日志队列：工作进程只把记录放入队列，由主进程的后台线程写入同一组日志文件，文件只在主进程中轮转
+    """
+    global _worker_listener
+    if _listener is None:
+        return None
+    log_queue = multiprocessing.Queue(-1)
+    _worker_listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _worker_listener.start()
+    return log_queue
+
+def attach_worker(log_queue, level="INFO"):
+    """
+    工作进程初始化：日志全部交给主进程写出，不打开自己的日志文件
+    """
+    global _listener
+    # fork继承来的监听器和文件属于主进程，子进程中既不关闭也不重启
+    _listener = None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+atexit.register(stop_logging)
+
+def log_event(event, message, level=logging.INFO, **fields):
+    """
+    记录一条结构化事件，fields 取 EVENT_FIELDS 中的字段
+    """
+    logging.getLogger(EVENT_LOGGER).log(level, message, extra=dict(fields, event=event))
+
+class ProgressLine:
+    def __init__(self, min_interval=1.0, stream=None):
+        self.min_interval = min_interval
+        self.stream = stream or sys.stdout
+        # 输出不是终端（重定向到文件、计划任务等）时不渲染进度行
+        self.enabled = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self._last = 0.0
+        self._width = 0
+
+    def update(self, text):
+        """
+        在同一行刷新进度，两次刷新间隔小于 min_interval 时直接丢弃
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self._last < self.min_interval:
+            return
+        self._last = now
+        self.stream.write("\r" + text.ljust(self._width))
+        self.stream.flush()
+        self._width = len(text)
+
+    def finish(self):
+        if self.enabled and self._width:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._width = 0
@@ -0,0 +1,104 @@
+import logging
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def browser_rss(driver):
+    """
+    浏览器所有进程（ChromeDriver启动的全部子孙进程）的常驻内存之和，单位字节；未安装psutil或无法获取时返回None
+    """
+    if psutil is None:
+        return None
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is None:
+        return None
+    try:
+        children = psutil.Process(process.pid).children(recursive=True)
+    except psutil.Error:
+        return None
+    total = 0
+    for child in children:
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+class MemoryWatchdog:
+    def __init__(self, high_watermark_mb=1500, recycle_every=0):
+        # 浏览器常驻内存超过该值（MB）时回收浏览器
+        self.high_watermark_mb = high_watermark_mb
+        # 每处理多少个章节回收一次浏览器，0表示不按章节数回收
+        self.recycle_every = recycle_every
+        self.driver = None
+        self.timeline = []
+        self.recycles = 0
+        self._chapters_at_launch = 0
+        self._metrics_enabled = False
+        self._rss_warned = False
+
+    def attach(self, driver, chapters_done=0):
+        """
+        绑定新启动的浏览器
+        """
+        self.driver = driver
+        self._chapters_at_launch = chapters_done
+        self._metrics_enabled = False
+
+    def _js_heap(self):
+        try:
+            if not self._metrics_enabled:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
+                self._metrics_enabled = True
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        except Exception as e:
+            logging.debug(f"读取页面内存指标失败: {str(e)}")
+            return None
+        for metric in metrics:
+            if metric["name"] == "JSHeapUsedSize":
+                return metric["value"]
+        return None
+
+    def sample(self, label=None):
+        """
+        采样一次浏览器内存并加入时间线
+        """
+        rss = browser_rss(self.driver)
+        heap = self._js_heap()
+        point = {
+            "time": round(time.time(), 3),
+            "label": label,
+            "rss_mb": round(rss / 1024 / 1024, 1) if rss is not None else None,
+            "js_heap_mb": round(heap / 1024 / 1024, 1) if heap is not None else None,
+        }
+        self.timeline.append(point)
+        logging.info(f"内存: 浏览器进程 {point['rss_mb']}MB，当前页面JS堆 {point['js_heap_mb']}MB ({label})")
+        return point
+
+    def check(self, chapters_done, label=None):
+        """
+        章节之间调用：采样内存，返回是否需要回收浏览器
+        """
+        point = self.sample(label)
+        if point["rss_mb"] is None and not self._rss_warned:
+            logging.warning("无法读取浏览器进程内存（请安装psutil），按内存上限回收浏览器的功能不会生效")
+            self._rss_warned = True
+        if point["rss_mb"] is not None and point["rss_mb"] >= self.high_watermark_mb:
+            logging.info(f"浏览器内存 {point['rss_mb']}MB 超过上限 {self.high_watermark_mb}MB，回收浏览器")
+            return True
+        if self.recycle_every and chapters_done - self._chapters_at_launch >= self.recycle_every:
+            logging.info(f"浏览器已连续处理 {chapters_done - self._chapters_at_launch} 个章节，回收浏览器")
+            return True
+        return False
+
+    def summary(self):
+        rss = [point["rss_mb"] for point in self.timeline if point["rss_mb"] is not None]
+        return {
+            "recycles": self.recycles,
+            "peak_rss_mb": max(rss) if rss else None,
+            "timeline": self.timeline,
+        }
@@ -0,0 +1,332 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 秒为单位的直方图分桶
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TASK_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# 指标名 -> (类型, 说明)
+METRICS = {
+    "mooc_start_time_seconds": ("gauge", "运行开始的Unix时间"),
+    "mooc_chapters_done_total": ("counter", "已处理的章节数，按是否全部完成区分"),
+    "mooc_chapters_remaining": ("gauge", "尚未处理的未完成章节数"),
+    "mooc_tasks_total": ("counter", "已结束的任务数，按类型和结果区分"),
+    "mooc_task_duration_seconds": ("histogram", "任务耗时"),
+    "mooc_video_seconds_played_total": ("counter", "已播放的视频秒数"),
+    "mooc_webdriver_command_seconds": ("histogram", "WebDriver命令耗时"),
+    "mooc_eta_seconds": ("gauge", "根据剩余视频时长估计的剩余秒数"),
+}
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels, ('le', _number(float(bound))))} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+class RunMetrics:
+    def __init__(self, plan_file=None):
+        self._lock = threading.Lock()
+        # (指标名, 标签元组) -> 数值或直方图
+        self.values = {}
+        self.start = time.time()
+        self.course_url = None
+        self.state = "starting"
+        self.current_chapter = None
+        self.current_task = None
+        self.last_progress = None
+        self.values[("mooc_start_time_seconds", ())] = self.start
+
+        # 章节标识 -> 执行计划中该章节待播放的视频秒数
+        self.planned_video = self._load_plan(plan_file)
+        self.pending_chapters = []
+        # 当前章节估计还需播放的视频秒数，以及正在播放的视频的剩余秒数
+        self.chapter_video_left = 0.0
+        self.video_left = 0.0
+        self._video_position = 0.0
+        self._video_duration = None
+        # 运行中实际观察到的视频时长，没有执行计划时用来估计
+        self.video_durations = []
+
+    @staticmethod
+    def _load_plan(plan_file):
+        if not plan_file or not os.path.exists(plan_file):
+            return {}
+        try:
+            with open(plan_file, 'r', encoding='utf-8') as f:
+                plan = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"读取执行计划 {plan_file} 失败，剩余时间只按已播放的视频估计: {str(e)}")
+            return {}
+        planned = {}
+        for chapter in plan.get("course", {}).get("chapters", []):
+            if chapter.get("tasks") is None:
+                continue
+            planned[chapter["onclick"]] = sum(
+                task.get("duration") or 0.0 for task in chapter["tasks"]
+                if task["type"] == "video" and not task["is_finished"]
+            )
+        logging.info(f"已从 {plan_file} 读取 {len(planned)} 个章节的视频时长，用于估计剩余时间")
+        return planned
+
+    def _inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.values[key] = self.values.get(key, 0) + value
+
+    def _observe(self, name, buckets, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.values.get(key)
+        if histogram is None:
+            histogram = self.values[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    def _chapter_estimate(self, chapter):
+        """
+        估计一个章节待播放的视频秒数：优先使用执行计划，其次按已扫描的视频任务数和观察到的平均视频时长
+        """
+        planned = self.planned_video.get(chapter.onclick)
+        if planned is not None:
+            return planned
+        average = sum(self.video_durations) / len(self.video_durations) if self.video_durations else 0.0
+        if chapter.tasks is not None:
+            return average * sum(1 for task in chapter.tasks if task.type == "video" and not task.is_finished)
+        known = list(self.planned_video.values())
+        if known:
+            return sum(known) / len(known)
+        return average
+
+    def _update_eta(self):
+        current = max(self.chapter_video_left, self.video_left)
+        remaining = sum(self._chapter_estimate(chapter) for chapter in self.pending_chapters)
+        self.values[("mooc_eta_seconds", ())] = round(current + remaining, 1)
+
+    def course_started(self, course_url):
+        with self._lock:
+            self.course_url = course_url
+            self.state = "running"
+
+    def chapters_pending(self, chapters):
+        """
+        更新尚未处理的章节列表（不含当前章节）
+        """
+        with self._lock:
+            self.pending_chapters = list(chapters)
+            self.values[("mooc_chapters_remaining", ())] = len(self.pending_chapters)
+            self._update_eta()
+
+    def chapter_started(self, chapter):
+        with self._lock:
+            self.current_chapter = chapter.title
+            self.chapter_video_left = self._chapter_estimate(chapter)
+            self.video_left = 0.0
+            self._update_eta()
+
+    def chapter_tasks(self, chapter, tasks):
+        """
+        章节任务扫描完成后，没有执行计划时按视频任务数重新估计当前章节
+        """
+        if chapter.onclick in self.planned_video or not self.video_durations:
+            return
+        with self._lock:
+            average = sum(self.video_durations) / len(self.video_durations)
+            self.chapter_video_left = average * sum(
+                1 for task in tasks if task.type == "video" and not task.is_finished
+            )
+            self._update_eta()
+
+    def chapter_done(self, chapter, outcome):
+        with self._lock:
+            self._inc("mooc_chapters_done_total", outcome=outcome)
+            self.current_chapter = None
+            self.chapter_video_left = 0.0
+            self.video_left = 0.0
+            self.last_progress = time.time()
+            self._update_eta()
+
+    def task_started(self, task):
+        with self._lock:
+            self.current_task = task.title
+            self._video_position = 0.0
+            self._video_duration = None
+
+    def task_done(self, task, outcome, duration):
+        with self._lock:
+            self._inc("mooc_tasks_total", type=task.type, outcome=outcome)
+            self._observe("mooc_task_duration_seconds", TASK_BUCKETS, duration, type=task.type)
+            if task.type == "video" and outcome == "done" and self._video_duration:
+                self.video_durations.append(self._video_duration)
+            self.video_left = 0.0
+            self.current_task = None
+            self.last_progress = time.time()
+
+    def video_progress(self, current_time, duration):
+        """
+        视频进度回调：累计播放秒数并更新剩余时间
+        """
+        with self._lock:
+            played = max(0.0, current_time - self._video_position)
+            self._video_position = max(self._video_position, current_time)
+            self._inc("mooc_video_seconds_played_total", played)
+            self.chapter_video_left = max(0.0, self.chapter_video_left - played)
+            self.video_left = max(0.0, duration - current_time)
+            self._video_duration = duration
+            self.last_progress = time.time()
+            self._update_eta()
+
+    def webdriver_command(self, command, elapsed):
+        with self._lock:
+            self._observe("mooc_webdriver_command_seconds", LATENCY_BUCKETS, elapsed, command=command)
+
+    def finished(self, error=None):
+        with self._lock:
+            self.state = "failed" if error else "finished"
+            self.current_chapter = None
+            self.current_task = None
+
+    def render(self):
+        """
+        生成Prometheus文本格式的指标
+        """
+        with self._lock:
+            items = sorted(self.values.items(), key=lambda item: item[0])
+            lines = []
+            described = set()
+            for (name, labels), value in items:
+                if name not in described:
+                    kind, description = METRICS[name]
+                    lines.append(f"# HELP {name} {description}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    described.add(name)
+                if isinstance(value, Histogram):
+                    lines.extend(value.render(name, labels))
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def status(self):
+        """
+        运行状态的简要JSON，供同一台机器上的多个会话集中查看
+        """
+        with self._lock:
+            tasks = {}
+            chapters = {}
+            for (name, labels), value in self.values.items():
+                labels = dict(labels)
+                if name == "mooc_tasks_total":
+                    tasks.setdefault(labels["type"], {})[labels["outcome"]] = value
+                elif name == "mooc_chapters_done_total":
+                    chapters[labels["outcome"]] = value
+            return {
+                "pid": os.getpid(),
+                "course_url": self.course_url,
+                "state": self.state,
+                "uptime": round(time.time() - self.start, 1),
+                "current_chapter": self.current_chapter,
+                "current_task": self.current_task,
+                "chapters_done": chapters,
+                "chapters_remaining": len(self.pending_chapters),
+                "tasks": tasks,
+                "video_seconds_played": round(self.values.get(("mooc_video_seconds_played_total", ()), 0.0), 1),
+                "eta_seconds": self.values.get(("mooc_eta_seconds", ())),
+                "last_progress": round(self.last_progress, 3) if self.last_progress else None,
+            }
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        metrics = self.server.metrics
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._reply(200, "text/plain; version=0.0.4; charset=utf-8", metrics.render())
+        elif path in ("/", "/status"):
+            self._reply(200, "application/json; charset=utf-8",
+                        json.dumps(metrics.status(), ensure_ascii=False))
+        else:
+            self._reply(404, "text/plain; charset=utf-8", "not found\n")
+
+    def _reply(self, status, content_type, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.debug("指标服务: " + format % args)
+
+class MetricsServer:
+    def __init__(self, metrics, host="127.0.0.1", port=9108, port_attempts=20):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        # 同一台机器上运行多个会话时，端口被占用就依次尝试后面的端口
+        self.port_attempts = port_attempts
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """
+        在后台线程中启动HTTP服务，所有端口都被占用时只记录警告，不影响运行
+        """
+        for offset in range(max(1, self.port_attempts) if self.port else 1):
+            try:
+                self.server = ThreadingHTTPServer((self.host, self.port + offset), _Handler)
+                break
+            except OSError as e:
+                error = e
+        else:
+            logging.warning(f"无法启动指标服务: {str(error)}")
+            return None
+        self.server.daemon_threads = True
+        self.server.metrics = self.metrics
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mooc-metrics", daemon=True)
+        self.thread.start()
+        logging.info(f"指标服务已启动: http://{self.host}:{self.port}/metrics ，状态: http://{self.host}:{self.port}/status")
+        return self.port
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
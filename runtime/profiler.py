@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 调用位置跳过的本项目文件：剖析器自身，以及所有命名等待都经过的等待策略
+SKIPPED_SITE_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "wait_policy.py"),
+}
+
+class CommandStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+class Profiler:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        # 阶段栈按线程保存：PDF标签页和异步调度的线程池中的命令不会互相打乱阶段
+        self._local = threading.local()
+        self.current_chapter = None
+        self.run_start = time.time()
+        # (章节, 阶段, 调用位置, 命令) -> 统计；只做聚合，不保存逐条记录，开销保持在常数级
+        self.records = {}
+        self.phase_seconds = {}
+        self._site_cache = {}
+        self._lock = threading.Lock()
+        # 每条命令结束后调用 observer(命令, 耗时)，剖析关闭时也会生效
+        self.observers = []
+
+    def attach(self, driver):
+        """
+        给driver的命令通道装上计时，返回同一个driver
+        """
+        if not (self.enabled or self.observers) or getattr(driver, "_mooc_profiler", None) is self:
+            return driver
+        original = driver.execute
+        profiler = self
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                if profiler.enabled:
+                    profiler.record(driver_command, elapsed, sys._getframe(1))
+                for observer in profiler.observers:
+                    observer(driver_command, elapsed)
+
+        driver.execute = execute
+        driver._mooc_profiler = self
+        return driver
+
+    def _call_site(self, frame):
+        """
+        找到调用链中第一个属于本项目且不在selenium内部的栈帧，等待策略中的等待记到调用等待的位置
+        """
+        while frame is not None:
+            code = frame.f_code
+            filename = code.co_filename
+            if filename.startswith(REPO_ROOT) and filename not in SKIPPED_SITE_FILES and "selenium" not in filename:
+                key = (filename, frame.f_lineno)
+                site = self._site_cache.get(key)
+                if site is None:
+                    relative = os.path.relpath(filename, REPO_ROOT).replace(os.sep, "/")
+                    site = f"{relative}:{frame.f_lineno} {code.co_name}"
+                    self._site_cache[key] = site
+                return site
+            frame = frame.f_back
+        return "<external>"
+
+    @property
+    def phases(self):
+        phases = getattr(self._local, "phases", None)
+        if phases is None:
+            phases = self._local.phases = ["other"]
+        return phases
+
+    def record(self, command, elapsed, frame=None):
+        key = (self.current_chapter, self.phases[-1], self._call_site(frame), command)
+        with self._lock:
+            stats = self.records.get(key)
+            if stats is None:
+                stats = self.records[key] = CommandStats()
+            stats.add(elapsed)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        标记当前所处的阶段：login / chapter_scan / task_scan / navigation / pdf / video
+        """
+        phases = self.phases
+        phases.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            phases.pop()
+            with self._lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def chapter(self, title):
+        previous = self.current_chapter
+        self.current_chapter = title
+        try:
+            yield
+        finally:
+            self.current_chapter = previous
+
+    def _aggregate(self, chapter=None, by_chapter=False):
+        result = {}
+        with self._lock:
+            items = list(self.records.items())
+        for (record_chapter, phase, site, command), stats in items:
+            if by_chapter and record_chapter != chapter:
+                continue
+            phase_entry = result.setdefault(phase, {"count": 0, "total_ms": 0.0, "commands": {}})
+            phase_entry["count"] += stats.count
+            phase_entry["total_ms"] = round(phase_entry["total_ms"] + stats.total * 1000, 3)
+            command_entry = phase_entry["commands"].setdefault(f"{command} @ {site}", CommandStats())
+            command_entry.count += stats.count
+            command_entry.total += stats.total
+            command_entry.max = max(command_entry.max, stats.max)
+        for phase_entry in result.values():
+            phase_entry["commands"] = {
+                name: stats.to_dict() for name, stats in
+                sorted(phase_entry["commands"].items(), key=lambda item: -item[1].total)
+            }
+        return result
+
+    def report(self):
+        """
+        生成整次运行和每个章节的性能剖析数据
+        """
+        with self._lock:
+            chapters = sorted({key[0] for key in self.records if key[0] is not None})
+        return {
+            "elapsed": round(time.time() - self.run_start, 3),
+            "phase_seconds": {name: round(seconds, 3) for name, seconds in list(self.phase_seconds.items())},
+            "command_counts": {phase: entry["count"] for phase, entry in self._aggregate().items()},
+            "run": self._aggregate(),
+            "chapters": {title: self._aggregate(title, by_chapter=True) for title in chapters},
+        }
+
+    def folded_stacks(self):
+        """
+        生成火焰图使用的折叠栈文本，每行: 阶段;调用位置;命令 耗时(微秒)
+        """
+        totals = {}
+        with self._lock:
+            items = list(self.records.items())
+        for (_, phase, site, command), stats in items:
+            key = f"{phase};{site};{command}"
+            totals[key] = totals.get(key, 0.0) + stats.total
+        return "\n".join(
+            f"{key} {int(total * 1_000_000)}" for key, total in sorted(totals.items())
+        )
+
+    def text_summary(self, limit=5):
+        """
+        按阶段列出最耗时的命令
+        """
+        lines = []
+        for phase, entry in sorted(self._aggregate().items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(f"{phase}: {entry['count']} 次命令，{entry['total_ms']:.0f}ms")
+            for name, stats in list(entry["commands"].items())[:limit]:
+                lines.append(f"    {stats['total_ms']:>10.0f}ms {stats['count']:>6} 次  {name}")
+        return "\n".join(lines)
+
+    def write(self, json_path, folded_path=None):
+        if not self.enabled:
+            return
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        if folded_path:
+            with open(folded_path, "w", encoding="utf-8") as f:
+                f.write(self.folded_stacks() + "\n")
+        logging.info(f"性能剖析已写入 {json_path}")
+        logging.info("WebDriver命令耗时汇总:\n" + self.text_summary())
\ No newline at end of file
@@ -0,0 +1,101 @@
+import json
+import logging
+
+# 执行器都不需要的资源：字体、统计和广告脚本
+# PDF的 .fileBox img 不能拦截，PDF执行器依赖图片加载完成和图片高度来滚动阅读
+# 模式匹配整个地址，字体地址常带版本参数（如 font.woff?v=3），需要另列带查询参数的形式
+DEFAULT_BLOCKED_URLS = [
+    "*.woff",
+    "*.woff?*",
+    "*.woff2",
+    "*.woff2?*",
+    "*.ttf",
+    "*.ttf?*",
+    "*.otf",
+    "*.otf?*",
+    "*.eot",
+    "*.eot?*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*hm.baidu.com*",
+    "*cnzz.com*",
+    "*51.la*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+]
+
+class ResourceUsage:
+    __slots__ = ("requests", "bytes", "blocked")
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+
+    def to_dict(self):
+        return {"requests": self.requests, "bytes": self.bytes, "blocked": self.blocked}
+
+class ResourcePolicy:
+    def __init__(self, driver, blocked_urls=None, measure=False):
+        self.driver = driver
+        self.blocked_urls = list(DEFAULT_BLOCKED_URLS if blocked_urls is None else blocked_urls)
+        # 从浏览器的performance日志中统计拦截数，需要启动时开启 network_log
+        # measure为True时每个章节还输出请求数和传输字节数
+        self.measure = measure
+        self.total = ResourceUsage()
+        self.chapters = {}
+
+    def apply(self):
+        """
+        在当前窗口上启用拦截；CDP命令只作用于当前窗口，新开的窗口或标签页需要再次调用
+        """
+        if not self.blocked_urls:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        except Exception as e:
+            logging.warning(f"启用资源拦截失败: {str(e)}")
+
+    def collect(self):
+        """
+        读取上次调用以来的网络事件，返回这段时间的请求数、传输字节数和被拦截的请求数
+        performance日志属于整个浏览器，预取窗口和PDF标签页的流量也包含在内
+        """
+        usage = ResourceUsage()
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logging.debug(f"读取performance日志失败: {str(e)}")
+            return usage
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method")
+            if method == "Network.loadingFinished":
+                usage.requests += 1
+                usage.bytes += int(message["params"].get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and message["params"].get("blockedReason"):
+                usage.blocked += 1
+        for name in ResourceUsage.__slots__:
+            setattr(self.total, name, getattr(self.total, name) + getattr(usage, name))
+        return usage
+
+    def chapter_done(self, title):
+        """
+        记录一个章节期间的流量，默认只输出拦截的请求数
+        """
+        usage = self.collect()
+        self.chapters[title] = usage.to_dict()
+        if self.measure:
+            logging.info(
+                f"章节 {title}: 请求 {usage.requests} 个，传输 {usage.bytes / 1024:.0f}KB，拦截 {usage.blocked} 个请求"
+            )
+        else:
+            logging.info(f"章节 {title}: 拦截 {usage.blocked} 个请求")
+
+    def summary(self):
+        return {
+            "blocked_urls": len(self.blocked_urls),
+            "total": self.total.to_dict(),
+            "chapters": self.chapters,
+        }
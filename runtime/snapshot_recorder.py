@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+# 复制当前文档并在副本上脱敏：去掉脚本和外部资源，清空表单值，子frame换成占位标记
+# 返回副本的HTML、文档地址，以及与副本中占位标记顺序一致的真实frame元素
+CAPTURE_DOCUMENT = """
+var clone = document.documentElement.cloneNode(true);
+var removed = clone.querySelectorAll(
+    'script, noscript, object, embed, base, link[rel~="stylesheet"], link[rel~="preload"], '
+    + 'link[rel~="prefetch"], link[rel~="icon"], link[rel~="manifest"]'
+);
+for (var i = 0; i < removed.length; i++) {
+    removed[i].parentNode.removeChild(removed[i]);
+}
+var all = clone.querySelectorAll('*');
+for (var j = 0; j < all.length; j++) {
+    var element = all[j];
+    var names = [];
+    for (var k = 0; k < element.attributes.length; k++) {
+        names.push(element.attributes[k].name);
+    }
+    for (var n = 0; n < names.length; n++) {
+        var name = names[n].toLowerCase();
+        // onclick 是章节的唯一标识，保留；其余事件属性和 data-* 属性（常带有用户编号、姓名等）一律去掉
+        if ((name.indexOf('on') === 0 && name !== 'onclick') || name.indexOf('data-') === 0
+                || name === 'srcset' || name === 'integrity' || name === 'nonce') {
+            element.removeAttribute(names[n]);
+        }
+    }
+}
+var metas = clone.querySelectorAll('meta[content]');
+for (var r = 0; r < metas.length; r++) {
+    metas[r].removeAttribute('content');
+}
+var inputs = clone.querySelectorAll('input, textarea, select option');
+for (var m = 0; m < inputs.length; m++) {
+    inputs[m].removeAttribute('value');
+    inputs[m].removeAttribute('checked');
+    inputs[m].removeAttribute('selected');
+    if (inputs[m].tagName === 'TEXTAREA') {
+        inputs[m].textContent = '';
+    }
+}
+var images = clone.querySelectorAll('img, source, video, audio');
+for (var p = 0; p < images.length; p++) {
+    if (images[p].hasAttribute('src')) {
+        images[p].setAttribute('src', arguments[0]);
+    }
+    images[p].removeAttribute('poster');
+}
+var live = document.querySelectorAll('iframe, frame');
+var frames = clone.querySelectorAll('iframe, frame');
+for (var q = 0; q < frames.length; q++) {
+    frames[q].removeAttribute('src');
+    frames[q].removeAttribute('srcdoc');
+    frames[q].setAttribute('data-snapshot-frame', String(q));
+}
+return {url: location.href, html: clone.outerHTML, frames: Array.prototype.slice.call(live)};
+"""
+
+# 1x1透明GIF，替换所有图片地址，快照中不引用任何外部资源
+BLANK_IMAGE = "data:image/gif;base64,R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=="
+
+# 内联样式中的外部资源（字体、背景图）
+STYLE_URL = re.compile(r"url\(\s*(['\"]?)(?!data:)[^)]*\1\s*\)", re.IGNORECASE)
+# 链接和表单地址：站外地址换成"#"，站内地址去掉查询参数
+ABSOLUTE_URL_ATTRIBUTE = re.compile(r'\b(href|action)="(https?:)?//[^"]*"', re.IGNORECASE)
+URL_QUERY_ATTRIBUTE = re.compile(r'\b(href|action)="([^"?#]*)[?#][^"]*"', re.IGNORECASE)
+
+def sanitize_url(url):
+    """
+    去掉查询参数和片段，其中常带有会话令牌
+    """
+    parts = urlsplit(url or "")
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+class SnapshotRecorder:
+    def __init__(self, driver, directory="snapshots", redact=None, max_depth=4):
+        self.driver = driver
+        self.directory = directory
+        # 需要从快照中抹去的字符串，如账号、姓名
+        self.redact = [value for value in (redact or []) if value]
+        self.max_depth = max_depth
+        self.captures = []
+        self.manifest_file = os.path.join(directory, "manifest.json")
+        if os.path.exists(self.manifest_file):
+            # 追加到已有的录制结果之后
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.captures = json.load(f).get("captures", [])
+
+    def add_redaction(self, value):
+        """
+        追加需要抹去的字符串，如页头中显示的姓名
+        """
+        if value and value not in self.redact:
+            self.redact.append(value)
+
+    def capture(self, kind, label="", expected=None):
+        """
+        从主文档开始录制当前页面及其所有frame，kind为 home / login / course / chapter
+        expected 为本次运行在该页面上得到的结果（章节数、各类任务数），回放时据此判断选择器是否仍然有效
+        录制结束后driver位于主文档，调用方需让frame导航器失效
+        """
+        capture_id = f"{len(self.captures) + 1:04d}-{kind}"
+        folder = os.path.join(self.directory, capture_id)
+        os.makedirs(folder, exist_ok=True)
+        start = time.time()
+        frames = []
+        self.driver.switch_to.default_content()
+        try:
+            self._capture_frame(folder, frames, None, "", 0)
+        finally:
+            self.driver.switch_to.default_content()
+        entry = {
+            "id": capture_id,
+            "kind": kind,
+            "label": self._redact(label),
+            "time": round(start, 3),
+            "url": frames[0]["url"] if frames else None,
+            "expected": expected or {},
+            "frames": frames,
+        }
+        self.captures.append(entry)
+        self._write_manifest()
+        logging.info(f"已录制页面快照 {capture_id}: {len(frames)} 个文档，用时 {time.time() - start:.2f}秒")
+        return entry
+
+    def _capture_frame(self, folder, frames, parent, name, depth):
+        document = self.driver.execute_script(CAPTURE_DOCUMENT, BLANK_IMAGE)
+        file_name = f"frame-{len(frames)}.html"
+        record = {
+            "file": file_name,
+            "url": sanitize_url(document["url"]),
+            "parent": parent,
+            "name": name,
+            "depth": depth,
+        }
+        frames.append(record)
+        html = document["html"]
+
+        for position, element in enumerate(document["frames"]):
+            marker = f'data-snapshot-frame="{position}"'
+            child_file = "about:blank"
+            if depth < self.max_depth:
+                try:
+                    child_name = element.get_attribute("id") or element.get_attribute("name") or ""
+                    self.driver.switch_to.frame(element)
+                    try:
+                        child_file = self._capture_frame(folder, frames, file_name, child_name, depth + 1)
+                    finally:
+                        self.driver.switch_to.parent_frame()
+                except Exception as e:
+                    logging.debug(f"录制子frame失败: {str(e)}")
+            html = html.replace(marker, f'src="{child_file}" {marker}', 1)
+
+        html = STYLE_URL.sub("none", html)
+        html = ABSOLUTE_URL_ATTRIBUTE.sub(lambda m: f'{m.group(1)}="#"', html)
+        html = URL_QUERY_ATTRIBUTE.sub(lambda m: f'{m.group(1)}="{m.group(2) or "#"}"', html)
+        with open(os.path.join(folder, file_name), 'w', encoding='utf-8') as f:
+            f.write("<!DOCTYPE html>\n" + self._redact(html))
+        return file_name
+
+    def _redact(self, text):
+        for value in self.redact:
+            text = text.replace(value, "***")
+        return text
+
+    def _write_manifest(self):
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump({"captures": self.captures}, f, ensure_ascii=False, indent=2)
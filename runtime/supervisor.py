@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from urllib3.exceptions import HTTPError
+
+from runtime.driver_executor import DriverCallTimeout
+
+# 故障类别
+STALE = "stale_element"
+TIMEOUT = "timeout"
+SESSION_LOST = "session_lost"
+BROWSER_DEAD = "browser_dead"
+UNKNOWN = "unknown"
+
+# 这些故障说明浏览器会话已不可用，需要重建浏览器后恢复
+RESTART_KINDS = (SESSION_LOST, BROWSER_DEAD)
+
+# ChromeDriver在浏览器崩溃或连接断开时返回的错误信息片段
+BROWSER_DEAD_MARKERS = (
+    "chrome not reachable",
+    "disconnected",
+    "target crashed",
+    "tab crashed",
+    "session not created",
+)
+SESSION_LOST_MARKERS = (
+    "invalid session id",
+    "session deleted",
+    "no such window",
+    "target window already closed",
+)
+
+def classify_failure(error):
+    """
+    判断异常属于哪一类故障
+    """
+    if isinstance(error, StaleElementReferenceException):
+        return STALE
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return SESSION_LOST
+    if isinstance(error, DriverCallTimeout):
+        # WebDriver命令迟迟不返回，浏览器或ChromeDriver已经卡死
+        return BROWSER_DEAD
+    if isinstance(error, (ConnectionError, HTTPError)):
+        # ChromeDriver进程已经退出，命令通道无法连接
+        return BROWSER_DEAD
+    if isinstance(error, WebDriverException):
+        message = (error.msg or "").lower()
+        if any(marker in message for marker in BROWSER_DEAD_MARKERS):
+            return BROWSER_DEAD
+        if any(marker in message for marker in SESSION_LOST_MARKERS):
+            return SESSION_LOST
+        # 其余WebDriver错误多为页面状态暂时不符，重新打开页面即可
+        return STALE
+    return UNKNOWN
+
+class Supervisor:
+    def __init__(self, max_attempts=3, base_delay=2, max_delay=60):
+        # 两次取得进展之间最多恢复的次数
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures = {}
+        self.recoveries = 0
+        self.recovery_seconds = 0.0
+        self._attempts = 0
+
+    def progressed(self):
+        """
+        运行取得了进展（例如完成了一个章节），重新计算连续恢复次数
+        """
+        self._attempts = 0
+
+    def run(self, attempt, recover):
+        """
+        执行attempt；出现可恢复的故障时按退避等待，调用recover(故障类别)后从头再执行attempt
+        课程运行时attempt是整个课程流程：恢复后重新登录，根据进度日志从当前章节和任务继续
+        """
+        pending = None
+        failed_at = None
+        while True:
+            try:
+                if pending is not None:
+                    recover(pending)
+                    self._recovered(pending, failed_at)
+                    pending = None
+                return attempt()
+            except Exception as e:
+                failure = self._failure(e)
+                if failure is None:
+                    raise
+                kind, delay = failure
+                if pending is None:
+                    failed_at = time.time()
+                pending = self._pending_kind(pending, kind)
+                time.sleep(delay)
+
+    async def run_async(self, attempt, recover):
+        """
+        run 的协程版本：attempt和recover都是协程函数，退避等待不阻塞事件循环
+        """
+        pending = None
+        failed_at = None
+        while True:
+            try:
+                if pending is not None:
+                    await recover(pending)
+                    self._recovered(pending, failed_at)
+                    pending = None
+                return await attempt()
+            except Exception as e:
+                failure = self._failure(e)
+                if failure is None:
+                    raise
+                kind, delay = failure
+                if pending is None:
+                    failed_at = time.time()
+                pending = self._pending_kind(pending, kind)
+                await asyncio.sleep(delay)
+
+    def _failure(self, error):
+        """
+        记录一次故障，返回 (故障类别, 恢复前的等待秒数)；不可恢复时返回None
+        """
+        kind = classify_failure(error)
+        self.failures[kind] = self.failures.get(kind, 0) + 1
+        if kind == UNKNOWN or self._attempts >= self.max_attempts:
+            return None
+        self._attempts += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self._attempts - 1))
+        logging.warning(
+            f"运行出错 ({kind})，{delay:.0f}秒后进行第 {self._attempts}/{self.max_attempts} 次恢复: {str(error)}"
+        )
+        return kind, delay
+
+    @staticmethod
+    def _pending_kind(pending, kind):
+        """
+        恢复本身失败时，若之前已判定需要重建浏览器则仍然重建
+        """
+        if pending is None or kind in RESTART_KINDS:
+            return kind
+        return pending
+
+    def _recovered(self, kind, failed_at):
+        self.recoveries += 1
+        self.recovery_seconds += time.time() - failed_at
+        logging.info(f"已从故障中恢复 ({kind})，用时 {time.time() - failed_at:.1f}秒")
+
+    def summary(self):
+        return {
+            "recoveries": self.recoveries,
+            "recovery_seconds": round(self.recovery_seconds, 3),
+            "failures": dict(self.failures),
+        }
@@ -0,0 +1,155 @@
+import logging
+import time
+from collections import deque
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# 自适应超时：样本数达到该值后，用观测到的延迟推算超时
+MIN_SAMPLES = 5
+# 推算超时 = 观测延迟的p95 * 该倍数
+TIMEOUT_MULTIPLIER = 3
+# 推算出的超时不低于默认超时（原来的固定等待），最多放宽到默认超时的该倍数
+MAX_TIMEOUT_FACTOR = 3
+
+# 固定节奏的停顿（模拟阅读），单位秒，可通过配置覆盖
+DEFAULT_PACES = {
+    "pdf_scroll_step": 0.2,
+    "pdf_settle": 2,
+}
+
+def document_ready(driver):
+    """
+    页面文档加载完成
+    """
+    return driver.execute_script("return document.readyState") == "complete"
+
+def last_image_loaded(css_selector):
+    """
+    匹配的最后一张图片已加载完成；阅读的只有这一张，前面的图片懒加载或损坏时不必等待
+    """
+    script = (
+        "var imgs = document.querySelectorAll(arguments[0]);"
+        "if (!imgs.length) return false;"
+        "var last = imgs[imgs.length - 1];"
+        "return last.complete && last.naturalHeight ? imgs.length : false;"
+    )
+    return lambda driver: driver.execute_script(script, css_selector)
+
+def scrolled_to_bottom(driver):
+    """
+    页面已滚动到底部
+    """
+    return driver.execute_script(
+        "return window.pageYOffset + window.innerHeight >= document.documentElement.scrollHeight - 2;"
+    )
+
+class WaitStats:
+    def __init__(self):
+        self.count = 0
+        self.timeouts = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=50)
+
+    def record(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.samples.append(elapsed)
+
+    def record_timeout(self, timeout):
+        """
+        超时也作为一个样本，之后的等待据此放宽超时
+        """
+        self.timeouts += 1
+        self.samples.append(timeout)
+
+    def percentile(self, ratio):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p95": self.percentile(0.95),
+            "max": max(self.samples) if self.samples else 0.0,
+        }
+
+class WaitPolicy:
+    def __init__(self, driver, default_timeout=20, poll_frequency=0.2, overrides=None):
+        self.driver = driver
+        self.default_timeout = default_timeout
+        self.poll_frequency = poll_frequency
+        # 配置中的覆盖值：等待名 -> 固定超时，或停顿名 -> 停顿时长
+        self.overrides = dict(overrides or {})
+        self.stats = {}
+
+    def _stats_for(self, name):
+        if name not in self.stats:
+            self.stats[name] = WaitStats()
+        return self.stats[name]
+
+    def timeout_for(self, name):
+        """
+        计算指定等待的超时：配置优先，其次根据历史延迟自适应，最后使用默认值
+        自适应只会放宽超时：页面偶尔变慢时不会因为之前几次很快而提前超时
+        """
+        if name in self.overrides:
+            return self.overrides[name]
+        stats = self._stats_for(name)
+        if len(stats.samples) < MIN_SAMPLES:
+            return self.default_timeout
+        learned = stats.percentile(0.95) * TIMEOUT_MULTIPLIER
+        return min(self.default_timeout * MAX_TIMEOUT_FACTOR, max(self.default_timeout, learned))
+
+    def until(self, name, condition, timeout=None, message=''):
+        """
+        按名称等待条件成立，并记录耗时
+        """
+        stats = self._stats_for(name)
+        if timeout is None:
+            timeout = self.timeout_for(name)
+        start = time.time()
+        try:
+            result = WebDriverWait(self.driver, timeout, self.poll_frequency).until(condition, message)
+        except TimeoutException:
+            stats.record_timeout(timeout)
+            logging.debug(f"等待 {name} 超时 ({timeout:.1f}秒)")
+            raise
+        stats.record(time.time() - start)
+        return result
+
+    def pace_duration(self, name):
+        """
+        获取指定停顿的时长
+        """
+        return self.overrides.get(name, DEFAULT_PACES.get(name, 0))
+
+    def pace(self, name):
+        """
+        按名称执行固定节奏的停顿
+        """
+        duration = self.pace_duration(name)
+        if duration > 0:
+            time.sleep(duration)
+        self._stats_for(name).record(duration)
+
+    def record(self, name, elapsed):
+        """
+        记录在页面内完成的等待耗时
+        """
+        self._stats_for(name).record(elapsed)
+
+    def summary(self):
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def log_stats(self):
+        logging.info("等待统计:")
+        for name, stats in sorted(self.summary().items()):
+            logging.info(
+                f"- {name}: 次数 {stats['count']}，超时 {stats['timeouts']}，"
+                f"平均 {stats['mean']:.2f}秒，p95 {stats['p95']:.2f}秒，最长 {stats['max']:.2f}秒"
+            )
\ No newline at end of file
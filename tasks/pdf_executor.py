@@ -1,82 +1,55 @@
 import logging
+import math
 import time
 import traceback
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from .task_executor import TaskExecutor
+from runtime.frame_navigator import MAIN_FRAME, PAN_VIEW_FRAME
+from runtime.wait_policy import last_image_loaded, scrolled_to_bottom
+from . import scripts
+from .task_executor import TaskExecutor, TaskFailed
 
 class PDFExecutor(TaskExecutor):
+    def __init__(self, driver, wait_policy=None, navigator=None, scroll_step=100):
+        super().__init__(driver, wait_policy, navigator)
+        # 每步滚动的像素数，节奏由等待策略中的 pdf_scroll_step 决定
+        self.scroll_step = scroll_step
+
     def execute(self, task_info):
         """
         执行PDF阅读任务
         """
         logging.info("开始阅读PDF...")
         try:
-            # 1. 先切换到主iframe,使用id定位
-            logging.debug("切换到主iframe")
-            main_iframe = self.wait.until(
-                EC.presence_of_element_located((By.ID, "iframe"))
-            )
-            self.driver.switch_to.frame(main_iframe)
-            
-            # 2. 等待并切换到PDF iframe
-            logging.debug(f"等待PDF iframe加载,xpath={task_info['xpath']}")
-            pdf_iframe = self.wait.until(
-                EC.presence_of_element_located((By.XPATH, task_info["xpath"]))
-            )
-            logging.debug("PDF iframe已找到,准备切换")
-            self.driver.switch_to.frame(pdf_iframe)
-            
-            # 3. 等待并切换到panView iframe
-            logging.debug("等待panView iframe加载")
-            pan_view_iframe = self.wait.until(
-                EC.presence_of_element_located((By.ID, "panView"))
-            )
-            logging.debug("panView iframe已找到,准备切换")
-            self.driver.switch_to.frame(pan_view_iframe)
-            
-            # 4. 添加更长的等待时间
-            logging.debug("等待PDF内容加载...") 
-            time.sleep(5)
+            # 1-3. 依次进入主iframe、PDF iframe和panView iframe，已在路径上的层级不会重复切换
+            logging.debug(f"切换到panView iframe,locator={task_info.locator}")
+            self.navigator.switch_to(MAIN_FRAME, self.task_frame(task_info), PAN_VIEW_FRAME)
             
-            # 5. 检查fileBox是否存在,添加显式等待
+            # 4. 检查fileBox是否存在,添加显式等待
             logging.debug("查找fileBox元素")
+            self.wait_file_box()
+
+            # 5. 等待要阅读的最后一张PDF图片加载完成
+            logging.debug("等待PDF内容加载...")
             try:
-                self.wait.until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "fileBox"))
-                )
+                self.wait_policy.until("pdf_images", last_image_loaded(".fileBox img"))
             except Exception as e:
-                logging.error(f"未找到fileBox元素:{str(e)}")
-                return
-                
-            images = self.driver.find_elements(By.CSS_SELECTOR, ".fileBox img")
-            if not images:
-                logging.warning("未找到PDF图片")
-                return
+                logging.warning(f"等待PDF图片加载超时，继续阅读: {str(e)}")
                 
+            images = self.find_images()
             logging.info(f"找到 {len(images)} 张PDF图片，将直接阅读最后一张")
             
             # 只处理最后一张图片
             try:
-                last_img = images[-1]
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", last_img)
-                time.sleep(1)
-                
-                img_height = self.driver.execute_script("return arguments[0].offsetHeight;", last_img)
-                current_scroll = self.driver.execute_script("return window.pageYOffset;")
-                
-                scroll_step = 100
-                for scroll_pos in range(current_scroll, current_scroll + img_height, scroll_step):
-                    self.driver.execute_script(f"window.scrollTo(0, {scroll_pos});")
-                    time.sleep(0.2)
-                
+                self.scroll_through(images[-1])
                 logging.info("已阅读最后一张图片")
-                print("已完成最后一张图片阅读")
             except Exception as e:
                 logging.error(f"滚动阅读最后一张图片时出错: {str(e)}")
             
             self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
-            time.sleep(2)
+            self.wait_policy.until("pdf_bottom", scrolled_to_bottom)
+            self.wait_policy.pace("pdf_settle")
             
             logging.info("PDF阅读完成!")
             
@@ -84,11 +57,109 @@ class PDFExecutor(TaskExecutor):
             logging.error(f"阅读PDF时出错: {str(e)}")
             logging.debug(traceback.format_exc())
             raise
-        finally:
-            try:
-                # 依次切换回各层frame
-                self.driver.switch_to.parent_frame()  # 从panView切回pdf iframe
-                self.driver.switch_to.parent_frame()  # 从pdf iframe切回main iframe
-                self.driver.switch_to.default_content()  # 最后切回默认内容
-            except Exception as e:
-                logging.error(f"切换回默认frame时出错: {str(e)}") 
\ No newline at end of file
+
+    def wait_file_box(self):
+        """
+        等待PDF容器出现；没有容器说明任务内容未能加载，任务失败
+        """
+        try:
+            self.wait_policy.until(
+                "pdf_file_box", EC.presence_of_element_located((By.CLASS_NAME, "fileBox"))
+            )
+        except TimeoutException as e:
+            raise TaskFailed(f"未找到fileBox元素: {str(e)}") from e
+
+    def find_images(self):
+        """
+        PDF的各页图片，一张都没有时任务失败
+        """
+        images = self.driver.find_elements(By.CSS_SELECTOR, ".fileBox img")
+        if not images:
+            raise TaskFailed("未找到PDF图片")
+        return images
+
+    def scroll_through(self, element):
+        """
+        在页面内一次性完成对元素的滚动阅读
+        """
+        step_seconds = self.wait_policy.pace_duration("pdf_scroll_step")
+        img_height = self.driver.execute_script("return arguments[0].offsetHeight;", element)
+        # 预计耗时由滚动节奏决定，脚本超时在此基础上留出余量
+        expected = self.scroll_seconds(img_height)
+        self.driver.set_script_timeout(expected * 2 + 30)
+        start = time.time()
+        result = self.driver.execute_async_script(
+            scripts.SCROLL_THROUGH_ELEMENT, element, self.scroll_step, step_seconds * 1000
+        )
+        self.wait_policy.record("pdf_scroll", time.time() - start)
+        logging.debug(f"页面内滚动完成: {result['steps']} 步，{result['start']} -> {result['end']}")
+        return result
+
+    def steps(self, task_info, frames=(), poll_interval=0.5):
+        """
+        分步执行PDF阅读，每步结束后产出距离下一步可执行还有多少秒，供多个标签页交替推进
+        frames为任务iframe之前的frame路径；每一步开始前都会重新切换到PDF所在的frame
+        """
+        path = tuple(frames) + (self.task_frame(task_info), PAN_VIEW_FRAME)
+        self.navigator.switch_to(*path)
+        self.wait_file_box()
+
+        # 图片加载期间不占用driver，轮询到全部加载完成或超时
+        start = time.time()
+        deadline = start + self.wait_policy.timeout_for("pdf_images")
+        loaded = last_image_loaded(".fileBox img")
+        while True:
+            if loaded(self.driver):
+                self.wait_policy.record("pdf_images", time.time() - start)
+                break
+            if time.time() >= deadline:
+                logging.warning("等待PDF图片加载超时，继续阅读")
+                break
+            yield poll_interval
+            self.navigator.switch_to(*path)
+
+        images = self.find_images()
+
+        # 在页面内启动滚动后立即返回，滚动期间driver可以去推进其他标签页
+        step_seconds = self.wait_policy.pace_duration("pdf_scroll_step")
+        height = self.driver.execute_script("return arguments[0].offsetHeight;", images[-1])
+        start = time.time()
+        self.driver.execute_script(
+            scripts.START_SCROLL_THROUGH_ELEMENT, images[-1], self.scroll_step, step_seconds * 1000
+        )
+        yield self.scroll_seconds(height)
+        while True:
+            self.navigator.switch_to(*path)
+            if self.driver.execute_script(scripts.SCROLL_RESULT):
+                break
+            yield poll_interval
+        self.wait_policy.record("pdf_scroll", time.time() - start)
+
+        self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+        self.wait_policy.until("pdf_bottom", scrolled_to_bottom)
+        # 阅读停顿不再阻塞，只是推迟这个标签页的结束
+        settle = self.wait_policy.pace_duration("pdf_settle")
+        self.wait_policy.record("pdf_settle", settle)
+        yield settle
+
+    def scroll_seconds(self, height):
+        """
+        按当前滚动节奏滚过指定高度需要的秒数
+        """
+        return math.ceil(height / self.scroll_step) * self.wait_policy.pace_duration("pdf_scroll_step")
+
+    def estimate(self, task_info):
+        """
+        读取最后一页的高度，按滚动节奏估计阅读时间，不做任何滚动
+        """
+        self.navigator.switch_to(MAIN_FRAME, self.task_frame(task_info), PAN_VIEW_FRAME)
+        try:
+            self.wait_policy.until("pdf_images", last_image_loaded(".fileBox img"))
+        except TimeoutException:
+            logging.warning("等待PDF图片加载超时，无法估计阅读时间")
+            return None
+        height = self.driver.execute_script(
+            "var imgs = document.querySelectorAll('.fileBox img');"
+            "return imgs.length ? imgs[imgs.length - 1].offsetHeight : 0;"
+        )
+        return self.scroll_seconds(height) + self.wait_policy.pace_duration("pdf_settle")
\ No newline at end of file
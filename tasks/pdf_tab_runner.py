@@ -0,0 +1,90 @@
+import logging
+import time
+
+from runtime.frame_navigator import FrameNavigator
+from runtime.supervisor import RESTART_KINDS, classify_failure
+from .pdf_executor import PDFExecutor
+
+class _Tab:
+    __slots__ = ("task", "handle", "executor", "steps", "ready_at", "busy")
+
+class PDFTabRunner:
+    def __init__(self, driver, wait_policy, main_navigator, concurrency=3, scroll_step=100,
+                 resource_policy=None):
+        self.driver = driver
+        self.wait_policy = wait_policy
+        # 见 FrameNavigator.window_switched
+        self.main_navigator = main_navigator
+        # 同时打开的PDF标签页数量上限
+        self.concurrency = concurrency
+        self.scroll_step = scroll_step
+        # 每个新标签页都要再次启用拦截，见 ResourcePolicy.apply
+        self.resource_policy = resource_policy
+
+    def run(self, tasks, content_url):
+        """
+        在各自的标签页中打开章节内容并交替推进多个PDF任务，只在某个标签页的下一步可以执行时才切换过去
+        返回 [(任务, 结果, 耗时)]，结果为 done / failed
+        耗时只包括该标签页自己的步骤执行时间和阅读节奏的停顿，即单独执行该任务时的大致用时，不含等待其他标签页的时间
+        """
+        main_handle = self.driver.current_window_handle
+        pending = list(tasks)
+        active = []
+        results = []
+        try:
+            while pending or active:
+                while pending and len(active) < self.concurrency:
+                    active.append(self._open(pending.pop(0), content_url))
+
+                tab = min(active, key=lambda t: t.ready_at)
+                delay = tab.ready_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                self.driver.switch_to.window(tab.handle)
+                tab.executor.navigator.window_switched()
+                step_start = time.time()
+                try:
+                    delay = next(tab.steps)
+                    tab.busy += time.time() - step_start + delay
+                    tab.ready_at = time.time() + delay
+                    continue
+                except StopIteration:
+                    outcome = "done"
+                    logging.info(f"PDF任务完成: {tab.task.title}")
+                except Exception as e:
+                    if classify_failure(e) in RESTART_KINDS:
+                        raise
+                    outcome = "failed"
+                    logging.error(f"阅读PDF {tab.task.title} 时出错: {str(e)}")
+                tab.busy += time.time() - step_start
+                active.remove(tab)
+                results.append((tab.task, outcome, tab.busy))
+                self.driver.close()
+        finally:
+            for tab in active:
+                try:
+                    self.driver.switch_to.window(tab.handle)
+                    self.driver.close()
+                except Exception as e:
+                    logging.debug(f"关闭PDF标签页时出错: {str(e)}")
+            self.driver.switch_to.window(main_handle)
+            self.main_navigator.window_switched()
+        return results
+
+    def _open(self, task, content_url):
+        tab = _Tab()
+        tab.task = task
+        start = time.time()
+        self.driver.switch_to.new_window('tab')
+        tab.handle = self.driver.current_window_handle
+        if self.resource_policy is not None:
+            self.resource_policy.apply()
+        self.driver.get(content_url)
+        # 每个标签页有自己的导航器，切换标签页后缓存的frame元素仍然有效
+        navigator = FrameNavigator(self.driver, self.wait_policy)
+        tab.executor = PDFExecutor(self.driver, self.wait_policy, navigator, self.scroll_step)
+        # 标签页中直接打开的是内容iframe的文档，任务iframe位于最外层
+        tab.steps = tab.executor.steps(task)
+        tab.ready_at = time.time()
+        tab.busy = tab.ready_at - start
+        return tab
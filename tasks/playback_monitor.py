@@ -0,0 +1,127 @@
+import logging
+import time
+
+# HTMLMediaElement.readyState: 少于 HAVE_FUTURE_DATA 时播放器在等待缓冲
+HAVE_FUTURE_DATA = 3
+# HTMLMediaElement.networkState: 找不到可用的视频源
+NETWORK_NO_SOURCE = 3
+
+RESUME = "resume"
+RELOAD = "reload"
+
+class PlaybackStalled(Exception):
+    """
+    视频多次恢复后仍然无法继续播放
+    """
+
+class PlaybackMonitor:
+    def __init__(self, title="", stall_window=30, max_attempts=3, min_velocity=0.5):
+        self.title = title
+        # 播放位置停止前进超过该秒数视为卡住，开始恢复
+        self.stall_window = stall_window
+        # 同一次卡顿中最多尝试恢复的次数，超过后放弃该视频
+        self.max_attempts = max_attempts
+        # 每秒至少前进的视频秒数，低于该值不算在正常播放
+        self.min_velocity = min_velocity
+        self.play_seconds = 0.0
+        self.stall_seconds = 0.0
+        self.stalls = 0
+        self.recoveries = 0
+        self.attempts = 0
+        self.reasons = []
+        self.duration = None
+        self.outcome = None
+        self._last_time = None
+        self._last_position = 0.0
+        self._last_progress = None
+        self._stalled = False
+
+    def diagnose(self, state):
+        """
+        根据播放器状态给出卡住的原因
+        """
+        if state.get("error"):
+            return f"error:{state['error']}"
+        if state.get("network_state") == NETWORK_NO_SOURCE:
+            return "no_source"
+        if state.get("paused"):
+            return "paused"
+        if (state.get("ready_state") or 0) < HAVE_FUTURE_DATA:
+            return "buffering"
+        return "no_progress"
+
+    def observe(self, state, now=None):
+        """
+        记录一次进度汇报，返回需要执行的恢复动作 resume / reload，或None表示无需处理
+        恢复次数用尽时抛出 PlaybackStalled
+        """
+        now = time.monotonic() if now is None else now
+        position = state.get("current_time") or 0.0
+        self.duration = state.get("duration") or self.duration
+        if self._last_time is None:
+            self._last_time = self._last_progress = now
+            self._last_position = position
+            return None
+
+        elapsed = now - self._last_time
+        # 与上一次汇报的位置比较；重新加载、回退或平台跳回之后从新位置开始计算
+        advanced = position - self._last_position
+        self._last_time = now
+        self._last_position = position
+        if advanced < 0:
+            logging.debug(f"视频位置回退: {self.title} {position:.1f}秒")
+            return None
+        if advanced > 0 and advanced >= self.min_velocity * elapsed:
+            self.play_seconds += elapsed
+            self._last_progress = now
+            if self._stalled:
+                logging.info(f"视频已恢复播放: {self.title}")
+                self._stalled = False
+                self.attempts = 0
+            return None
+
+        self.stall_seconds += elapsed
+        reason = self.diagnose(state)
+        if not self._stalled:
+            self._stalled = True
+            self.stalls += 1
+            logging.warning(f"视频播放停滞 ({reason}): {self.title} {position:.1f}秒")
+        if now - self._last_progress < self.stall_window:
+            return None
+
+        self.attempts += 1
+        self.reasons.append(reason)
+        if self.attempts > self.max_attempts:
+            self.outcome = "stalled"
+            raise PlaybackStalled(
+                f"视频 {self.title} 在 {position:.1f}秒处停滞，{self.max_attempts} 次恢复后仍无法播放 ({reason})"
+            )
+        # 每次恢复后重新给出一个完整的等待窗口
+        self._last_progress = now
+        self.recoveries += 1
+        # 出错、没有视频源或者暂停后恢复播放无效时重新加载播放器
+        if reason.startswith("error") or reason == "no_source" or self.attempts > 1:
+            return RELOAD
+        return RESUME
+
+    def finish(self, state, now=None):
+        """
+        播放结束：最后一段时间计入播放时间
+        """
+        now = time.monotonic() if now is None else now
+        if self._last_time is not None:
+            self.play_seconds += now - self._last_time
+        self.duration = state.get("duration") or self.duration
+        self.outcome = "done"
+
+    def report(self):
+        return {
+            "title": self.title,
+            "duration": round(self.duration, 1) if self.duration else None,
+            "play_seconds": round(self.play_seconds, 1),
+            "stall_seconds": round(self.stall_seconds, 1),
+            "stalls": self.stalls,
+            "recoveries": self.recoveries,
+            "reasons": self.reasons,
+            "outcome": self.outcome,
+        }
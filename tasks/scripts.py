@@ -0,0 +1,209 @@
+# 任务执行器在页面内执行的JavaScript脚本
+
+# 等待视频事件：在页面内监听 ended/timeupdate，到达汇报间隔或播放结束时才返回
+# 参数: arguments[0] 汇报间隔(秒)；返回 {state, current_time, duration, paused, ready_state, network_state, error}
+# state: ended 播放结束 / progress 正常进度 / idle 间隔内没有任何进度 / missing 视频元素不存在
+# error 为 MediaError 的错误码，没有错误时为0
+WAIT_VIDEO_PROGRESS = """
+var done = arguments[arguments.length - 1];
+var interval = arguments[0] * 1000;
+var video = document.getElementById('video_html5_api');
+if (!video) {
+    done({state: 'missing', current_time: 0, duration: 0});
+    return;
+}
+var settled = false;
+var timer = null;
+var start = Date.now();
+function finish(state) {
+    if (settled) {
+        return;
+    }
+    settled = true;
+    video.removeEventListener('ended', onEnded);
+    video.removeEventListener('timeupdate', onTimeUpdate);
+    clearTimeout(timer);
+    done({
+        state: state,
+        current_time: video.currentTime,
+        duration: video.duration,
+        paused: video.paused,
+        ready_state: video.readyState,
+        network_state: video.networkState,
+        error: video.error ? video.error.code : 0
+    });
+}
+function onEnded() {
+    finish('ended');
+}
+function onTimeUpdate() {
+    if (video.duration && video.currentTime >= video.duration) {
+        finish('ended');
+    } else if (Date.now() - start >= interval) {
+        finish('progress');
+    }
+}
+if (video.ended) {
+    finish('ended');
+    return;
+}
+video.addEventListener('ended', onEnded);
+video.addEventListener('timeupdate', onTimeUpdate);
+timer = setTimeout(function () {
+    finish('idle');
+}, interval);
+"""
+
+# 立即读取视频状态，字段同 WAIT_VIDEO_PROGRESS；不等待事件，供分步播放时轮询
+VIDEO_STATE = """
+var video = document.getElementById('video_html5_api');
+if (!video) {
+    return {state: 'missing', current_time: 0, duration: 0};
+}
+return {
+    state: video.ended ? 'ended' : 'progress',
+    current_time: video.currentTime,
+    duration: video.duration,
+    paused: video.paused,
+    ready_state: video.readyState,
+    network_state: video.networkState,
+    error: video.error ? video.error.code : 0
+};
+"""
+
+# 页面内滚动阅读：从元素顶部开始按固定步长和节奏滚过整个元素，到达底部后返回
+# 参数: arguments[0] 目标元素，arguments[1] 步长(像素)，arguments[2] 每步间隔(毫秒)
+# 可见页面用 requestAnimationFrame 驱动，后台页面中 rAF 会暂停，改用 setTimeout
+SCROLL_THROUGH_ELEMENT = """
+var done = arguments[arguments.length - 1];
+var target = arguments[0];
+var step = arguments[1];
+var stepMs = arguments[2];
+target.scrollIntoView(true);
+var start = window.pageYOffset;
+var end = start + target.offsetHeight;
+var pos = start;
+var steps = 0;
+var last = performance.now();
+function schedule() {
+    if (document.hidden) {
+        setTimeout(function () { tick(performance.now()); }, stepMs);
+    } else {
+        requestAnimationFrame(tick);
+    }
+}
+function tick(now) {
+    if (now - last >= stepMs) {
+        last = now;
+        pos = Math.min(pos + step, end);
+        window.scrollTo(0, pos);
+        steps++;
+    }
+    if (pos >= end) {
+        done({start: start, end: pos, steps: steps});
+        return;
+    }
+    schedule();
+}
+window.scrollTo(0, pos);
+schedule();
+"""
+# 探测视频时长但不播放：必要时只加载元数据，超时仍未得到时长则返回null
+# 参数: arguments[0] 超时(毫秒)
+PROBE_VIDEO_DURATION = """
+var done = arguments[arguments.length - 1];
+var timeout = arguments[0];
+var video = document.getElementById('video_html5_api');
+if (!video) {
+    done(null);
+    return;
+}
+function known() {
+    return isFinite(video.duration) && video.duration > 0;
+}
+if (known()) {
+    done(video.duration);
+    return;
+}
+var timer = setTimeout(function () {
+    video.removeEventListener('loadedmetadata', onMetadata);
+    done(null);
+}, timeout);
+function onMetadata() {
+    clearTimeout(timer);
+    done(known() ? video.duration : null);
+}
+video.addEventListener('loadedmetadata', onMetadata);
+if (video.readyState === 0) {
+    video.preload = 'metadata';
+    video.load();
+}
+"""
+
+# 非阻塞的滚动阅读：在页面内启动 SCROLL_THROUGH_ELEMENT 后立即返回，结束后结果写入 window.__moocScroll
+# 参数同 SCROLL_THROUGH_ELEMENT，之后用 SCROLL_RESULT 查询
+START_SCROLL_THROUGH_ELEMENT = """
+window.__moocScroll = null;
+var args = Array.prototype.slice.call(arguments);
+args.push(function (result) {
+    window.__moocScroll = result;
+});
+(function () {
+""" + SCROLL_THROUGH_ELEMENT + """
+}).apply(null, args);
+"""
+
+SCROLL_RESULT = "return window.__moocScroll || null;"
+
+# 恢复播放：先尝试 play()，被拦截时改为静音后再试，仍失败时点击播放器的大播放按钮
+# 返回播放器当前是否在播放
+RESUME_VIDEO = """
+var done = arguments[arguments.length - 1];
+var video = document.getElementById('video_html5_api');
+if (!video) {
+    done(false);
+    return;
+}
+function clickButton() {
+    var button = document.querySelector('.vjs-big-play-button');
+    if (button) {
+        button.click();
+    }
+    done(!video.paused);
+}
+video.play().then(function () {
+    done(true);
+}).catch(function () {
+    video.muted = true;
+    video.play().then(function () {
+        done(true);
+    }).catch(clickButton);
+});
+"""
+
+# 重新加载视频并回到原来的播放位置继续播放
+# 参数: arguments[0] 播放位置(秒)，arguments[1] 超时(毫秒)；返回是否已重新开始播放
+RELOAD_VIDEO = """
+var done = arguments[arguments.length - 1];
+var position = arguments[0];
+var video = document.getElementById('video_html5_api');
+if (!video) {
+    done(false);
+    return;
+}
+var timer = setTimeout(function () {
+    done(false);
+}, arguments[1]);
+video.addEventListener('loadedmetadata', function () {
+    video.currentTime = Math.min(position, video.duration || position);
+    video.muted = true;
+    video.play().then(function () {
+        clearTimeout(timer);
+        done(true);
+    }).catch(function () {
+        clearTimeout(timer);
+        done(false);
+    });
+}, {once: true});
+video.load();
+"""
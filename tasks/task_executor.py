@@ -1,10 +1,22 @@
 import logging
 from abc import ABC, abstractmethod
 
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from runtime.frame_navigator import Frame, FrameNavigator
+from runtime.wait_policy import WaitPolicy
+
+class TaskFailed(Exception):
+    """
+    任务无法完成（例如页面缺少任务内容），只放弃该任务，不需要恢复浏览器
+    """
+
 class TaskExecutor(ABC):
-    def __init__(self, driver, wait):
+    def __init__(self, driver, wait_policy=None, navigator=None):
         self.driver = driver
-        self.wait = wait
+        self.wait_policy = wait_policy or WaitPolicy(driver)
+        self.navigator = navigator or FrameNavigator(driver, self.wait_policy)
 
     @abstractmethod
     def execute(self, task_info):
@@ -13,8 +25,24 @@ class TaskExecutor(ABC):
         """
         pass
 
+    def estimate(self, task_info):
+        """
+        不执行任务，估计任务需要的秒数；无法估计时返回None
+        """
+        return None
+
     def switch_to_default(self):
         """
         切换回主文档
         """
-        self.driver.switch_to.default_content() 
\ No newline at end of file
+        self.navigator.switch_to()
+
+    def task_frame(self, task_info):
+        """
+        任务iframe，优先使用任务发现时给出的稳定定位器
+        """
+        conditions = [EC.presence_of_element_located(task_info.locator)]
+        if task_info.key and task_info.xpath:
+            # 页面重新渲染后标记会丢失，此时退回到按序号定位的XPath
+            conditions.append(EC.presence_of_element_located((By.XPATH, task_info.xpath)))
+        return Frame(f"task-{task_info.index}", condition=EC.any_of(*conditions), wait_name="task_iframe")
\ No newline at end of file
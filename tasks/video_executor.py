@@ -1,79 +1,187 @@
 import logging
-import time
 import traceback
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
+from runtime.frame_navigator import MAIN_FRAME
+from runtime.log_pipeline import ProgressLine
+from . import scripts
+from .playback_monitor import RELOAD, PlaybackMonitor
 from .task_executor import TaskExecutor
 
 class VideoExecutor(TaskExecutor):
+    def __init__(self, driver, wait_policy=None, navigator=None, progress_interval=10, progress_refresh=1.0,
+                 stall_window=30, max_stall_attempts=3, reload_timeout=60):
+        super().__init__(driver, wait_policy, navigator)
+        # 页面内脚本每隔多少秒汇报一次进度
+        self.progress_interval = progress_interval
+        # 播放停滞超过 stall_window 秒后尝试恢复，同一次停滞最多恢复 max_stall_attempts 次
+        self.stall_window = stall_window
+        self.max_stall_attempts = max_stall_attempts
+        # 重新加载视频并回到原位置的最长等待秒数，重新缓冲比读取时长慢得多，不使用自适应超时
+        self.reload_timeout = reload_timeout
+        # 每个视频的播放时间和停滞时间
+        self.reports = []
+        # 控制台进度行的最短刷新间隔
+        self.progress_line = ProgressLine(progress_refresh)
+        # 每次汇报进度后调用，参数为视频剩余秒数；可借视频播放的空闲时间做其他工作
+        self.progress_hooks = []
+        # 每次汇报进度（包括播放结束）时调用，参数为当前播放位置和视频总时长
+        self.playback_hooks = []
+
     def execute(self, task_info):
         """
         执行视频播放任务
         """
         logging.info("开始播放视频...")
+        monitor = None
         try:
-            # 1. 切换到主iframe
-            logging.debug("切换到主iframe")
-            main_iframe = self.wait.until(
-                EC.presence_of_element_located((By.ID, "iframe"))
-            )
-            self.driver.switch_to.frame(main_iframe)
-            
-            # 2. 切换到视频iframe
-            logging.debug("切换到视频iframe...")
-            video_iframe = self.wait.until(
-                EC.presence_of_element_located((By.XPATH, task_info["xpath"]))
-            )
-            self.driver.switch_to.frame(video_iframe)
-            
-            # 3. 点击播放按钮
-            logging.debug("点击播放按钮...")
-            play_button = self.wait.until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "vjs-big-play-button"))
-            )
-            play_button.click()
-            
-            # 4. 等待视频元素加载
-            logging.debug("等待视频元素加载...")
-            video_element = self.wait.until(
-                EC.presence_of_element_located((By.ID, "video_html5_api"))
-            )
-            
-            # 5. 尝试静音视频
-            logging.debug("尝试静音视频...")
-            mute_button = self.driver.find_element(By.CLASS_NAME, "vjs-mute-control")
-            if "vjs-vol-3" in mute_button.get_attribute("class"):
-                # 使用 JavaScript 执行点击操作
-                self.driver.execute_script("arguments[0].click();", mute_button)
-                
-            # 6. 获取视频时长并等待播放完成
-            duration = self.wait.until(lambda d: d.execute_script(
-                "return document.getElementById('video_html5_api').duration"
-            ))
-            
-            logging.info(f"视频总时长: {duration:.1f}秒")
-            
-            current_time = 0
-            while current_time < duration:
-                current_time = self.driver.execute_script(
-                    "return document.getElementById('video_html5_api').currentTime"
+            video_frame, duration = self._start_playback(task_info)
+
+            # 异步脚本在页面内阻塞等待视频事件，Python侧只在有进度或播放结束时被唤醒
+            self.driver.set_script_timeout(self.progress_interval + 30)
+            monitor = self._new_monitor(task_info)
+            while True:
+                # 进度回调可能切换到其他窗口，这里保证回到视频iframe；位置未变时不发出任何命令
+                self.navigator.switch_to(MAIN_FRAME, video_frame)
+                state = self.driver.execute_async_script(
+                    scripts.WAIT_VIDEO_PROGRESS, self.progress_interval
                 )
-                time.sleep(1)
-                if int(current_time) % 10 == 0:
-                    logging.info(f"视频播放进度: {current_time:.1f}/{duration:.1f}秒")
-                print(f"当前播放进度: {current_time:.1f}/{duration:.1f}秒", end='\r')
+                if self._handle_state(state, duration, monitor):
+                    break
                 
             logging.info("视频播放完成!")
             
         except Exception as e:
             logging.error(f"播放视频时出错: {str(e)}")
             logging.debug(traceback.format_exc())
+            if monitor is not None and monitor.outcome is None:
+                monitor.outcome = "failed"
+            raise
+
+    def steps(self, task_info):
+        """
+        分步播放视频，每步产出距离下次查看进度还有多少秒；等待期间不占用driver，供异步调度使用
+        """
+        logging.info("开始播放视频...")
+        monitor = None
+        try:
+            video_frame, duration = self._start_playback(task_info)
+            monitor = self._new_monitor(task_info)
+            while True:
+                self.navigator.switch_to(MAIN_FRAME, video_frame)
+                if self._handle_state(self.driver.execute_script(scripts.VIDEO_STATE), duration, monitor):
+                    break
+                yield self.progress_interval
+            logging.info("视频播放完成!")
+        except Exception as e:
+            logging.error(f"播放视频时出错: {str(e)}")
+            if monitor is not None and monitor.outcome is None:
+                monitor.outcome = "failed"
             raise
-        finally:
-            try:
-                # 依次切换回各层frame
-                self.driver.switch_to.parent_frame()  # 从video iframe切回main iframe
-                self.driver.switch_to.default_content()  # 最后切回默认内容
-            except Exception as e:
-                logging.error(f"切换回默认frame时出错: {str(e)}") 
\ No newline at end of file
+
+    def _start_playback(self, task_info):
+        """
+        进入视频iframe、点击播放并静音，返回视频iframe和视频时长
+        """
+        # 1-2. 依次进入主iframe和视频iframe，已在路径上的层级不会重复切换
+        logging.debug("切换到视频iframe...")
+        video_frame = self.task_frame(task_info)
+        self.navigator.switch_to(MAIN_FRAME, video_frame)
+        
+        # 3. 点击播放按钮
+        logging.debug("点击播放按钮...")
+        play_button = self.wait_policy.until(
+            "video_play_button", EC.element_to_be_clickable((By.CLASS_NAME, "vjs-big-play-button"))
+        )
+        play_button.click()
+        
+        # 4. 等待视频元素加载
+        logging.debug("等待视频元素加载...")
+        self.wait_policy.until(
+            "video_element", EC.presence_of_element_located((By.ID, "video_html5_api"))
+        )
+        
+        # 5. 尝试静音视频
+        logging.debug("尝试静音视频...")
+        mute_button = self.driver.find_element(By.CLASS_NAME, "vjs-mute-control")
+        if "vjs-vol-3" in mute_button.get_attribute("class"):
+            # 使用 JavaScript 执行点击操作
+            self.driver.execute_script("arguments[0].click();", mute_button)
+            
+        # 6. 获取视频时长
+        duration = self.wait_policy.until("video_duration", lambda d: d.execute_script(
+            "return document.getElementById('video_html5_api').duration"
+        ))
+        
+        logging.info(f"视频总时长: {duration:.1f}秒")
+        return video_frame, duration
+
+    def _new_monitor(self, task_info):
+        monitor = PlaybackMonitor(
+            task_info.title, stall_window=self.stall_window, max_attempts=self.max_stall_attempts
+        )
+        self.reports.append(monitor)
+        return monitor
+
+    def _handle_state(self, state, duration, monitor):
+        """
+        处理一次进度汇报，返回视频是否已播放完成；播放停滞时尝试恢复
+        """
+        if state["state"] == "missing":
+            raise Exception("视频元素已不存在")
+        current_time = state["current_time"]
+        logging.debug(f"视频播放进度: {current_time:.1f}/{duration:.1f}秒")
+        self.progress_line.update(f"当前播放进度: {current_time:.1f}/{duration:.1f}秒")
+        for hook in self.playback_hooks:
+            hook(current_time, duration)
+        if state["state"] == "ended" or current_time >= duration:
+            self.progress_line.finish()
+            monitor.finish(state)
+            return True
+        action = monitor.observe(state)
+        if action is not None:
+            self._recover_playback(action, current_time)
+        for hook in self.progress_hooks:
+            hook(duration - current_time)
+        return False
+
+    def _recover_playback(self, action, position):
+        """
+        恢复停滞的播放：resume 继续播放，reload 重新加载视频后回到原位置
+        """
+        logging.info(f"尝试{'重新加载视频' if action == RELOAD else '恢复播放'}，位置 {position:.1f}秒")
+        if action == RELOAD:
+            self.driver.set_script_timeout(self.reload_timeout + 5)
+            playing = self.driver.execute_async_script(scripts.RELOAD_VIDEO, position, self.reload_timeout * 1000)
+            self.driver.set_script_timeout(self.progress_interval + 30)
+        else:
+            playing = self.driver.execute_async_script(scripts.RESUME_VIDEO)
+        if not playing:
+            logging.warning("播放器仍未开始播放")
+
+    def playback_summary(self):
+        """
+        汇总所有视频的播放时间、停滞时间和恢复次数
+        """
+        reports = [monitor.report() for monitor in self.reports]
+        return {
+            "videos": len(reports),
+            "play_seconds": round(sum(report["play_seconds"] for report in reports), 1),
+            "stall_seconds": round(sum(report["stall_seconds"] for report in reports), 1),
+            "recoveries": sum(report["recoveries"] for report in reports),
+            "stalled": sum(1 for report in reports if report["outcome"] == "stalled"),
+            "reports": reports,
+        }
+
+    def estimate(self, task_info):
+        """
+        只读取视频元数据得到时长，不点击播放
+        """
+        self.navigator.switch_to(MAIN_FRAME, self.task_frame(task_info))
+        self.wait_policy.until(
+            "video_element", EC.presence_of_element_located((By.ID, "video_html5_api"))
+        )
+        timeout = self.wait_policy.timeout_for("video_duration")
+        self.driver.set_script_timeout(timeout + 5)
+        return self.driver.execute_async_script(scripts.PROBE_VIDEO_DURATION, timeout * 1000)